@@ -0,0 +1,83 @@
+from collections import deque
+
+class AhoCorasick:
+    """
+    여러 패턴을 한 번에 찾는 Aho-Corasick 오토마톤.
+    패턴 집합을 생성 시 한 번만 컴파일하고, 이후 텍스트는 패턴 수와 관계없이
+    문자 하나당 상수 시간의 한 번의 선형 탐색으로 검사합니다.
+    """
+
+    def __init__(self, patterns):
+        """
+        :param patterns: 찾을 문자열 패턴들 (빈 문자열은 무시)
+        """
+        self._goto = [{}]  # 상태별 다음 문자 -> 다음 상태
+        self._fail = [0]  # 일치 실패 시 돌아갈 상태 (가장 긴 접미사 상태)
+        self._outputs = [()]  # 상태에서 끝나는 패턴들 (실패 링크로 이어진 패턴 포함)
+        self.patterns = set()
+        for pattern in patterns:
+            if pattern:
+                self._add(pattern)
+        self._build()
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def contains(self, text):
+        """텍스트에 패턴이 하나라도 있으면 True (첫 일치에서 바로 종료)"""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                return True
+        return False
+
+    def finditer(self, text):
+        """
+        텍스트에서 모든 패턴 일치를 찾는 제너레이터
+        :param text: 검사할 텍스트
+        :return: (시작 위치, 끝 위치, 패턴) 튜플을 끝 위치 순서대로 yield (겹치는 일치 포함)
+        """
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern in outputs[state]:
+                yield end - len(pattern), end, pattern
+
+    def findall(self, text):
+        """모든 패턴 일치를 (시작 위치, 끝 위치, 패턴) 리스트로 반환"""
+        return list(self.finditer(text))
+
+    def _add(self, pattern):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append(())
+            state = next_state
+        if pattern not in self.patterns:
+            self.patterns.add(pattern)
+            self._outputs[state] = (pattern,)
+
+    def _build(self):
+        # 너비 우선으로 실패 링크를 계산하고, 실패 링크 상태의 출력을 미리 합쳐 둠
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._outputs[next_state] += self._outputs[self._fail[next_state]]
+                queue.append(next_state)
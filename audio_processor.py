@@ -1,50 +1,280 @@
 import whisper
+import io
 import logging
 import torch
 import os
 import soundfile as sf
-import librosa
 import traceback
 import numpy as np
+from config import Config
+from vad import VoiceActivityDetector
+from transcript_cache import TranscriptCache
+from resampler import StreamingResampler, resample, to_mono_float32
+
+class BufferReader(io.RawIOBase):
+    """
+    bytes/bytearray/memoryview를 복사하지 않고 읽는 파일 객체.
+    soundfile은 readinto로 libsndfile 버퍼에 직접 채우므로 업로드 데이터를 추가로 복사하지 않습니다.
+    """
+
+    def __init__(self, buffer):
+        self._view = memoryview(buffer).cast("B")
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), len(self._view) - self._position)
+        if size <= 0:
+            return 0
+        buffer[:size] = self._view[self._position:self._position + size]
+        self._position += size
+        return size
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        if offset < 0:
+            raise ValueError(f"Negative seek position {offset}")
+        self._position = offset
+        return self._position
+
+    def tell(self):
+        return self._position
+
+def open_audio_source(audio_file):
+    """
+    경로, 바이트 버퍼, 파일 객체를 soundfile이 읽을 수 있는 입력으로 바꾸는 함수
+    :param audio_file: 오디오 파일 경로, bytes/bytearray/memoryview 또는 읽기/탐색이 가능한 파일 객체
+    :return: (soundfile 입력, 로그용 설명 문자열)
+    """
+    if isinstance(audio_file, (str, os.PathLike)):
+        if not os.path.exists(audio_file):
+            raise FileNotFoundError(f"Audio file not found: {audio_file}")
+        return audio_file, f"{audio_file} ({os.path.getsize(audio_file)} bytes)"
+    if isinstance(audio_file, (bytes, bytearray, memoryview)):
+        return BufferReader(audio_file), f"in-memory buffer ({memoryview(audio_file).nbytes} bytes)"
+    if hasattr(audio_file, "read") and hasattr(audio_file, "seek"):
+        # 업로드의 SpooledTemporaryFile 등은 앞에서 이미 읽었을 수 있으므로 처음으로 되돌림
+        audio_file.seek(0)
+        return audio_file, f"file object {getattr(audio_file, 'name', type(audio_file).__name__)}"
+    raise TypeError(f"Unsupported audio input type: {type(audio_file).__name__}")
 
 class AudioProcessor:
-    def __init__(self, model_size="base"):
+    SAMPLE_RATE = 16000
+
+    def __init__(self, model_size="base", quantize=None, model_sizes=None):
+        """
+        :param model_size: 기본으로 사용할 Whisper 모델 크기
+        :param quantize: CPU에서 int8 동적 양자화 적용 여부 (지정하지 않으면 Config 값 사용)
+        :param model_sizes: 함께 상주시킬 모델 크기 목록 (부하 적응형 선택용)
+        """
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.model = whisper.load_model(model_size, device=self.device)
-        logging.info(f"Whisper model loaded on {self.device}")
+        self.model_size = model_size
+
+        quantize = Config.WHISPER_QUANTIZE if quantize is None else quantize
+        self.quantized = quantize and self.device == "cpu"
+        if quantize and not self.quantized:
+            logging.warning("int8 quantization is only supported on CPU, using the fp model")
+
+        self.models = {size: self._load_model(size) for size in dict.fromkeys([*(model_sizes or []), model_size])}
+        self.model = self.models[model_size]
+        # 캐시 키 등에서 모델을 구분하기 위한 이름
+        self.model_tag = self.tag_for(model_size)
+        self.vad = VoiceActivityDetector(self.SAMPLE_RATE) if Config.VAD_ENABLED else None
+        self.cache = TranscriptCache() if Config.TRANSCRIPT_CACHE_ENABLED else None
+
+    def _load_model(self, model_size):
+        model = whisper.load_model(model_size, device=self.device)
+        logging.info(f"Whisper model '{model_size}' loaded on {self.device}")
+        if self.quantized:
+            model = self._quantize(model)
+            logging.info(f"Whisper model '{model_size}' linear layers quantized to int8")
+        return model
+
+    def tag_for(self, model_size=None):
+        """모델 크기와 양자화 여부를 합친 이름을 반환"""
+        model_size = model_size or self.model_size
+        return f"{model_size}-int8" if self.quantized else model_size
+
+    def get_model(self, model_size=None):
+        """상주 중인 모델을 반환 (지정하지 않으면 기본 모델)"""
+        model_size = model_size or self.model_size
+        if model_size not in self.models:
+            raise ValueError(f"Whisper model '{model_size}' is not loaded")
+        return self.models[model_size]
+
+    @staticmethod
+    def _quantize(model):
+        # whisper.model.Linear는 nn.Linear의 서브클래스라 quantize_dynamic의 기본 매핑에 잡히지 않음.
+        # CPU fp32에서는 동작이 같으므로 nn.Linear로 바꾼 뒤 동적 int8 양자화를 적용
+        for module in model.modules():
+            if isinstance(module, torch.nn.Linear):
+                module.__class__ = torch.nn.Linear
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    def warm_up(self):
+        """첫 요청의 지연을 줄이기 위해 상주 중인 모델마다 짧은 무음으로 한 번 추론하는 메서드"""
+        for model_size in self.models:
+            self._run_model(np.zeros(self.SAMPLE_RATE, dtype=np.float32), model_size)
+
+    def load_audio(self, audio_file):
+        """
+        오디오를 읽어 16kHz 모노 float32 배열로 변환하는 메서드
+        :param audio_file: 오디오 파일 경로, 바이트 버퍼 또는 파일 객체
+        :return: 16kHz 모노 float32 오디오
+        """
+        source, description = open_audio_source(audio_file)
+        logging.info(f"Attempting to transcribe {description}")
 
-    def transcribe_audio(self, audio_file):
+        # 오디오를 블록 단위로 읽으면서 모노/float32 변환과 리샘플링을 함께 수행
+        with sf.SoundFile(source) as f:
+            resampler = None
+            if f.samplerate != self.SAMPLE_RATE:
+                logging.info(f"Converting sample rate from {f.samplerate} to {self.SAMPLE_RATE}")
+                resampler = StreamingResampler(f.samplerate, self.SAMPLE_RATE)
+            chunks = []
+            for block in f.blocks(blocksize=Config.RESAMPLE_BLOCK_FRAMES, dtype='float32'):
+                chunks.append(resampler.process(block) if resampler else to_mono_float32(block))
+            if resampler:
+                chunks.append(resampler.flush())
+        return np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+
+    def _prepare_audio(self, audio, sample_rate):
+        # 모노 변환, 샘플 레이트 변환, float32 변환을 한 번에 수행
+        return resample(audio, sample_rate, self.SAMPLE_RATE)
+
+    def remove_silence(self, audio):
+        """
+        VAD로 무음 구간을 제거하는 메서드
+        :param audio: 16kHz 모노 float32 오디오
+        :return: (음성 구간만 남긴 오디오, 원본 시간으로 되돌리기 위한 오프셋 맵 또는 None)
+        """
+        if self.vad is None:
+            return audio, None
+        speech_audio, offset_map, stats = self.vad.apply(audio)
+        logging.info(f"VAD removed {stats['removed_seconds']:.1f}s of {stats['total_seconds']:.1f}s "
+                     f"({stats['removed_ratio']:.0%}), {stats['segments']} speech segments")
+        return speech_audio, offset_map
+
+    def lookup_transcript(self, audio, model_size=None):
+        """
+        정규화된 오디오로 캐시를 조회하는 메서드
+        :param audio: 16kHz 모노 float32 오디오
+        :param model_size: 변환에 사용할 모델 크기 (지정하지 않으면 기본 모델)
+        :return: (캐시 키, 캐시된 텍스트 또는 None)
+        """
+        if self.cache is None:
+            return None, None
+        key = self.cache.make_key(audio, self.tag_for(model_size))
+        text = self.cache.get(key)
+        if text is not None:
+            logging.info("Transcript cache hit, skipping inference")
+        return key, text
+
+    def store_transcript(self, key, text):
+        if self.cache is not None and key is not None:
+            self.cache.put(key, text)
+
+    def _transcribe_speech(self, audio, model_size=None, **options):
+        # 무음 제거 후 변환하고, 세그먼트 시간을 원본 오디오 기준으로 되돌림
+        audio, offset_map = self.remove_silence(audio)
+        if len(audio) == 0:
+            logging.info("No speech detected, skipping transcription")
+            return {"text": "", "segments": []}
+        result = self._run_model(audio, model_size, **options)
+        if offset_map is not None:
+            offset_map.remap_segments(result.get("segments", []))
+        return result
+
+    def _run_model(self, audio, model_size=None, **options):
+        model = self.get_model(model_size)
+        if self.device == "cpu":
+            with torch.no_grad():
+                return model.transcribe(audio, fp16=False, **options)
+        return model.transcribe(audio, **options)
+
+    def transcribe_audio(self, audio_file, model_size=None):
         try:
-            logging.info(f"Attempting to transcribe file: {audio_file}")
-            if not os.path.exists(audio_file):
-                raise FileNotFoundError(f"Audio file not found: {audio_file}")
-            
-            logging.info(f"File exists, size: {os.path.getsize(audio_file)} bytes")
-            
-            # 오디오 파일을 읽어서 numpy 배열로 변환
-            audio, sample_rate = sf.read(audio_file)
-            
-            # 스테레오를 모노로 변환 (필요한 경우)
-            if len(audio.shape) > 1:
-                audio = librosa.to_mono(audio.T)
-            
-            # 필요한 경우 샘플 레이트 변환
-            if sample_rate != 16000:
-                logging.info(f"Converting sample rate from {sample_rate} to 16000")
-                audio = librosa.resample(audio, orig_sr=sample_rate, target_sr=16000)
-            
-            # 데이터 타입을 float32로 명시적 변환
-            audio = audio.astype(np.float32)
-            
-            if self.device == "cpu":
-                with torch.no_grad():
-                    result = self.model.transcribe(audio, fp16=False)
-            else:
-                result = self.model.transcribe(audio)
-            
+            audio = self.load_audio(audio_file)
+            cache_key, cached_text = self.lookup_transcript(audio, model_size)
+            if cached_text is not None:
+                return cached_text
+
+            result = self._transcribe_speech(audio, model_size)
+
             logging.info("Transcription completed successfully")
+            self.store_transcript(cache_key, result["text"])
             return result["text"]
         except Exception as e:
             logging.error(f"Error occurred while transcribing audio: {str(e)}")
             logging.error(f"Full error: {traceback.format_exc()}")
-            return None
\ No newline at end of file
+            return None
+
+    def transcribe_stream(self, audio_file, chunk_seconds=None, overlap_seconds=None):
+        """
+        긴 녹음 파일을 고정 길이 구간으로 나누어 순차적으로 변환하는 제너레이터.
+        파일 전체를 메모리에 올리지 않고 soundfile 블록 단위로 읽으므로
+        녹음 길이와 관계없이 메모리 사용량이 일정합니다.
+        :param audio_file: 오디오 파일 경로, 바이트 버퍼 또는 파일 객체
+        :param chunk_seconds: 한 번에 변환할 구간 길이(초, 겹침 포함)
+        :param overlap_seconds: 인접 구간끼리 겹치는 길이(초)
+        :return: 구간별로 이어 붙인 부분 텍스트를 순서대로 yield
+        """
+        chunk_seconds = chunk_seconds or Config.STREAM_CHUNK_SECONDS
+        overlap_seconds = Config.STREAM_OVERLAP_SECONDS if overlap_seconds is None else overlap_seconds
+        if not 0 <= overlap_seconds < chunk_seconds:
+            raise ValueError("overlap_seconds must be in [0, chunk_seconds)")
+
+        source, description = open_audio_source(audio_file)
+        with sf.SoundFile(source) as f:
+            yield from self._transcribe_blocks(f, chunk_seconds, overlap_seconds, description)
+
+    def _transcribe_blocks(self, f, chunk_seconds, overlap_seconds, description):
+        sample_rate = f.samplerate
+        blocksize = int(chunk_seconds * sample_rate)
+        overlap = int(overlap_seconds * sample_rate)
+        step = blocksize - overlap
+        # 겹침 구간은 절반씩 나누어 앞/뒤 구간이 각각 담당
+        half_overlap = overlap_seconds / 2
+        logging.info(f"Streaming transcription of {description}: {f.frames / sample_rate:.1f}s, "
+                     f"chunk={chunk_seconds}s, overlap={overlap_seconds}s")
+
+        prompt = None
+        start = 0
+        for index, block in enumerate(f.blocks(blocksize=blocksize, overlap=overlap)):
+            is_first = index == 0
+            is_last = start + len(block) >= f.frames
+            audio = self._prepare_audio(block, sample_rate)
+            result = self._transcribe_speech(audio, initial_prompt=prompt)
+
+            chunk_duration = len(block) / sample_rate
+            left_cut = 0.0 if is_first else half_overlap
+            right_cut = float("inf") if is_last else chunk_duration - half_overlap
+            text = self._stitch_segments(result.get("segments", []), left_cut, right_cut)
+            if text:
+                # 다음 구간의 문맥 유지를 위해 직전 텍스트 일부를 프롬프트로 전달
+                prompt = text[-200:]
+                yield text
+
+            logging.debug(f"Chunk {index} transcribed ({start / sample_rate:.1f}s ~ {(start + len(block)) / sample_rate:.1f}s)")
+            if is_last:
+                break
+            start += step
+
+        logging.info("Streaming transcription completed successfully")
+
+    def _stitch_segments(self, segments, left_cut, right_cut):
+        # 구간 경계의 중복을 막기 위해 중간 시점이 [left_cut, right_cut) 안에 있는 세그먼트만 사용
+        kept = []
+        for segment in segments:
+            middle = (segment["start"] + segment["end"]) / 2
+            if left_cut <= middle < right_cut:
+                kept.append(segment["text"].strip())
+        return " ".join(s for s in kept if s)
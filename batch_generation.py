@@ -0,0 +1,471 @@
+"""
+실시간 응답이 필요 없는 학습 자료 생성 요청을 모아 야간에 한 번에 처리하는 배치 작업.
+API는 요청의 상위 문장과 단어를 대기열(JSON Lines)에 추가만 하고, 이 작업이 대기열 전체를
+배치 작업 파일(요청마다 한 줄)로 만들어 백엔드에 제출한 뒤 완료될 때까지 폴링하고,
+결과를 파싱하여 사용자별 결과 파일과 생성 결과 캐시에 저장합니다.
+요청마다 채팅 완성 API를 호출하는 것보다 비용이 적고 속도 제한(rate limit)을 받지 않습니다.
+
+백엔드:
+    openai: OpenAI Batch API (/v1/chat/completions, 24시간 완료 기한)
+    local: 같은 JSONL 형식을 로컬 디렉터리로 주고받는 대체 백엔드 (개발/시험용)
+
+실행 (프로젝트 루트에서, 야간에 주기적으로 실행):
+    python -m batch_generation
+    python -m batch_generation --backend local
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from config import Config
+from file_lock import FileLock
+
+# 백엔드가 더 이상 진행하지 않는 배치 상태
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+def _user_file(directory, user_id, suffix):
+    # 사용자 ID를 그대로 파일 이름으로 쓰지 않도록 해시 사용
+    return os.path.join(directory, hashlib.sha256(user_id.encode()).hexdigest() + suffix)
+
+def _write_json(path, data):
+    # 읽는 중인 파일이 깨지지 않도록 임시 파일에 쓴 뒤 교체
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+def _read_jsonl(path):
+    # 쓰는 도중 중단되어 잘린 줄은 건너뜀
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+class PendingGenerationQueue:
+    """
+    API 서버가 생성 요청을 추가하고, 배치 작업이 한꺼번에 가져가는 JSON Lines 대기열.
+    API 서버와 배치 작업은 서로 다른 프로세스이므로 추가와 가져가기는 잠금 파일(.lock)로 직렬화합니다.
+    """
+
+    def __init__(self, batch_dir=None):
+        """
+        :param batch_dir: 배치 생성 작업 디렉터리 (대기열 파일은 pending.jsonl)
+        """
+        self.batch_dir = batch_dir or Config.BATCH_GENERATION_DIR
+        self.path = os.path.join(self.batch_dir, 'pending.jsonl')
+        os.makedirs(self.batch_dir, exist_ok=True)
+        self._lock = FileLock(os.path.join(self.batch_dir, '.lock'))
+
+    def enqueue(self, user_id, sentences, words, now=None):
+        """
+        생성 요청 하나를 대기열에 추가하는 메서드
+        :param user_id: 사용자 식별자
+        :param sentences: (문장, 빈도) 튜플 리스트
+        :param words: (단어, 빈도) 튜플 리스트
+        :param now: 요청 시각 (기본값은 현재 시각)
+        :return: 요청 식별자 (결과 조회 시 사용)
+        """
+        record = {
+            "request_id": uuid.uuid4().hex,
+            "user_id": user_id,
+            "time": time.time() if now is None else now,
+            "sentences": [list(sentence) for sentence in sentences],
+            "words": [list(word) for word in words],
+        }
+        self.extend([record])
+        return record["request_id"]
+
+    def extend(self, records):
+        """요청 레코드를 그대로 대기열에 추가하는 메서드 (실패한 요청을 다음 실행으로 넘길 때 사용)"""
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def take(self, destination):
+        """
+        대기열 파일을 통째로 작업 디렉터리로 옮기는 메서드 (이후 요청은 새 대기열 파일에 쌓임)
+        :param destination: 옮길 파일 경로
+        :return: 옮긴 요청 레코드 리스트 (대기열이 비어 있으면 빈 리스트)
+        """
+        with self._lock:
+            try:
+                os.replace(self.path, destination)
+            except FileNotFoundError:
+                return []
+        return list(_read_jsonl(destination))
+
+class BatchResultStore:
+    """배치 작업이 만든 학습 자료를 사용자별 JSON 파일로 저장하고 API에서 읽는 저장소"""
+
+    def __init__(self, batch_dir=None, max_items=None):
+        """
+        :param batch_dir: 배치 생성 작업 디렉터리 (결과는 results/<사용자 해시>.json)
+        :param max_items: 사용자별로 보관할 최근 결과 수
+        """
+        self.results_dir = os.path.join(batch_dir or Config.BATCH_GENERATION_DIR, 'results')
+        self.max_items = max_items or Config.BATCH_GENERATION_RESULTS_PER_USER
+        os.makedirs(self.results_dir, exist_ok=True)
+
+    def save(self, user_id, request_id, material, now=None):
+        """
+        요청 하나의 생성 결과를 사용자 결과 파일에 추가하는 메서드
+        :param user_id: 사용자 식별자
+        :param request_id: 대기열에 추가할 때 받은 요청 식별자
+        :param material: 학습 자료 딕셔너리
+        :param now: 완료 시각 (기본값은 현재 시각)
+        """
+        items = [item for item in self.user_materials(user_id) if item["request_id"] != request_id]
+        items.append({"request_id": request_id, "completed_at": time.time() if now is None else now, "material": material})
+        _write_json(_user_file(self.results_dir, user_id, '.json'), {"materials": items[-self.max_items:]})
+
+    def user_materials(self, user_id):
+        """
+        사용자의 배치 생성 결과를 반환하는 메서드
+        :return: {"request_id", "completed_at", "material"} 딕셔너리 리스트 (오래된 순)
+        """
+        try:
+            with open(_user_file(self.results_dir, user_id, '.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)["materials"]
+        except FileNotFoundError:
+            return []
+
+class OpenAIBatchBackend:
+    """OpenAI Batch API 백엔드 (입력 파일 업로드 -> 배치 생성 -> 상태 확인 -> 출력/오류 파일 다운로드)"""
+
+    name = "openai"
+
+    def __init__(self, client):
+        """
+        :param client: 동기 OpenAI 클라이언트
+        """
+        self.client = client
+
+    def submit(self, input_path):
+        """
+        배치 작업 파일을 제출하는 메서드
+        :param input_path: 요청 JSONL 파일 경로
+        :return: 배치 식별자
+        """
+        with open(input_path, 'rb') as f:
+            uploaded = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(input_file_id=uploaded.id, endpoint="/v1/chat/completions",
+                                           completion_window="24h")
+        return batch.id
+
+    def status(self, batch_id):
+        """배치 상태 문자열을 반환 (validating, in_progress, finalizing, completed, failed, expired, cancelled 등)"""
+        return self.client.batches.retrieve(batch_id).status
+
+    def download(self, batch_id, output_path):
+        """
+        완료된(또는 만료된) 배치의 출력과 오류 파일을 하나의 JSONL 파일로 내려받는 메서드
+        (만료된 배치도 기한 안에 끝난 요청의 결과는 출력 파일에 있음)
+        """
+        batch = self.client.batches.retrieve(batch_id)
+        with open(output_path, 'wb') as f:
+            for file_id in (batch.output_file_id, batch.error_file_id):
+                if file_id:
+                    f.write(self.client.files.content(file_id).content)
+
+class LocalBatchBackend:
+    """
+    OpenAI Batch API와 같은 JSONL 형식을 로컬 디렉터리로 주고받는 대체 백엔드 (개발/시험용).
+    제출한 파일을 <디렉터리>/<배치 식별자>/input.jsonl로 복사하고, 같은 디렉터리에 output.jsonl이 생기면 완료로 봅니다.
+    responder를 주면 상태를 확인할 때 각 요청에 직접 응답하여 output.jsonl을 만들고,
+    없으면 다른 프로세스가 output.jsonl을 써 줄 때까지 진행 중으로 남습니다.
+    """
+
+    name = "local"
+
+    def __init__(self, directory=None, responder=None):
+        """
+        :param directory: 배치 입력/출력 파일을 둘 디렉터리
+        :param responder: 요청 본문(body)을 받아 채팅 완성 응답 딕셔너리를 반환하는 함수
+        """
+        self.directory = directory or os.path.join(Config.BATCH_GENERATION_DIR, 'local_backend')
+        self.responder = responder
+        os.makedirs(self.directory, exist_ok=True)
+
+    def submit(self, input_path):
+        batch_id = f"batch_{uuid.uuid4().hex}"
+        os.makedirs(os.path.join(self.directory, batch_id))
+        shutil.copyfile(input_path, os.path.join(self.directory, batch_id, 'input.jsonl'))
+        return batch_id
+
+    def status(self, batch_id):
+        batch_dir = os.path.join(self.directory, batch_id)
+        if not os.path.isdir(batch_dir):
+            return "failed"
+        if not os.path.exists(os.path.join(batch_dir, 'output.jsonl')):
+            if self.responder is None:
+                return "in_progress"
+            self._respond(batch_dir)
+        return "completed"
+
+    def download(self, batch_id, output_path):
+        shutil.copyfile(os.path.join(self.directory, batch_id, 'output.jsonl'), output_path)
+
+    def _respond(self, batch_dir):
+        lines = []
+        for number, request in enumerate(_read_jsonl(os.path.join(batch_dir, 'input.jsonl'))):
+            line = {"id": f"batch_req_{number}", "custom_id": request["custom_id"], "response": None, "error": None}
+            try:
+                line["response"] = {"status_code": 200, "body": self.responder(request["body"])}
+            except Exception as e:
+                line["error"] = {"code": type(e).__name__, "message": str(e)}
+            lines.append(json.dumps(line, ensure_ascii=False))
+        # 출력 파일이 생기는 순간 완료로 보이므로 다 쓴 뒤 교체
+        fd, temp_path = tempfile.mkstemp(dir=batch_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(''.join(line + '\n' for line in lines))
+        os.replace(temp_path, os.path.join(batch_dir, 'output.jsonl'))
+
+def create_backend(name, client):
+    """
+    설정 이름으로 배치 백엔드를 만드는 함수
+    :param name: "openai" 또는 "local" (local은 동기 클라이언트로 요청을 하나씩 처리하여 응답)
+    :param client: 동기 OpenAI 클라이언트
+    """
+    if name == "openai":
+        return OpenAIBatchBackend(client)
+    if name == "local":
+        return LocalBatchBackend(responder=lambda body: client.chat.completions.create(**body).model_dump())
+    raise ValueError(f"Unknown batch generation backend: {name}")
+
+class BatchGenerationJob:
+    """
+    대기열의 생성 요청을 배치로 제출하고 결과를 사용자에게 돌려주는 작업.
+    작업마다 jobs/<작업 식별자>/ 디렉터리에 가져온 대기열(pending.jsonl), 제출 파일(requests.jsonl),
+    custom_id와 요청의 대응(manifest.json), 진행 상태(state.json), 결과(output.jsonl)를 남기므로
+    폴링 도중 중단되어도 다음 실행에서 이어서 처리합니다. 결과를 수집한 작업의 디렉터리는 삭제합니다.
+    """
+
+    def __init__(self, generator, backend, batch_dir=None, queue=None, results=None):
+        """
+        :param generator: 요청 본문 생성, 결과 파싱, 캐시에 사용할 EnglishMaterialGenerator
+        :param backend: 배치 백엔드 (OpenAIBatchBackend 또는 LocalBatchBackend)
+        :param batch_dir: 배치 생성 작업 디렉터리
+        :param queue: 생성 요청 대기열
+        :param results: 사용자별 결과 저장소
+        """
+        self.generator = generator
+        self.backend = backend
+        self.batch_dir = batch_dir or Config.BATCH_GENERATION_DIR
+        self.jobs_dir = os.path.join(self.batch_dir, 'jobs')
+        self.queue = queue or PendingGenerationQueue(self.batch_dir)
+        self.results = results or BatchResultStore(self.batch_dir)
+        os.makedirs(self.jobs_dir, exist_ok=True)
+
+    def run(self, poll_seconds=None, max_wait=None):
+        """
+        이전 실행에서 끝나지 않은 작업을 먼저 이어서 처리하고, 대기열의 새 요청으로 작업을 만들어 처리하는 메서드
+        :param poll_seconds: 상태 확인 간격(초)
+        :param max_wait: 작업 하나의 완료를 기다리는 최대 시간(초), 넘으면 다음 실행에서 이어서 확인
+        """
+        for job_id in sorted(os.listdir(self.jobs_dir)):
+            state = self.load_state(job_id)
+            if state is None or state["status"] == "preparing":
+                # 다른 프로세스가 지금 준비 중인 작업일 수 있으므로 오래 변경이 없는 작업만 중단된 것으로 처리
+                if not self.is_abandoned(job_id):
+                    continue
+                # 대기열을 가져온 뒤 작업 파일을 만들기 전에 중단된 작업: 요청을 대기열에 돌려놓음
+                pending_path = os.path.join(self.jobs_dir, job_id, 'pending.jsonl')
+                if os.path.exists(pending_path):
+                    self.queue.extend(_read_jsonl(pending_path))
+                shutil.rmtree(os.path.join(self.jobs_dir, job_id))
+                logging.info(f"Returned requests of unfinished batch generation job {job_id} to the queue")
+            elif state["status"] == "collected":
+                # 결과를 수집한 뒤 디렉터리를 지우기 전에 중단된 작업
+                self.prune(job_id)
+            else:
+                if state["backend"] != self.backend.name:
+                    logging.warning(f"Skipping batch generation job {job_id} submitted to {state['backend']} backend")
+                    continue
+                logging.info(f"Resuming batch generation job {job_id} ({state['status']})")
+                self.process(job_id, poll_seconds, max_wait)
+        job_id = self.prepare()
+        if job_id is not None:
+            self.process(job_id, poll_seconds, max_wait)
+
+    def process(self, job_id, poll_seconds=None, max_wait=None):
+        """준비된 작업을 제출하고, 완료될 때까지 기다린 뒤 결과를 수집하는 메서드"""
+        state = self.load_state(job_id)
+        if state["status"] == "prepared":
+            state = self.submit(job_id)
+        if state["status"] == "submitted":
+            status = self.wait(job_id, poll_seconds, max_wait)
+            if status in TERMINAL_STATUSES:
+                self.collect(job_id, status)
+
+    def prepare(self, now=None):
+        """
+        대기열을 가져와 배치 작업 파일을 만드는 메서드
+        캐시에 있는 요청은 바로 결과로 저장하고, 입력이 같은 요청은 하나로 묶어 한 번만 제출합니다.
+        :return: 작업 식별자 (제출할 요청이 없으면 None)
+        """
+        now = time.time() if now is None else now
+        job_id = time.strftime('%Y%m%d-%H%M%S', time.localtime(now)) + '-' + uuid.uuid4().hex[:8]
+        job_dir = os.path.join(self.jobs_dir, job_id)
+        os.makedirs(job_dir)
+        # 다른 프로세스의 run()이 준비 중인 디렉터리를 중단된 작업으로 보고 지우지 않도록 상태를 먼저 기록
+        self.save_state(job_id, {"status": "preparing", "backend": self.backend.name, "batch_id": None, "created": now})
+        records = self.queue.take(os.path.join(job_dir, 'pending.jsonl'))
+        if not records:
+            shutil.rmtree(job_dir)
+            return None
+
+        self.generator.refresh_prompt()
+        manifest = {}  # custom_id -> {"key": 캐시 키, "records": 대기열 레코드 리스트}
+        custom_ids = {}  # 캐시 키 -> custom_id
+        cached = 0
+        with open(os.path.join(job_dir, 'requests.jsonl'), 'w', encoding='utf-8') as f:
+            for record in records:
+                sentences = [tuple(sentence) for sentence in record["sentences"]]
+                words = [tuple(word) for word in record["words"]]
+                body = self.generator.build_request(sentences, words)
+                key = self.generator.cache_key(body)
+                material = self.generator.lookup_cache(key)
+                if material is not None:
+                    self.results.save(record["user_id"], record["request_id"], material)
+                    cached += 1
+                    continue
+                if key not in custom_ids:
+                    custom_ids[key] = f"request-{len(custom_ids)}"
+                    manifest[custom_ids[key]] = {"key": key, "records": []}
+                    request = {"custom_id": custom_ids[key], "method": "POST", "url": "/v1/chat/completions",
+                               "body": body}
+                    f.write(json.dumps(request, ensure_ascii=False) + '\n')
+                manifest[custom_ids[key]]["records"].append(record)
+
+        logging.info(f"Batch generation job {job_id} prepared: {len(records)} queued requests, "
+                     f"{cached} served from cache, {len(manifest)} to submit")
+        if not manifest:
+            # 모두 캐시에서 처리됨: 제출할 것이 없으므로 작업 디렉터리를 바로 삭제
+            self.prune(job_id)
+            return None
+        _write_json(os.path.join(job_dir, 'manifest.json'), manifest)
+        self.save_state(job_id, {"status": "prepared", "backend": self.backend.name, "batch_id": None, "created": now,
+                                 "records": len(records), "requests": len(manifest), "cached": cached})
+        return job_id
+
+    def submit(self, job_id):
+        """작업 파일을 백엔드에 제출하고 배치 식별자를 상태 파일에 기록하는 메서드"""
+        state = self.load_state(job_id)
+        state["batch_id"] = self.backend.submit(os.path.join(self.jobs_dir, job_id, 'requests.jsonl'))
+        state["status"] = "submitted"
+        state["submitted"] = time.time()
+        self.save_state(job_id, state)
+        logging.info(f"Batch generation job {job_id} submitted to {self.backend.name} as {state['batch_id']}")
+        return state
+
+    def wait(self, job_id, poll_seconds=None, max_wait=None):
+        """
+        배치가 끝날 때까지 상태를 확인하는 메서드
+        :return: 마지막으로 확인한 배치 상태
+        """
+        poll_seconds = Config.BATCH_GENERATION_POLL_SECONDS if poll_seconds is None else poll_seconds
+        max_wait = Config.BATCH_GENERATION_MAX_WAIT_SECONDS if max_wait is None else max_wait
+        batch_id = self.load_state(job_id)["batch_id"]
+        started = time.monotonic()
+        while True:
+            status = self.backend.status(batch_id)
+            if status in TERMINAL_STATUSES:
+                logging.info(f"Batch generation job {job_id} finished with status {status} "
+                             f"after {time.monotonic() - started:.0f}s of polling")
+                return status
+            if time.monotonic() - started + poll_seconds > max_wait:
+                logging.info(f"Batch generation job {job_id} still {status}, will check again on the next run")
+                return status
+            logging.debug(f"Batch generation job {job_id} is {status}")
+            time.sleep(poll_seconds)
+
+    def collect(self, job_id, status="completed"):
+        """
+        배치 결과를 파싱하여 사용자별 결과와 생성 결과 캐시에 저장하는 메서드
+        실패했거나 결과가 없는 요청(만료, 오류, 파싱 실패)은 다음 실행에서 다시 처리하도록 대기열에 돌려놓습니다.
+        :param status: 배치의 최종 상태
+        :return: {"succeeded", "failed"} 요청 수
+        """
+        job_dir = os.path.join(self.jobs_dir, job_id)
+        state = self.load_state(job_id)
+        with open(os.path.join(job_dir, 'manifest.json'), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        output_path = os.path.join(job_dir, 'output.jsonl')
+        if status != "failed":
+            self.backend.download(state["batch_id"], output_path)
+
+        succeeded = set()
+        for line in _read_jsonl(output_path) if os.path.exists(output_path) else []:
+            entry = manifest.get(line.get("custom_id"))
+            response = line.get("response") or {}
+            if entry is None or response.get("status_code") != 200:
+                if line.get("error"):
+                    logging.warning(f"Batch request {line.get('custom_id')} failed: {line['error']}")
+                continue
+            try:
+                content = response["body"]["choices"][0]["message"]["content"]
+                material, complete = self.generator.parse_material(content)
+            except Exception as e:
+                logging.warning(f"Batch request {line['custom_id']} returned unusable content: {str(e)}")
+                continue
+            self.generator.store_cache(entry["key"], material, complete)
+            for record in entry["records"]:
+                self.results.save(record["user_id"], record["request_id"], {**material, "cached": False})
+            succeeded.add(line["custom_id"])
+
+        failed = [record for custom_id, entry in manifest.items() if custom_id not in succeeded
+                  for record in entry["records"]]
+        # 계속 실패하는 요청이 매번 제출되지 않도록 시도 횟수를 제한
+        retried = [{**record, "attempts": record.get("attempts", 1) + 1} for record in failed
+                   if record.get("attempts", 1) < Config.BATCH_GENERATION_MAX_ATTEMPTS]
+        if retried:
+            self.queue.extend(retried)
+        state.update(status="collected", batch_status=status, succeeded=len(succeeded),
+                     failed=len(manifest) - len(succeeded), collected=time.time())
+        self.save_state(job_id, state)
+        logging.info(f"Batch generation job {job_id} collected: {len(succeeded)} succeeded, "
+                     f"{len(manifest) - len(succeeded)} failed ({len(retried)} of {len(failed)} queued requests returned to the queue)")
+        self.prune(job_id)
+        return {"succeeded": len(succeeded), "failed": len(manifest) - len(succeeded)}
+
+    def is_abandoned(self, job_id):
+        """준비 중(또는 상태 파일이 없는) 작업 디렉터리가 BATCH_GENERATION_PREPARE_TIMEOUT_SECONDS 동안 변경되지 않았는지 여부"""
+        try:
+            modified = os.path.getmtime(os.path.join(self.jobs_dir, job_id))
+        except FileNotFoundError:
+            return False
+        return time.time() - modified > Config.BATCH_GENERATION_PREPARE_TIMEOUT_SECONDS
+
+    def prune(self, job_id):
+        """결과를 수집한(또는 제출할 것이 없는) 작업의 디렉터리를 삭제하는 메서드"""
+        shutil.rmtree(os.path.join(self.jobs_dir, job_id), ignore_errors=True)
+
+    def load_state(self, job_id):
+        try:
+            with open(os.path.join(self.jobs_dir, job_id, 'state.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save_state(self, job_id, state):
+        _write_json(os.path.join(self.jobs_dir, job_id, 'state.json'), state)
+
+if __name__ == "__main__":
+    from english_material_generator import EnglishMaterialGenerator
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["openai", "local"], default=Config.BATCH_GENERATION_BACKEND)
+    parser.add_argument("--poll-seconds", type=float, default=Config.BATCH_GENERATION_POLL_SECONDS)
+    parser.add_argument("--max-wait", type=float, default=Config.BATCH_GENERATION_MAX_WAIT_SECONDS)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    generator = EnglishMaterialGenerator()
+    job = BatchGenerationJob(generator, create_backend(args.backend, generator.client))
+    job.run(args.poll_seconds, args.max_wait)
@@ -0,0 +1,214 @@
+import asyncio
+import dataclasses
+import logging
+import queue
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+import numpy as np
+import torch
+import whisper
+from config import Config
+from model_selector import ModelSizeSelector
+
+class WhisperBatchScheduler:
+    """
+    동시 요청의 Whisper 추론을 하나의 배치로 묶어 처리하는 스케줄러.
+    각 요청의 오디오를 말 사이에서 잘라 30초 이하의 mel 구간으로 나누어 큐에 넣으면, 전용 스레드가
+    최대 배치 크기 또는 최대 대기 시간에 도달할 때까지 구간을 모은 뒤
+    한 번의 인코더/디코더 호출로 처리하고 결과를 요청별 future로 돌려줍니다.
+    반복이나 환각으로 보이는 구간은 whisper.transcribe와 같은 기준으로 온도를 높여 다시 디코딩합니다.
+    부하 적응형 모드에서는 요청마다 모델 크기를 고르고, 배치 안에서 모델별로 나누어 디코딩합니다.
+    """
+
+    # whisper.transcribe의 기본 무음 판정 및 재시도 기준과 동일
+    NO_SPEECH_THRESHOLD = 0.6
+    LOGPROB_THRESHOLD = -1.0
+    COMPRESSION_RATIO_THRESHOLD = 2.4
+    TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+    BEST_OF = 5
+
+    def __init__(self, audio_processor, max_batch_size=None, max_wait_seconds=None, adaptive=None):
+        """
+        :param audio_processor: 모델과 오디오 전처리를 제공하는 AudioProcessor
+        :param max_batch_size: 한 번에 디코딩할 최대 구간 수
+        :param max_wait_seconds: 첫 구간 도착 후 배치를 채우기 위해 기다리는 최대 시간
+        :param adaptive: 요청마다 모델 크기를 선택할지 여부 (지정하지 않으면 Config 값 사용)
+        """
+        self.audio_processor = audio_processor
+        self.max_batch_size = max_batch_size or Config.BATCH_MAX_SIZE
+        self.max_wait_seconds = Config.BATCH_MAX_WAIT_SECONDS if max_wait_seconds is None else max_wait_seconds
+        self.options = whisper.DecodingOptions(fp16=audio_processor.device != "cpu", without_timestamps=True)
+        adaptive = Config.WHISPER_ADAPTIVE if adaptive is None else adaptive
+        self.selector = ModelSizeSelector() if adaptive else None
+        if self.selector is not None:
+            missing = [size for size in self.selector.sizes if size not in audio_processor.models]
+            if missing:
+                raise ValueError(f"Adaptive model sizes are not loaded: {missing}")
+        self._active_jobs = 0
+
+        self._queue = queue.Queue()
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="whisper-batch-scheduler", daemon=True)
+        self._worker.start()
+        logging.info(f"WhisperBatchScheduler started (max_batch_size={self.max_batch_size}, max_wait={self.max_wait_seconds}s)")
+
+    def prepare_segments(self, audio, model_size=None):
+        """
+        16kHz 오디오를 30초 이하의 log-mel 구간 리스트로 변환하는 메서드
+        :return: (log-mel 구간, 구간의 실제 오디오 길이(초)) 리스트
+        """
+        audio, offset_map = self.audio_processor.remove_silence(audio)
+        n_mels = self.audio_processor.get_model(model_size).dims.n_mels
+        segments = []
+        for start, end in self.chunk_bounds(audio, offset_map):
+            chunk = audio[start:end]
+            mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(chunk), n_mels=n_mels)
+            segments.append((mel, len(chunk) / self.audio_processor.SAMPLE_RATE))
+        return segments
+
+    def chunk_bounds(self, audio, offset_map=None):
+        """
+        오디오를 Whisper 입력 창(30초)을 넘지 않는 구간으로 나누는 메서드
+        구간 경계에 걸친 단어가 잘리지 않도록, 창 끝의 BATCH_CUT_SEARCH_SECONDS 안에서
+        VAD가 무음을 잘라내고 이어 붙인 지점(말 사이)이 있으면 그 중 가장 늦은 지점에서,
+        없으면(쉬지 않고 이어지는 말) 에너지가 가장 낮은 프레임에서 자릅니다.
+        :param audio: 무음을 제거한 16kHz 오디오
+        :param offset_map: remove_silence가 반환한 SpeechOffsetMap (VAD를 쓰지 않으면 None)
+        :return: (시작 샘플, 끝 샘플) 리스트
+        """
+        limit = whisper.audio.N_SAMPLES
+        search = min(limit, int(Config.BATCH_CUT_SEARCH_SECONDS * self.audio_processor.SAMPLE_RATE))
+        joins = offset_map.condensed_starts[1:] if offset_map is not None else np.zeros(0, dtype=np.int64)
+        frame = int(self.audio_processor.SAMPLE_RATE * Config.VAD_FRAME_MS / 1000)
+        bounds = []
+        start = 0
+        while len(audio) - start > limit:
+            window_start = start + limit - search
+            candidates = joins[(joins > window_start) & (joins <= start + limit)]
+            if len(candidates):
+                end = int(candidates[-1])
+            else:
+                window = audio[window_start:start + limit]
+                num_frames = len(window) // frame
+                energy = np.mean(window[:num_frames * frame].reshape(num_frames, frame) ** 2, axis=1)
+                end = window_start + int(np.argmin(energy)) * frame + frame // 2
+            bounds.append((start, end))
+            start = end
+        if start < len(audio):
+            bounds.append((start, len(audio)))
+        return bounds
+
+    def submit(self, mel, model_size=None, seconds=0.0):
+        """
+        mel 구간 하나를 배치 큐에 넣고 결과 텍스트를 받을 future를 반환
+        :param mel: 30초 log-mel 구간
+        :param model_size: 디코딩할 모델 크기 (지정하지 않으면 기본 모델)
+        :param seconds: 구간의 실제 오디오 길이 (모델별 RTF 측정용)
+        """
+        future = Future()
+        self._queue.put((mel, future, model_size or self.audio_processor.model_size, seconds))
+        return future
+
+    async def atranscribe(self, audio_file):
+        """
+        이벤트 루프를 막지 않고 오디오 파일을 텍스트로 변환하는 메서드
+        :param audio_file: 오디오 파일 경로, 바이트 버퍼 또는 파일 객체
+        :return: 변환된 텍스트 (실패 시 None)
+        """
+        self._active_jobs += 1
+        try:
+            loop = asyncio.get_running_loop()
+            audio = await loop.run_in_executor(None, self.audio_processor.load_audio, audio_file)
+            model_size = None
+            if self.selector is not None:
+                # 이 요청을 제외하고 처리 중인 요청 수를 대기열 길이로 사용
+                audio_seconds = len(audio) / self.audio_processor.SAMPLE_RATE
+                model_size = self.selector.choose(audio_seconds, self._active_jobs - 1)
+            cache_key, cached_text = self.audio_processor.lookup_transcript(audio, model_size)
+            if cached_text is not None:
+                return cached_text
+
+            segments = await loop.run_in_executor(None, self.prepare_segments, audio, model_size)
+            texts = await asyncio.gather(*(asyncio.wrap_future(self.submit(mel, model_size, seconds))
+                                           for mel, seconds in segments))
+            logging.info(f"Batched transcription completed ({len(segments)} segments)")
+            text = " ".join(text for text in texts if text)
+            self.audio_processor.store_transcript(cache_key, text)
+            return text
+        except Exception as e:
+            logging.error(f"Error occurred while transcribing audio: {str(e)}")
+            logging.error(f"Full error: {traceback.format_exc()}")
+            return None
+        finally:
+            self._active_jobs -= 1
+
+    def shutdown(self):
+        self._stopped.set()
+        self._worker.join()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                batch = [self._queue.get(timeout=0.1)]
+            except queue.Empty:
+                continue
+
+            # 최대 배치 크기 또는 최대 대기 시간까지 구간을 모음
+            deadline = time.monotonic() + self.max_wait_seconds
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._decode_batch(batch)
+
+    def _decode_batch(self, batch):
+        # 취소된 요청의 구간은 제외하고, 모델 크기별로 나누어 디코딩
+        groups = {}
+        for item in batch:
+            if item[1].set_running_or_notify_cancel():
+                groups.setdefault(item[2], []).append(item)
+        for model_size, group in groups.items():
+            self._decode_group(model_size, group)
+
+    def _decode_group(self, model_size, batch):
+        model = self.audio_processor.get_model(model_size)
+        started = time.perf_counter()
+        try:
+            mel_batch = torch.stack([mel for mel, *_ in batch]).to(model.device)
+            with torch.no_grad():
+                results = whisper.decode(model, mel_batch, self.options)
+                # 압축률이 높거나(반복) 확신도가 낮은 구간만 모아 온도를 높여 다시 디코딩
+                for temperature in self.TEMPERATURES[1:]:
+                    retry = [index for index, result in enumerate(results) if self._needs_fallback(result)]
+                    if not retry:
+                        break
+                    logging.debug(f"Re-decoding {len(retry)} segments at temperature {temperature}")
+                    options = dataclasses.replace(self.options, temperature=temperature, best_of=self.BEST_OF)
+                    for index, result in zip(retry, whisper.decode(model, mel_batch[retry], options)):
+                        results[index] = result
+        except Exception as e:
+            logging.error(f"Error occurred while decoding batch: {str(e)}")
+            for _, future, *_ in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future, *_), result in zip(batch, results):
+            is_silence = result.no_speech_prob > self.NO_SPEECH_THRESHOLD and result.avg_logprob < self.LOGPROB_THRESHOLD
+            future.set_result("" if is_silence else result.text.strip())
+        elapsed = time.perf_counter() - started
+        logging.debug(f"Decoded batch of {len(batch)} segments with '{model_size}' in {elapsed:.2f}s")
+        if self.selector is not None:
+            self.selector.record(model_size, sum(seconds for *_, seconds in batch), elapsed)
+
+    def _needs_fallback(self, result):
+        # whisper.transcribe의 decode_with_fallback과 같은 판정 (무음으로 보이는 구간은 재시도하지 않음)
+        if result.no_speech_prob > self.NO_SPEECH_THRESHOLD and result.avg_logprob < self.LOGPROB_THRESHOLD:
+            return False
+        return result.compression_ratio > self.COMPRESSION_RATIO_THRESHOLD or result.avg_logprob < self.LOGPROB_THRESHOLD
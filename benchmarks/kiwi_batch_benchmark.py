@@ -0,0 +1,90 @@
+"""
+TextProcessor.filter_text 형태소 분석 벤치마크.
+문장마다 kiwi.analyze를 호출하던 기존 경로와 모든 문장을 한 번에 넘기는
+배치 경로를 전사문 길이별로 비교하고, 두 경로의 결과가 같은지 확인합니다.
+
+실행 (프로젝트 루트에서):
+    python -m benchmarks.kiwi_batch_benchmark --sentences 100 1000 5000
+"""
+import argparse
+import random
+import time
+from text_processor import TextProcessor
+
+# 실제 전사문과 비슷한 구어체 문장 (문장 분리 규칙에 맞게 끝맺음)
+SAMPLE_SENTENCES = [
+    "오늘 아침에 회사 근처 카페에서 동료들과 회의 일정을 다시 정리했어요.",
+    "주말에는 가족들과 함께 시골 할머니 댁에 내려가서 김장을 도와드렸어.",
+    "요즘 날씨가 갑자기 추워져서 감기에 걸린 학생들이 많아졌다고 하더라.",
+    "새로 시작한 프로젝트 때문에 매일 늦게까지 자료를 찾아보고 있어요.",
+    "지난번에 추천해 준 책을 읽어 보니까 생각보다 훨씬 재미있었어.",
+    "그래서 다음 달에는 친구들이랑 제주도로 여행을 가기로 결정했어요.",
+    "버스를 놓쳐서 지하철을 탔는데 사람이 너무 많아서 힘들었어.",
+    "점심으로 먹은 김치찌개가 정말 맛있어서 다음에도 꼭 다시 가고 싶어요.",
+    "영어 회화 수업에서 선생님이 발음을 천천히 연습하라고 조언해 주셨어.",
+    "내일 발표 자료를 준비하느라 도서관에서 밤늦게까지 공부했어요!",
+    "그런데 갑자기 컴퓨터가 고장 나서 작성하던 보고서를 전부 잃어버렸어.",
+    "운동을 꾸준히 하니까 체력도 좋아지고 잠도 훨씬 잘 오는 것 같아요.",
+    "혹시 이번 주 금요일 저녁에 시간 괜찮으면 같이 영화 보러 갈래?",
+    "부모님께서 새로 이사한 집을 보시고 아주 마음에 든다고 하셨어요.",
+    "시험 기간이라서 친구들과 스터디 카페에서 문제를 풀면서 공부했어.",
+    "회사에서 새로운 업무 시스템을 도입해서 사용법을 배우는 중이에요.",
+]
+
+def build_transcript(num_sentences, seed=0):
+    # 분석 캐시/중복 제거의 영향을 빼기 위해 예문의 어절을 섞어 서로 다른 문장을 만듦
+    rng = random.Random(seed)
+    words = sorted({word.strip(".!?") for sentence in SAMPLE_SENTENCES for word in sentence.split()})
+    return " ".join(" ".join(rng.sample(words, rng.randint(6, 12))) + rng.choice(["요.", "어.", "다!"])
+                    for _ in range(num_sentences))
+
+def sequential_filter(processor, text):
+    """배치 분석 도입 전의 문장별 분석 경로"""
+    filtered_sentences = []
+    filtered_words = []
+    for sentence in processor.split_sentences(text):
+        if not any(profanity in sentence for profanity in processor.profanities):
+            normalized_sentence = processor.normalize_korean(sentence)
+            morphs = processor.kiwi.analyze(normalized_sentence)
+            valid_words = [token.lemma for token in morphs[0][0]
+                           if processor.is_valid_word(token.form, token.tag)
+                           and token.lemma not in processor.korean_stopwords
+                           and token.lemma not in processor.common_names
+                           and len(token.lemma) > 1]
+            if len(valid_words) >= 3:
+                filtered_sentences.append(normalized_sentence)
+                filtered_words.extend(valid_words)
+    return filtered_sentences, filtered_words
+
+def batched_filter(processor, text):
+    # 반복 측정 시 문장 분석 캐시에 적중하지 않도록 비움
+    processor.analysis_cache.clear()
+    return processor.filter_text(text)
+
+def measure(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output = func()
+        best = min(best, time.perf_counter() - started)
+    return best, output
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sentences", type=int, nargs="+", default=[100, 1000, 5000], help="전사문 문장 수")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    processor = TextProcessor()
+    processor.filter_text(SAMPLE_SENTENCES[0])  # Kiwi 초기 로드 시간 제외
+    print(f"Kiwi num_workers={processor.kiwi.num_workers}")
+    print(f"{'sentences':>10s} {'per-sentence':>13s} {'batched':>10s} {'speed-up':>9s}  identical")
+    for num_sentences in args.sentences:
+        text = build_transcript(num_sentences)
+        sequential, expected = measure(lambda: sequential_filter(processor, text), args.repeat)
+        batched, actual = measure(lambda: batched_filter(processor, text), args.repeat)
+        print(f"{num_sentences:10d} {sequential * 1000:10.1f} ms {batched * 1000:7.1f} ms "
+              f"{sequential / batched:8.2f}x  {actual == expected}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+학습 자료 응답 복구 파서 벤치마크.
+기존 extract_json + json.loads / partial_json_parse 경로와 material_stream.recover_material을
+1) 잘못된 응답 회귀 코퍼스(benchmarks/material_corpus.jsonl)의 복구 항목 수,
+2) 정상 응답을 무작위로 자르고 훼손한 퍼징 입력에서의 예외/잘못된 항목 여부,
+3) 응답 길이별 처리량으로 비교합니다.
+
+실행 (프로젝트 루트에서):
+    python -m benchmarks.material_parser_benchmark --entries 30 300 3000 --fuzz 2000
+"""
+import argparse
+import json
+import os
+import random
+import re
+import time
+from material_stream import recover_material
+
+CORPUS_FILE = os.path.join(os.path.dirname(__file__), "material_corpus.jsonl")
+
+def legacy_extract_json(content):
+    """기존 EnglishMaterialGenerator.extract_json"""
+    json_start = content.find('{')
+    json_end = content.rfind('}') + 1
+    if json_start != -1 and json_end != -1:
+        json_content = content[json_start:json_end]
+        if json_content.count('{') > json_content.count('}'):
+            json_content += '}'
+        elif json_content.count('{') < json_content.count('}'):
+            json_content = '{' + json_content
+        return json_content
+    raise ValueError("No valid JSON found in the response")
+
+def legacy_partial_json_parse(json_str):
+    """기존 EnglishMaterialGenerator.partial_json_parse"""
+    dialogue_match = re.search(r'"dialogue":\s*\[(.*?)\]', json_str, re.DOTALL)
+    vocabulary_match = re.search(r'"vocabulary":\s*\[(.*?)\]', json_str, re.DOTALL)
+    results = {"dialogue": [], "vocabulary": []}
+    for section, match in (("dialogue", dialogue_match), ("vocabulary", vocabulary_match)):
+        if match:
+            for item in re.findall(r'\{(.*?)\}', match.group(1), re.DOTALL):
+                try:
+                    results[section].append(json.loads('{' + item + '}'))
+                except Exception:
+                    pass
+    return results
+
+def legacy_parse(content):
+    """기존 parse_material 경로 (실패 시 빈 결과)"""
+    try:
+        json_content = legacy_extract_json(content)
+        try:
+            material = json.loads(json_content)
+        except json.JSONDecodeError:
+            material = legacy_partial_json_parse(json_content)
+        if not isinstance(material, dict) or 'dialogue' not in material or 'vocabulary' not in material:
+            raise ValueError("Invalid material structure")
+        return material
+    except Exception:
+        return {"dialogue": [], "vocabulary": []}
+
+def recover(content):
+    return recover_material(content)[0]
+
+def counts(material):
+    return {section: len(material.get(section) or []) for section in ("dialogue", "vocabulary")}
+
+def run_corpus():
+    print(f"{'case':32s} {'expected':>9s} {'legacy':>9s} {'recover':>9s}")
+    totals = {"expected": 0, "legacy": 0, "recover": 0}
+    passed = 0
+    with open(CORPUS_FILE, 'r', encoding='utf-8') as f:
+        cases = [json.loads(line) for line in f]
+    for case in cases:
+        expected = case["expected"]
+        legacy, recovered = counts(legacy_parse(case["content"])), counts(recover(case["content"]))
+        passed += recovered == expected
+        for name, value in (("expected", expected), ("legacy", legacy), ("recover", recovered)):
+            totals[name] += sum(value.values())
+        print(f"{case['name']:32s} {expected['dialogue']:4d}/{expected['vocabulary']:<4d} "
+              f"{legacy['dialogue']:4d}/{legacy['vocabulary']:<4d} {recovered['dialogue']:4d}/{recovered['vocabulary']:<4d}")
+    print(f"entries recovered: legacy {totals['legacy']}/{totals['expected']}, "
+          f"recover {totals['recover']}/{totals['expected']} ({passed}/{len(cases)} cases exact)")
+    return cases
+
+def build_response(num_entries, seed=0):
+    rng = random.Random(seed)
+    dialogue = [{"speaker": "AB"[i % 2],
+                 "english": f"Line {i}: I'd say it's \"quite\" {rng.choice(['remarkable', 'tedious', 'serene'])} [really].",
+                 "korean": f"{i}번째 문장: 정말 {rng.choice(['놀라운', '지루한', '평온한'])} {{일}}이에요."}
+                for i in range(num_entries)]
+    vocabulary = [{"word": f"word{i}", "part_of_speech": "noun", "meaning": f"뜻 {i}"} for i in range(num_entries)]
+    material = {"dialogue": dialogue, "vocabulary": vocabulary}
+    return "```json\n" + json.dumps(material, ensure_ascii=False, indent=2) + "\n```", material
+
+def run_fuzz(num_inputs, seed=0):
+    # 자르기, 문자 삭제, 구조 문자 삽입으로 훼손한 응답에서 예외 없이 원래 항목만 복구되는지 확인
+    content, material = build_response(20, seed)
+    known = {json.dumps(entry, sort_keys=True) for section in material.values() for entry in section}
+    rng = random.Random(seed)
+    errors = invalid = recovered = altered = truncated_only_altered = 0
+    for _ in range(num_inputs):
+        mutated = content[:rng.randint(0, len(content))]
+        mutations = rng.randint(0, 3)
+        for _ in range(mutations):
+            position = rng.randint(0, max(len(mutated) - 1, 0))
+            if rng.random() < 0.5:
+                mutated = mutated[:position] + mutated[position + 1:]
+            else:
+                mutated = mutated[:position] + rng.choice('{}[]",:\\\n') + mutated[position:]
+        try:
+            result = recover(mutated)
+        except Exception:
+            errors += 1
+            continue
+        for section in result.values():
+            recovered += len(section)
+            invalid += sum(not isinstance(entry, dict) for entry in section)
+            # 훼손된 문자가 항목 안에 있으면 값이 달라진 항목이 나올 수 있으나, 자르기만 한 입력에서는 없어야 함
+            changed = sum(json.dumps(entry, sort_keys=True) not in known for entry in section)
+            altered += changed
+            if not mutations:
+                truncated_only_altered += changed
+    print(f"fuzz: {num_inputs} inputs, {errors} exceptions, {invalid} non-object entries, {recovered} entries recovered "
+          f"({altered} altered by mutations, {truncated_only_altered} altered by truncation alone)")
+
+def measure(func, content, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(content)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, nargs="+", default=[30, 300, 3000], help="응답의 섹션별 항목 수")
+    parser.add_argument("--fuzz", type=int, default=2000, help="퍼징 입력 수")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    run_corpus()
+    print()
+    run_fuzz(args.fuzz)
+    print()
+    print(f"{'entries':>8s} {'input':>9s} {'mode':>10s} {'legacy':>10s} {'recover':>10s}  legacy/recover entries")
+    for num_entries in args.entries:
+        content, _ = build_response(num_entries)
+        for mode, text in (("complete", content), ("truncated", content[:len(content) * 9 // 10])):
+            legacy = measure(legacy_parse, text, args.repeat)
+            recovered = measure(recover, text, args.repeat)
+            legacy_count, recover_count = sum(counts(legacy_parse(text)).values()), sum(counts(recover(text)).values())
+            print(f"{num_entries:8d} {len(text) / 1024:6.0f} KB {mode:>10s} {len(text) / legacy / 2**20:6.1f} MB/s "
+                  f"{len(text) / recovered / 2**20:6.1f} MB/s  {legacy_count}/{recover_count}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+비슷한 문장 묶기 벤치마크.
+조사/어미만 다른 변형 문장을 섞은 합성 전사문에서 MinHash/LSH 클러스터링의
+문장 수별 처리 시간을 측정하고, 작은 입력에서는 모든 쌍의 자카드 유사도를 직접 비교하는
+방식과 시간 및 묶음 일치도(모든 쌍 비교 결과 대비 문장 쌍 정밀도/재현율)를 비교합니다.
+조사 하나만 다른 짧은 구어 문장이 실제로 묶이는지(관련 없는 문장은 묶이지 않는지)와
+긴 문장의 서명 계산 최대 메모리 사용량도 확인합니다.
+
+실행 (프로젝트 루트에서):
+    python -m benchmarks.near_duplicate_benchmark --sentences 1000 10000 100000
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from itertools import combinations
+from near_duplicates import MinHashLSH
+
+SUBJECTS = ["오늘 아침에 {}", "어제 저녁에 {}", "주말에는 {}", "점심시간에 {}", "퇴근하고 나서 {}", "방학 동안 {}"]
+PLACES = ["회사 근처 카페에서", "학교 도서관에서", "집 앞 공원에서", "시골 할머니 댁에서", "새로 생긴 식당에서", "지하철 안에서"]
+PEOPLE = ["동료들과", "친구들이랑", "가족들과 함께", "동생하고", "선생님과", "혼자서"]
+ACTIONS = ["회의 일정을 다시 정리했어요", "영어 단어를 외웠어", "김치찌개를 먹었어요", "영화를 봤는데 재미있었어",
+           "발표 자료를 준비했어요", "운동을 꾸준히 했어"]
+# 원문의 의미는 유지하고 조사/표현만 바꾸는 변형
+VARIANTS = [("들과", "와"), ("에서", "서"), ("했어요", "했어"), ("이랑", "랑"), ("는", "은"), ("을", "를")]
+
+def build_sentences(num_sentences, num_templates, seed=0):
+    rng = random.Random(seed)
+    templates = []
+    while len(templates) < num_templates:
+        template = rng.choice(SUBJECTS).format(" ".join([rng.choice(PLACES), rng.choice(PEOPLE), rng.choice(ACTIONS)]))
+        template += " " + str(len(templates))  # 원문끼리는 서로 구분되도록 번호를 붙임
+        templates.append(template)
+    sentences = []
+    for _ in range(num_sentences):
+        sentence = rng.choice(templates)
+        old, new = rng.choice(VARIANTS)
+        if rng.random() < 0.5:
+            sentence = sentence.replace(old, new, 1)
+        sentences.append(sentence)
+    return sentences
+
+# 조사 하나만 다른 짧은 구어 문장 (같은 묶음이어야 함)
+SHORT_VARIANTS = [
+    ("오늘 친구와 공원에서 산책을 했어요", "오늘 친구랑 공원에서 산책을 했어요"),
+    ("밥 먹었어요", "밥은 먹었어요"),
+    ("회의가 너무 길었어요", "회의는 너무 길었어요"),
+    ("내일 회의가 있어요", "내일 회의는 있어요"),
+    ("커피 마셨어", "커피를 마셨어"),
+    ("주말에 영화 봤어요", "주말엔 영화를 봤어요"),
+]
+# 짧지만 내용이 다른 문장 (묶이면 안 됨)
+SHORT_UNRELATED = [
+    ("밥 먹었어요", "밥 샀어요"),
+    ("오늘 친구와 공원에서 산책을 했어요", "오늘 회사에서 회의를 했어요"),
+    ("회의가 너무 길었어요", "영화가 너무 길었어요"),
+    ("커피 마셨어", "물 마셨어"),
+    ("내일 회의가 있어요", "내일 약속이 있어요"),
+    ("주말에 영화 봤어요", "주말에 친구 만났어요"),
+]
+
+def check_short_variants(clusterer):
+    """짧은 조사 변형 쌍이 묶이고 관련 없는 쌍은 따로 남는지 확인"""
+    def grouped(pair):
+        return len(clusterer.cluster(list(pair))) == 1
+
+    def jaccard(pair):
+        a, b = clusterer.grams(pair[0]), clusterer.grams(pair[1])
+        return len(a & b) / len(a | b)
+
+    for label, pairs, expected in (("variant", SHORT_VARIANTS, True), ("unrelated", SHORT_UNRELATED, False)):
+        for pair in pairs:
+            status = "ok" if grouped(pair) == expected else "WRONG"
+            print(f"  {label:9s} {status:5s} jaccard {jaccard(pair):.2f}  {pair[0]} / {pair[1]}")
+    variants = sum(grouped(pair) for pair in SHORT_VARIANTS)
+    unrelated = sum(not grouped(pair) for pair in SHORT_UNRELATED)
+    print(f"short particle variants grouped: {variants}/{len(SHORT_VARIANTS)}, "
+          f"unrelated pairs kept apart: {unrelated}/{len(SHORT_UNRELATED)}")
+
+def measure_signature_memory(clusterer, num_sentences, length, seed=0):
+    """긴 문장의 서명 계산 중 최대 메모리 사용량(MiB)"""
+    rng = random.Random(seed)
+    syllables = "가나다라마바사아자차카타파하오늘회사친구주말여행음식"
+    sentences = ["".join(rng.choice(syllables) for _ in range(length)) for _ in range(num_sentences)]
+    tracemalloc.start()
+    clusterer.signatures(sentences)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2**20
+
+def brute_force_groups(sentences, threshold, clusterer):
+    """모든 서로 다른 문장 쌍의 자카드 유사도를 직접 계산하여 묶음 (O(n^2))"""
+    unique = list(dict.fromkeys(sentences))
+    shingles = [clusterer.grams(sentence) for sentence in unique]
+    parent = list(range(len(unique)))
+
+    def find(index):
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    for i, j in combinations(range(len(unique)), 2):
+        if len(shingles[i] & shingles[j]) / len(shingles[i] | shingles[j]) >= threshold:
+            parent[find(j)] = find(i)
+    return {sentence: find(index) for index, sentence in enumerate(unique)}
+
+def pair_scores(groups, expected_groups):
+    """모든 쌍 비교로 만든 묶음을 정답으로 본 서로 다른 문장 쌍 기준의 정밀도/재현율"""
+    true_positive = false_positive = false_negative = 0
+    for a, b in combinations(list(expected_groups), 2):
+        same_group, expected = groups[a] == groups[b], expected_groups[a] == expected_groups[b]
+        true_positive += same_group and expected
+        false_positive += same_group and not expected
+        false_negative += expected and not same_group
+    precision = true_positive / max(true_positive + false_positive, 1)
+    recall = true_positive / max(true_positive + false_negative, 1)
+    return precision, recall
+
+def lsh_groups(clusterer, sentences):
+    return {member: index for index, (_, _, members) in enumerate(clusterer.cluster(sentences)) for member in members}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sentences", type=int, nargs="+", default=[1000, 10000, 100000], help="전사문 문장 수")
+    parser.add_argument("--threshold", type=float, default=None, help="자카드 유사도 임계값 (기본값은 Config)")
+    parser.add_argument("--brute-force-limit", type=int, default=2000, help="모든 쌍 비교를 실행할 최대 문장 수")
+    parser.add_argument("--memory-sentences", type=int, default=10000, help="메모리 측정에 사용할 긴 문장 수")
+    parser.add_argument("--memory-length", type=int, default=150, help="메모리 측정에 사용할 문장 길이(글자)")
+    args = parser.parse_args()
+
+    clusterer = MinHashLSH(threshold=args.threshold)
+    print(f"threshold={clusterer.threshold}, num_perm={clusterer.num_perm}, bands={clusterer.bands}x{clusterer.rows}, "
+          f"shingle_size={clusterer.shingle_size}, strip_particles={clusterer.strip_particles}")
+    check_short_variants(clusterer)
+    peak = measure_signature_memory(clusterer, args.memory_sentences, args.memory_length)
+    print(f"signature peak memory for {args.memory_sentences} sentences of {args.memory_length} chars: {peak:.1f} MiB")
+    print()
+    print(f"{'sentences':>10s} {'unique':>7s} {'clusters':>9s} {'LSH':>10s} {'pairwise':>10s}  LSH precision/recall")
+    for num_sentences in args.sentences:
+        sentences = build_sentences(num_sentences, max(num_sentences // 20, 5))
+        unique = len(set(sentences))
+
+        started = time.perf_counter()
+        clusters = clusterer.cluster(sentences)
+        lsh_elapsed = time.perf_counter() - started
+
+        pairwise = score = "-"
+        if unique <= args.brute_force_limit:
+            started = time.perf_counter()
+            expected_groups = brute_force_groups(sentences, clusterer.threshold, clusterer)
+            pairwise = f"{(time.perf_counter() - started) * 1000:7.1f} ms"
+            precision, recall = pair_scores(lsh_groups(clusterer, sentences), expected_groups)
+            score = f"{precision:.3f}/{recall:.3f}"
+        print(f"{num_sentences:10d} {unique:7d} {len(clusters):9d} {lsh_elapsed * 1000:7.1f} ms {pairwise:>10s}  {score}")
+
+if __name__ == "__main__":
+    main()
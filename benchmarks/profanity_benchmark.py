@@ -0,0 +1,66 @@
+"""
+비속어 필터 벤치마크.
+문장마다 모든 비속어를 부분 문자열로 검사하던 기존 방식(any(p in sentence))과
+aho_corasick.py 오토마톤의 한 번의 선형 탐색을 비교합니다.
+실제 fword_list.txt와 합성한 대용량 패턴 목록, 짧은/긴 전사문을 조합해 측정합니다.
+
+실행 (프로젝트 루트에서):
+    python -m benchmarks.profanity_benchmark --patterns 10000 50000 --sentences 1000 20000
+"""
+import argparse
+import random
+import time
+from aho_corasick import AhoCorasick
+from config import Config
+
+HANGUL_START, HANGUL_END = 0xAC00, 0xD7A3
+
+def random_word(rng, min_length, max_length):
+    return "".join(chr(rng.randint(HANGUL_START, HANGUL_END)) for _ in range(rng.randint(min_length, max_length)))
+
+def build_sentences(num_sentences, patterns, rng, profanity_ratio=0.05):
+    # 전사문 문장과 비슷한 길이의 무작위 문장, 일부에는 비속어를 섞음
+    pattern_list = sorted(patterns)
+    sentences = []
+    for _ in range(num_sentences):
+        words = [random_word(rng, 1, 4) for _ in range(rng.randint(5, 15))]
+        if rng.random() < profanity_ratio:
+            words.insert(rng.randrange(len(words)), rng.choice(pattern_list))
+        sentences.append(" ".join(words))
+    return sentences
+
+def measure(func, sentences, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output = [func(sentence) for sentence in sentences]
+        best = min(best, time.perf_counter() - started)
+    return best, output
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patterns", type=int, nargs="+", default=[10000, 50000], help="합성 패턴 목록 크기")
+    parser.add_argument("--sentences", type=int, nargs="+", default=[1000, 20000], help="전사문 문장 수")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with open(Config.PROFANITIES_FILE, 'r', encoding='utf-8') as f:
+        pattern_sets = [("fword_list.txt", set(f.read().splitlines()))]
+    pattern_sets += [(f"synthetic {size}", {random_word(rng, 2, 5) for _ in range(size)}) for size in args.patterns]
+
+    print(f"{'patterns':>24s} {'sentences':>10s} {'build':>9s} {'substring':>11s} {'automaton':>11s} {'speed-up':>9s}  identical")
+    for name, patterns in pattern_sets:
+        started = time.perf_counter()
+        matcher = AhoCorasick(patterns)
+        build = time.perf_counter() - started
+        for num_sentences in args.sentences:
+            sentences = build_sentences(num_sentences, patterns, rng)
+            naive, expected = measure(lambda s: any(p in s for p in patterns), sentences, args.repeat)
+            automaton, actual = measure(matcher.contains, sentences, args.repeat)
+            label = f"{name} ({len(patterns)})"
+            print(f"{label:>24s} {num_sentences:10d} {build * 1000:6.1f} ms {naive * 1000:8.1f} ms "
+                  f"{automaton * 1000:8.1f} ms {naive / automaton:8.1f}x  {actual == expected}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+프롬프트 토큰 예산 벤치마크.
+1) 문장 수/길이별로 기존 방식(상위 문장과 단어를 그대로 넣음)과 PromptPacker의 입력 토큰 수, 패킹 시간을 비교하고,
+2) 회귀 코퍼스의 정상 응답(benchmarks/material_corpus.jsonl)에서 항목별 출력 토큰 수를 측정하여
+   프롬프트가 요청하는 최대 항목 수를 만들 때 필요한 토큰 수와 출력 상한(output_budget), 기존 MAX_TOKENS(1000)를 비교합니다.
+tiktoken이 없으면 TokenCounter의 글자 수 추정치로 측정합니다.
+
+실행 (프로젝트 루트에서):
+    python -m benchmarks.prompt_budget_benchmark --sentences 5 20 100 --sentence-chars 40 200
+"""
+import argparse
+import json
+import os
+import random
+import time
+from config import Config
+from prompt_budget import PromptPacker, TokenCounter
+
+CORPUS_FILE = os.path.join(os.path.dirname(__file__), "material_corpus.jsonl")
+SYLLABLES = "가나다라마바사아자차카타파하오늘회사친구주말여행음식"
+
+def load_prompt():
+    with open(Config.PROMPT_FILE, 'r', encoding='utf-8') as f:
+        system_message, user_message = f.read().split("[사용자 메시지]")
+    return system_message.replace("[시스템 메시지]\n", "").strip(), user_message.strip()
+
+def make_inputs(num_sentences, sentence_chars, num_words, seed=0):
+    rng = random.Random(seed)
+    def text(length):
+        return "".join(rng.choice(SYLLABLES) if rng.random() > 0.2 else " " for _ in range(length)).strip()
+    sentences = [(text(rng.randint(sentence_chars // 2, sentence_chars * 3 // 2)) + ".", rng.randint(1, 10))
+                 for _ in range(num_sentences)]
+    words = [(text(rng.randint(2, 4)).replace(" ", ""), rng.randint(1, 30)) for _ in range(num_words)]
+    # get_top처럼 빈도순으로 정렬된 입력을 전달
+    return (sorted(sentences, key=lambda item: item[1], reverse=True),
+            sorted(words, key=lambda item: item[1], reverse=True))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sentences", type=int, nargs="+", default=[5, 20, 100], help="상위 문장 수")
+    parser.add_argument("--sentence-chars", type=int, nargs="+", default=[40, 200], help="문장 평균 글자 수")
+    parser.add_argument("--words", type=int, default=Config.NUM_WORDS, help="상위 단어 수")
+    args = parser.parse_args()
+
+    counter = TokenCounter()
+    packer = PromptPacker(counter)
+    system_message, user_template = load_prompt()
+    print(f"counter: {'tiktoken' if counter.encoding is not None else 'character estimate'}, "
+          f"input budget {packer.input_budget} tokens")
+    print(f"{'sentences':>9s} {'chars':>6s} {'legacy':>8s} {'packed':>8s} {'kept':>7s} {'cut':>4s} {'words':>6s} {'pack ms':>8s}")
+    for num_sentences in args.sentences:
+        for sentence_chars in args.sentence_chars:
+            sentences, words = make_inputs(num_sentences, sentence_chars, args.words)
+            legacy = counter.count_messages([
+                {"content": system_message},
+                {"content": user_template.format(sentences="\n".join(f"- {s}" for s, _ in sentences),
+                                                 words=", ".join(w for w, _ in words))},
+            ])
+            started = time.perf_counter()
+            _, packing = packer.pack(system_message, user_template, sentences, words)
+            elapsed = time.perf_counter() - started
+            print(f"{num_sentences:9d} {sentence_chars:6d} {legacy:8d} {packing['prompt_tokens']:8d} "
+                  f"{packing['sentences']:3d}/{num_sentences:<3d} {packing['truncated_sentences']:4d} "
+                  f"{packing['words']:3d}/{len(words):<2d} {elapsed * 1000:8.2f}")
+
+    with open(CORPUS_FILE, 'r', encoding='utf-8') as f:
+        clean = next(case for case in map(json.loads, f) if case["name"] == "clean")
+    material = json.loads(clean["content"][clean["content"].find('{'):clean["content"].rfind('}') + 1])
+    per_entry = {section: max(counter.count(json.dumps(entry, ensure_ascii=False, indent=2)) for entry in entries)
+                 for section, entries in material.items()}
+    needed = (per_entry["dialogue"] * Config.EXPECTED_DIALOGUE_ENTRIES
+              + per_entry["vocabulary"] * Config.EXPECTED_VOCABULARY_ENTRIES + Config.MATERIAL_OVERHEAD_TOKENS)
+    print()
+    print(f"largest entry: dialogue {per_entry['dialogue']} tokens (configured {Config.DIALOGUE_ENTRY_TOKENS}), "
+          f"vocabulary {per_entry['vocabulary']} tokens (configured {Config.VOCABULARY_ENTRY_TOKENS})")
+    print(f"{Config.EXPECTED_DIALOGUE_ENTRIES} dialogue + {Config.EXPECTED_VOCABULARY_ENTRIES} vocabulary entries need "
+          f"~{needed} tokens: output budget {packer.output_budget()}, previous MAX_TOKENS 1000")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Whisper fp32 / int8 양자화 모델 비교 벤치마크.
+로컬 한국어 음성 세트에 대해 실시간 배율(RTF)과 단어/문자 오류율(WER/CER)을 측정합니다.
+
+음성 세트 디렉터리에는 음성 파일(.wav/.mp3/.m4a)과 같은 이름의 정답 텍스트(.txt)를 둡니다.
+    data/ko_eval/0001.wav, data/ko_eval/0001.txt, ...
+
+실행 (프로젝트 루트에서, CPU에서 실행해야 의미가 있음):
+    python -m benchmarks.quantization_benchmark --audio-dir data/ko_eval --model-size base
+"""
+import argparse
+import glob
+import os
+import re
+import time
+from config import Config
+
+AUDIO_EXTENSIONS = ('.wav', '.mp3', '.m4a')
+
+def normalize(text):
+    # 문장 부호 제거, 소문자화, 공백 정리
+    return ' '.join(re.sub(r'[^\w\s]', ' ', text.lower()).split())
+
+def edit_distance(reference, hypothesis):
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref in enumerate(reference, 1):
+        current = [i]
+        for j, hyp in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref != hyp)))
+        previous = current
+    return previous[-1]
+
+def error_rates(reference, hypothesis):
+    """(단어 편집 거리, 단어 수, 문자 편집 거리, 문자 수)"""
+    reference, hypothesis = normalize(reference), normalize(hypothesis)
+    ref_words, hyp_words = reference.split(), hypothesis.split()
+    ref_chars, hyp_chars = reference.replace(' ', ''), hypothesis.replace(' ', '')
+    return edit_distance(ref_words, hyp_words), len(ref_words), edit_distance(ref_chars, hyp_chars), len(ref_chars)
+
+def load_dataset(audio_dir):
+    dataset = []
+    for path in sorted(glob.glob(os.path.join(audio_dir, '*'))):
+        base, extension = os.path.splitext(path)
+        if extension.lower() in AUDIO_EXTENSIONS and os.path.exists(base + '.txt'):
+            with open(base + '.txt', 'r', encoding='utf-8') as f:
+                dataset.append((path, f.read().strip()))
+    return dataset
+
+def evaluate(processor, samples):
+    totals = {"audio_seconds": 0.0, "elapsed": 0.0, "word_errors": 0, "words": 0, "char_errors": 0, "chars": 0}
+    texts = []
+    for audio, reference in samples:
+        started = time.perf_counter()
+        text = processor._transcribe_speech(audio)["text"]
+        totals["elapsed"] += time.perf_counter() - started
+        totals["audio_seconds"] += len(audio) / processor.SAMPLE_RATE
+        word_errors, words, char_errors, chars = error_rates(reference, text)
+        totals["word_errors"] += word_errors
+        totals["words"] += words
+        totals["char_errors"] += char_errors
+        totals["chars"] += chars
+        texts.append(text)
+    return totals, texts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--audio-dir", required=True, help="음성 파일과 정답 텍스트가 있는 디렉터리")
+    parser.add_argument("--model-size", default=Config.WHISPER_MODEL_SIZE)
+    args = parser.parse_args()
+
+    # 캐시가 있으면 두 번째 모델이 추론 없이 결과를 받으므로 비활성화
+    Config.TRANSCRIPT_CACHE_ENABLED = False
+    import torch
+    from audio_processor import AudioProcessor
+
+    dataset = load_dataset(args.audio_dir)
+    if not dataset:
+        raise SystemExit(f"No audio/reference pairs found in {args.audio_dir}")
+
+    results = {}
+    samples = None
+    for label, quantize in (("fp32", False), ("int8", True)):
+        processor = AudioProcessor(args.model_size, quantize=quantize)
+        if samples is None:
+            # 디코딩/리샘플링 시간은 제외하고 추론 시간만 측정
+            samples = [(processor.load_audio(path), reference) for path, reference in dataset]
+        processor.warm_up()
+        results[label] = evaluate(processor, samples)
+
+    print(f"\n{len(dataset)} files, model={args.model_size}, threads={torch.get_num_threads()}")
+    print(f"{'mode':6s} {'RTF':>7s} {'speed-up':>9s} {'WER':>7s} {'CER':>7s}")
+    baseline = results["fp32"][0]["elapsed"]
+    for label, (totals, _) in results.items():
+        rtf = totals["elapsed"] / totals["audio_seconds"]
+        wer = totals["word_errors"] / max(totals["words"], 1)
+        cer = totals["char_errors"] / max(totals["chars"], 1)
+        print(f"{label:6s} {rtf:7.3f} {baseline / totals['elapsed']:8.2f}x {wer:7.2%} {cer:7.2%}")
+
+    # 양자화로 결과가 달라진 정도 (fp32 출력을 정답으로 본 int8의 문자 오류율)
+    agreement = [error_rates(fp32, int8) for fp32, int8 in zip(results["fp32"][1], results["int8"][1])]
+    char_errors = sum(a[2] for a in agreement)
+    chars = sum(a[3] for a in agreement)
+    print(f"int8 vs fp32 CER: {char_errors / max(chars, 1):.2%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+리샘플링 마이크로 벤치마크.
+기존 경로(librosa.to_mono + librosa.resample + float32 변환)와
+resampler.py의 폴리페이즈 경로(모노/float32 변환 결합)를 비교합니다.
+
+실행 (프로젝트 루트에서):
+    python -m benchmarks.resample_benchmark --seconds 600
+"""
+import argparse
+import time
+import tracemalloc
+import librosa
+import numpy as np
+from resampler import StreamingResampler, resample
+from config import Config
+
+TARGET_SR = 16000
+
+def librosa_path(audio, sample_rate):
+    mono = librosa.to_mono(audio.T)
+    return librosa.resample(mono, orig_sr=sample_rate, target_sr=TARGET_SR).astype(np.float32)
+
+def polyphase_path(audio, sample_rate):
+    return resample(audio, sample_rate, TARGET_SR)
+
+def streaming_path(audio, sample_rate):
+    resampler = StreamingResampler(sample_rate, TARGET_SR)
+    block = Config.RESAMPLE_BLOCK_FRAMES
+    parts = [resampler.process(audio[i:i + block]) for i in range(0, len(audio), block)]
+    parts.append(resampler.flush())
+    return np.concatenate(parts)
+
+def measure(func, audio, sample_rate, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output = func(audio, sample_rate)
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    func(audio, sample_rate)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, output
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=120, help="테스트 신호 길이(초)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for sample_rate in (44100, 48000):
+        # 휴대폰 녹음과 같은 스테레오 float64 입력 (sf.read 기본 출력 형식)
+        num_frames = int(args.seconds * sample_rate)
+        t = np.arange(num_frames) / sample_rate
+        tone = np.sin(2 * np.pi * 440 * t)
+        audio = np.stack([tone, tone], axis=1) + 0.01 * rng.standard_normal((num_frames, 2))
+
+        print(f"\n{sample_rate} Hz stereo -> {TARGET_SR} Hz mono, {args.seconds:.0f}s")
+        reference = None
+        for name, func in (("librosa", librosa_path), ("polyphase", polyphase_path), ("streaming", streaming_path)):
+            elapsed, peak, output = measure(func, audio, sample_rate, args.repeat)
+            if reference is None:
+                reference = output
+                diff = 0.0
+            else:
+                length = min(len(reference), len(output))
+                diff = float(np.max(np.abs(reference[:length] - output[:length])))
+            print(f"  {name:10s} {elapsed * 1000:9.1f} ms  {args.seconds / elapsed:8.0f}x realtime  "
+                  f"peak {peak / 2**20:7.1f} MiB  max|diff| {diff:.2e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+형태소 분석 풀 벤치마크.
+동시에 들어온 요청들의 filter_text를 이벤트 루프에서 직접 실행하는 기존 방식과
+TextProcessorPool에서 실행하는 방식을 비교합니다. 전체 처리 시간과 함께
+이벤트 루프가 멈춘 최대 시간(다른 요청이 응답받지 못하는 시간)을 측정합니다.
+
+실행 (프로젝트 루트에서):
+    python -m benchmarks.text_pool_benchmark --requests 8 --sentences 200 --pool-size 2
+"""
+import argparse
+import asyncio
+import time
+from benchmarks.kiwi_batch_benchmark import build_transcript
+from text_processor import TextProcessor
+from text_processor_pool import TextProcessorPool
+
+async def watch_loop(interval, stalls):
+    # 주기적으로 깨어나 예정보다 늦게 깨어난 시간을 이벤트 루프 정지 시간으로 기록
+    while True:
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        stalls.append(max(time.perf_counter() - expected, 0.0))
+
+async def serve(handler, texts):
+    stalls = []
+    watcher = asyncio.create_task(watch_loop(0.005, stalls))
+    await asyncio.sleep(0.01)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(handler(text) for text in texts))
+    elapsed = time.perf_counter() - started
+    await asyncio.sleep(0.01)  # 마지막 정지 시간이 기록되도록 감시 작업이 한 번 더 깨어날 때까지 대기
+    watcher.cancel()
+    return elapsed, max(stalls, default=0.0), results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=8, help="동시 요청 수")
+    parser.add_argument("--sentences", type=int, default=200, help="요청당 전사문 문장 수")
+    parser.add_argument("--pool-size", type=int, default=None, help="풀 인스턴스 수 (기본값은 Config)")
+    args = parser.parse_args()
+
+    texts = [build_transcript(args.sentences, seed=seed) for seed in range(args.requests)]
+    processor = TextProcessor()
+    pool = TextProcessorPool(size=args.pool_size)
+    processor.filter_text(texts[0])  # Kiwi 초기 로드 시간 제외
+    for instance in pool.processors:
+        instance.filter_text(texts[0])
+
+    async def inline(text):
+        processor.analysis_cache.clear()
+        return processor.filter_text(text)
+
+    async def pooled(text):
+        return await pool.filter_text(text)
+
+    inline_elapsed, inline_stall, expected = asyncio.run(serve(inline, texts))
+    pool.analysis_cache.clear()
+    pooled_elapsed, pooled_stall, actual = asyncio.run(serve(pooled, texts))
+    pool.shutdown()
+
+    print(f"{args.requests} requests x {args.sentences} sentences, pool size {pool.size}")
+    print(f"{'mode':>8s} {'total':>10s} {'max loop stall':>15s}")
+    print(f"{'inline':>8s} {inline_elapsed * 1000:7.1f} ms {inline_stall * 1000:12.1f} ms")
+    print(f"{'pool':>8s} {pooled_elapsed * 1000:7.1f} ms {pooled_stall * 1000:12.1f} ms")
+    print(f"identical: {actual == expected}, pool stats: {pool.stats()}")
+
+if __name__ == "__main__":
+    main()
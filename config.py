@@ -16,7 +16,7 @@ class Config:
     # OpenAI 모델 설정
     MODEL_NAME = "gpt-4o-mini"
     TEMPERATURE = 0.7
-    MAX_TOKENS = 1000
+    MAX_TOKENS = 4096  # 출력 토큰 상한 (실제 요청 값은 예상 항목 수로 계산, 아래 프롬프트 토큰 예산 설정 참고)
     TOP_P = 1.0
     FREQUENCY_PENALTY = 0.0
     PRESENCE_PENALTY = 0.0
@@ -24,4 +24,120 @@ class Config:
 
     # 기타 설정
     NUM_SENTENCES = 5
-    NUM_WORDS = 20
\ No newline at end of file
+    NUM_WORDS = 20
+
+    # 스트리밍 음성 변환 설정 (긴 녹음 파일용)
+    STREAM_CHUNK_SECONDS = 30  # 한 번에 변환할 구간 길이 (Whisper 입력 창과 동일)
+    STREAM_OVERLAP_SECONDS = 3  # 구간 경계에서 겹치는 길이
+
+    # Whisper 배치 추론 설정 (동시 요청 묶음 처리)
+    BATCH_MAX_SIZE = 8  # 한 번에 디코딩할 최대 30초 구간 수
+    BATCH_MAX_WAIT_SECONDS = 0.05  # 배치를 채우기 위해 기다리는 최대 시간
+    BATCH_CUT_SEARCH_SECONDS = 10  # 30초 구간 끝에서 이 길이 안의 말 사이(무음 이음매)나 가장 조용한 지점에서 자름
+
+    # 음성 인식 백엔드 설정
+    WHISPER_MODEL_SIZE = "base"
+    WHISPER_QUANTIZE = False  # CPU에서 선형 계층을 int8로 동적 양자화 (benchmarks/quantization_benchmark.py로 정확도 확인)
+    STT_BACKEND = "batch"  # "batch": 프로세스 내 배치 스케줄러, "pool": 워커 프로세스 풀
+    STT_WORKERS = max(1, (os.cpu_count() or 1))  # 워커 프로세스 수 (코어당 1개)
+    STT_WORKER_THREADS = 1  # 워커 프로세스당 torch 스레드 수
+    STT_JOB_TIMEOUT_SECONDS = 600  # 작업 하나에 허용하는 최대 시간
+
+    # 음성 구간 검출(VAD) 설정
+    VAD_ENABLED = True
+    VAD_FRAME_MS = 30  # 분석 프레임 길이
+    VAD_ENERGY_MARGIN_DB = 10  # 배경 잡음 수준보다 이만큼 커야 음성으로 판단
+    VAD_MIN_ENERGY_DB = -50  # 음성으로 판단하는 최소 에너지 (dBFS)
+    VAD_FLATNESS_THRESHOLD = 0.5  # 스펙트럼 평탄도가 이보다 낮아야 음성으로 판단
+    VAD_MIN_SPEECH_MS = 250  # 이보다 짧은 음성 구간은 버림
+    VAD_MIN_SILENCE_MS = 300  # 이보다 짧은 무음 구간은 음성으로 메움
+    VAD_PADDING_MS = 200  # 음성 구간 앞뒤로 남겨두는 여유 길이
+
+    # 리샘플링 설정
+    RESAMPLE_ZERO_CROSSINGS = 8  # 필터 한쪽의 영점 교차 수 (음성 인식에는 8이면 충분)
+    RESAMPLE_ROLLOFF = 0.945  # 나이퀴스트 대비 차단 주파수 비율
+    RESAMPLE_KAISER_BETA = 8.6  # Kaiser 윈도우 형태 계수
+    RESAMPLE_BLOCK_FRAMES = 65536  # 파일을 읽어 변환하는 블록 크기 (프레임)
+
+    # 음성 변환 결과 캐시 설정
+    TRANSCRIPT_CACHE_ENABLED = True
+    TRANSCRIPT_CACHE_DIR = '.cache/transcripts'
+    TRANSCRIPT_CACHE_MEMORY_ITEMS = 256  # 메모리 계층 최대 항목 수
+    TRANSCRIPT_CACHE_DISK_BYTES = 100 * 1024 * 1024  # 디스크 계층 최대 크기 (100MB)
+
+    # 부하 적응형 모델 선택 설정
+    WHISPER_ADAPTIVE = False  # True이면 여러 모델을 상주시키고 작업마다 대기열과 지연 목표에 맞춰 크기를 선택
+    WHISPER_ADAPTIVE_SIZES = ["tiny", "base", "small"]  # 상주시킬 모델 (정확도가 낮은 순, 풀 백엔드는 워커마다 모두 로드)
+    LATENCY_SLO_SECONDS = 20  # 요청 하나의 목표 응답 시간
+    MODEL_RTF_SMOOTHING = 0.2  # 모델별 실시간 배율(RTF) 지수 이동 평균 계수
+
+    # 형태소 분석 설정
+    KIWI_NUM_WORKERS = -1  # Kiwi 배치 분석 스레드 수 (-1: 모든 코어, 0: 단일 스레드)
+    TEXT_ANALYSIS_CACHE_ITEMS = 10000  # 문장별 정규화/형태소 분석 결과 캐시 최대 항목 수
+
+    # 사용자별 장기 단어/문장 빈도 집계 설정 (Space-Saving 상위 K 요약)
+    USER_STATS_DIR = '.cache/user_stats'
+    HEAVY_HITTER_CAPACITY = 500  # 사용자별로 추적하는 최대 단어/문장 수 (메모리 상한)
+    HEAVY_HITTER_HALF_LIFE_DAYS = 7  # 빈도가 절반으로 줄어드는 기간
+    USER_STATS_MEMORY_USERS = 1000  # 메모리에 올려 두는 최대 사용자 수
+
+    # 비슷한 문장 묶기 설정 (MinHash/LSH)
+    SENTENCE_CLUSTERING_ENABLED = True  # 조사 하나 차이 같은 비슷한 문장을 묶어 빈도를 합산
+    SENTENCE_SIMILARITY_THRESHOLD = 0.7  # 같은 묶음으로 볼 최소 문자 n-gram 자카드 유사도
+    MINHASH_NUM_PERM = 128  # MinHash 해시 함수 수
+    SHINGLE_SIZE = 3  # 문자 n-gram 길이
+    SHINGLE_STRIP_PARTICLES = True  # 어절 끝의 조사(와/랑, 은/는, 이/가 등)와 종결 '요'를 떼고 n-gram 생성 (짧은 문장의 조사 차이 흡수)
+    MINHASH_MAX_CELLS = 4 * 1024 * 1024  # 서명 계산 중간 행렬(해시 함수 x n-gram)의 최대 원소 수 (32MB)
+
+    # 어휘 사전 설정 (비속어/불용어/이름 목록을 컴파일한 mmap 파일)
+    LEXICON_FILE = '.cache/lexicon.bin'  # 원본 목록보다 오래되었으면 시작 시 다시 빌드 (python -m lexicon)
+    LEXICON_LOOKUP_CACHE_ITEMS = 4096  # 섹션별 최근 조회 결과 캐시 크기
+
+    # 형태소 분석 풀 설정 (동시 요청을 여러 Kiwi 인스턴스에서 처리)
+    TEXT_PROCESSOR_POOL_SIZE = max(1, min(4, os.cpu_count() or 1))  # 인스턴스 수 (Kiwi 모델이 인스턴스마다 약 0.5GB)
+    TEXT_PROCESSOR_KIWI_WORKERS = 1  # 인스턴스별 Kiwi 스레드 수 (동시성은 풀 크기로 확보)
+    TEXT_PROCESSOR_MAX_WAITING = 32  # 인스턴스를 기다릴 수 있는 최대 요청 수 (초과 시 거절)
+
+    # TF-IDF 단어 순위 배치 작업 설정 (python -m tfidf_ranking)
+    STORE_USER_TRANSCRIPTS = False  # True이면 X-User-Id가 있는 요청의 전사문 원문을 배치 작업용으로 디스크에 저장 (사용자 동의 필요)
+    USER_TRANSCRIPTS_DIR = '.cache/user_transcripts'
+    USER_TRANSCRIPTS_RETENTION_DAYS = 30  # 전사문 보관 기간 (배치 작업 실행 시 지난 전사문 삭제)
+    TFIDF_DIR = '.cache/tfidf'  # 코퍼스 IDF와 사용자별 순위 저장 위치
+    TFIDF_CHUNK_TRANSCRIPTS = 1000  # 한 번에 분석하여 희소 행렬로 만드는 전사문 수
+    TFIDF_TOP_WORDS = 100  # 사용자별로 저장하는 상위 단어 수
+    TFIDF_MIN_USER_COUNT = 2  # 사용자 순위에 넣을 최소 단어 빈도
+
+    # OpenAI 연결 설정 (비동기 클라이언트 연결 풀)
+    OPENAI_TIMEOUT_SECONDS = 60  # 호출 하나의 읽기/쓰기 타임아웃
+    OPENAI_CONNECT_TIMEOUT_SECONDS = 5  # 연결 수립 타임아웃
+    OPENAI_MAX_RETRIES = 2  # 연결 오류/429/5xx 재시도 횟수
+    OPENAI_MAX_CONNECTIONS = 100  # 동시에 진행할 수 있는 최대 생성 요청 수
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS = 20  # 재사용을 위해 열어 두는 유휴 연결 수
+    OPENAI_KEEPALIVE_SECONDS = 60  # 유휴 연결 유지 시간
+
+    # 학습 자료 생성 결과 캐시 설정 (메모리 LRU + SQLite)
+    GENERATION_CACHE_ENABLED = True
+    GENERATION_CACHE_DB = '.cache/generations.sqlite3'
+    GENERATION_CACHE_MEMORY_ITEMS = 256  # 메모리 계층 최대 항목 수
+    GENERATION_CACHE_TTL_SECONDS = 7 * 86400  # 결과 유효 기간 (1주)
+    GENERATION_CACHE_MAX_BYTES = 50 * 1024 * 1024  # SQLite 계층 최대 크기 (50MB)
+
+    # 야간 일괄 생성 설정 (python -m batch_generation)
+    BATCH_GENERATION_DIR = '.cache/batch_generation'  # 대기열, 작업 파일, 사용자별 결과 저장 위치
+    BATCH_GENERATION_BACKEND = "openai"  # "openai": OpenAI Batch API, "local": 로컬 JSONL 파일 백엔드 (개발/시험용)
+    BATCH_GENERATION_POLL_SECONDS = 60  # 배치 상태 확인 간격
+    BATCH_GENERATION_MAX_WAIT_SECONDS = 24 * 3600  # 한 번 실행에서 완료를 기다리는 최대 시간 (넘으면 다음 실행에서 이어서 확인)
+    BATCH_GENERATION_PREPARE_TIMEOUT_SECONDS = 3600  # 준비 중인 작업 디렉터리가 이 시간 동안 변경이 없으면 중단된 것으로 보고 요청을 대기열에 돌려놓음
+    BATCH_GENERATION_MAX_ATTEMPTS = 3  # 실패한 요청을 다시 제출하는 최대 횟수
+    BATCH_GENERATION_RESULTS_PER_USER = 20  # 사용자별로 보관하는 최근 결과 수
+
+    # 프롬프트 토큰 예산 설정 (prompt_budget.py, tiktoken이 없으면 글자 수로 추정)
+    PROMPT_INPUT_TOKEN_BUDGET = 1400  # 시스템/사용자 메시지 전체의 최대 입력 토큰 수 (템플릿만 약 900)
+    PROMPT_MAX_SENTENCE_TOKENS = 60  # 문장 하나의 최대 토큰 수 (넘으면 잘라서 사용)
+    PROMPT_WORD_BUDGET_SHARE = 0.3  # 템플릿을 뺀 입력 예산 중 단어 목록에 먼저 배정하는 비율
+    EXPECTED_DIALOGUE_ENTRIES = 30  # 프롬프트가 요청하는 최대 대화 항목 수 (10-15회 교환)
+    EXPECTED_VOCABULARY_ENTRIES = 30  # 프롬프트가 요청하는 최대 단어 수
+    DIALOGUE_ENTRY_TOKENS = 70  # 대화 항목 하나의 예상 출력 토큰 수 (영어 문장, 한국어 번역, JSON 구조)
+    VOCABULARY_ENTRY_TOKENS = 35  # 단어 항목 하나의 예상 출력 토큰 수
+    MATERIAL_OVERHEAD_TOKENS = 20  # 코드 펜스와 최상위 JSON 구조
+    OUTPUT_TOKEN_MARGIN = 1.2  # 예상 출력 토큰에 곱하는 여유 비율
@@ -1,77 +1,166 @@
+import asyncio
+import hashlib
 import json
 import logging
-import re
-from openai import OpenAI
+import os
+import time
+import unicodedata
+from openai import OpenAI, AsyncOpenAI, DefaultAsyncHttpxClient
+try:
+    import httpx2 as httpx  # openai 3.x부터 HTTP 전송 계층이 httpx2로 바뀜
+except ImportError:
+    import httpx
 from config import Config
+from generation_cache import GenerationCache
+from material_stream import ENTRY_SECTIONS, IncrementalMaterialParser, recover_material
+from prompt_budget import GenerationStats, PromptPacker, TokenCounter
+
+def _normalize(text):
+    return ' '.join(unicodedata.normalize('NFC', text).split())
 
 class EnglishMaterialGenerator:
     def __init__(self):
-        self.client = OpenAI(api_key=Config.OPENAI_API_KEY)
+        timeout = httpx.Timeout(Config.OPENAI_TIMEOUT_SECONDS, connect=Config.OPENAI_CONNECT_TIMEOUT_SECONDS)
+        self.client = OpenAI(api_key=Config.OPENAI_API_KEY, timeout=timeout, max_retries=Config.OPENAI_MAX_RETRIES)
+        # 비동기 엔드포인트용 공유 클라이언트: 연결을 재사용(keep-alive)하여 요청마다 TLS 연결을 새로 맺지 않고,
+        # 연결 풀 크기만큼 여러 생성 요청을 동시에 보냄
+        self.async_client = AsyncOpenAI(
+            api_key=Config.OPENAI_API_KEY,
+            max_retries=Config.OPENAI_MAX_RETRIES,
+            http_client=DefaultAsyncHttpxClient(
+                timeout=timeout,
+                limits=httpx.Limits(
+                    max_connections=Config.OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=Config.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=Config.OPENAI_KEEPALIVE_SECONDS,
+                ),
+            ),
+        )
         self.model_name = Config.MODEL_NAME
+        # 입력 토큰 예산 안에서 프롬프트를 만들고, 호출별 토큰 수와 지연 시간을 기록
+        self.packer = PromptPacker(TokenCounter(self.model_name))
+        self.call_stats = GenerationStats()
+        # 같은 입력의 재요청(재시도, 비슷한 대화를 한 사용자)은 GPT를 다시 호출하지 않고 저장된 결과를 사용
+        self.cache = GenerationCache() if Config.GENERATION_CACHE_ENABLED else None
+        self.load_prompt()
+        logging.info("EnglishMaterialGenerator initialized")
+
+    def load_prompt(self):
+        """프롬프트 파일을 읽고, 이전 프롬프트로 만든 캐시 결과를 무효화하는 메서드"""
         with open(Config.PROMPT_FILE, 'r', encoding='utf-8') as f:
             self.prompt_content = f.read()
-        logging.info("EnglishMaterialGenerator initialized")
+        self.prompt_mtime = os.path.getmtime(Config.PROMPT_FILE)
+        self.prompt_hash = hashlib.sha256(self.prompt_content.encode('utf-8')).hexdigest()
+        if self.cache is not None:
+            self.cache.invalidate_prompt(self.prompt_hash)
+
+    def refresh_prompt(self):
+        """프롬프트 파일이 수정되었으면 다시 읽는 메서드 (서버 재시작 없이 프롬프트 변경 반영)"""
+        if os.path.getmtime(Config.PROMPT_FILE) != self.prompt_mtime:
+            logging.info("Prompt file changed, reloading")
+            self.load_prompt()
+
+    def cache_key(self, request):
+        """
+        생성 결과 캐시 키를 만드는 메서드
+        프롬프트 패킹은 빈도에 따라 문장과 단어를 고르고 순서를 정하므로, 입력 대신 실제로 보낼
+        요청(패킹된 메시지와 모델 설정)을 해시하여 같은 프롬프트일 때만 같은 키가 되게 합니다.
+        :param request: prepare_request가 만든 요청 인자
+        :return: SHA-256 16진수 문자열
+        """
+        payload = {key: value for key, value in request.items() if key != "timeout"}
+        return hashlib.sha256(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def lookup_cache(self, key):
+        """캐시에 저장된 결과를 cached=True로 표시하여 반환 (없으면 None)"""
+        if self.cache is None:
+            return None
+        material, tier = self.cache.get(key)
+        if material is None:
+            return None
+        logging.info(f"Learning material served from {tier} cache")
+        return {**material, "cached": True}
+
+    def store_cache(self, key, material, complete):
+        """
+        캐시해도 되는 결과만 캐시에 저장하는 메서드 (일반/비동기/스트리밍/배치 경로가 같은 기준을 사용)
+        부분 파싱 결과나 dialogue/vocabulary 중 비어 있는 배열이 있는 결과는 다음 요청에서 다시 생성합니다.
+        :param key: cache_key로 만든 캐시 키
+        :param material: 학습 자료 딕셔너리
+        :param complete: 응답 JSON이 끝까지 파싱되었는지 여부
+        """
+        if self.cache is not None and complete and all(material.get(section) for section in ENTRY_SECTIONS):
+            self.cache.put(key, material, self.prompt_hash)
 
     def generate_material(self, sentences, words):
+        content = None
         try:
             logging.info("Starting to generate learning material")
-            
-            # 프롬프트 준비
-            system_message, user_message = self.prompt_content.split("[사용자 메시지]")
-            system_message = system_message.replace("[시스템 메시지]\n", "").strip()
-            user_message = user_message.strip()
-
-            formatted_user_message = user_message.format(
-                sentences="\n".join(f"- {sentence}" for sentence, _ in sentences),
-                words=", ".join(word for word, _ in words)
-            )
-
-            logging.info("Prepared prompt for GPT model")
-            logging.debug(f"Formatted user message: {formatted_user_message[:500]}...")  # Log first 500 chars
+            self.refresh_prompt()
+            request, packing = self.prepare_request(sentences, words)
+            key = self.cache_key(request)
+            cached = self.lookup_cache(key)
+            if cached is not None:
+                return cached
 
             # GPT API 호출
-            response = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": formatted_user_message}
-                ],
-                temperature=Config.TEMPERATURE,
-                max_tokens=Config.MAX_TOKENS,
-                top_p=Config.TOP_P,
-                frequency_penalty=Config.FREQUENCY_PENALTY,
-                presence_penalty=Config.PRESENCE_PENALTY
-            )
+            started = time.perf_counter()
+            response = self.client.chat.completions.create(**request)
+            self.record_call(packing, request, response.usage, response.choices[0].finish_reason,
+                             time.perf_counter() - started)
 
             logging.info("Received response from GPT model")
-
-            # API 응답에서 콘텐츠 추출 및 정제
             content = response.choices[0].message.content
-            logging.info(f"Raw content: {content[:1000]}...")  # Log the first 1000 characters of the raw content
-
-            # JSON 추출 및 정제
-            json_content = self.extract_json(content)
+            material, complete = self.parse_material(content)
+            self.store_cache(key, material, complete)
+            return {**material, "cached": False}
 
-            logging.info(f"Extracted JSON content: {json_content[:1000]}...")  # Log the first 1000 characters of the extracted JSON
-
-            # JSON 파싱
-            try:
-                material = json.loads(json_content)
-            except json.JSONDecodeError as e:
-                logging.error(f"JSON parsing error: {str(e)}")
-                logging.error(f"Problematic JSON content: {json_content}")
-                # 부분적으로 파싱 시도
-                material = self.partial_json_parse(json_content)
+        except Exception as e:
+            logging.error(f"Error in generate_material: {str(e)}")
+            # 최소한의 유효한 구조 반환
+            return {
+                "dialogue": [],
+                "vocabulary": [],
+                "error": str(e),
+                "partial_content": content
+            }
 
-            if not material or not isinstance(material, dict) or 'dialogue' not in material or 'vocabulary' not in material:
-                raise ValueError("Invalid material structure")
+    async def agenerate_material(self, sentences, words, timeout=None):
+        """
+        generate_material의 비동기 버전 (이벤트 루프를 막지 않고 응답을 기다림)
+        :param sentences: (문장, 빈도) 튜플 리스트
+        :param words: (단어, 빈도) 튜플 리스트
+        :param timeout: 이 호출의 타임아웃(초), 지정하지 않으면 클라이언트 기본값 사용
+        :return: 학습 자료 딕셔너리 (cached로 캐시 결과 여부 표시, 실패 시 error와 partial_content 포함)
+        """
+        content = None
+        try:
+            logging.info("Starting to generate learning material")
+            loop = asyncio.get_running_loop()
+            # 프롬프트 파일 확인과 SQLite 조회는 디스크 I/O이므로 이벤트 루프 밖에서 실행
+            await loop.run_in_executor(None, self.refresh_prompt)
+            request, packing = self.prepare_request(sentences, words)
+            key = self.cache_key(request)
+            cached = await loop.run_in_executor(None, self.lookup_cache, key)
+            if cached is not None:
+                return cached
+            if timeout is not None:
+                request["timeout"] = timeout
 
-            logging.info("Successfully parsed GPT response into JSON")
+            # GPT API 호출
+            started = time.perf_counter()
+            response = await self.async_client.chat.completions.create(**request)
+            self.record_call(packing, request, response.usage, response.choices[0].finish_reason,
+                             time.perf_counter() - started)
 
-            return material
+            logging.info("Received response from GPT model")
+            content = response.choices[0].message.content
+            material, complete = self.parse_material(content)
+            await loop.run_in_executor(None, self.store_cache, key, material, complete)
+            return {**material, "cached": False}
 
         except Exception as e:
-            logging.error(f"Error in generate_material: {str(e)}")
+            logging.error(f"Error in agenerate_material: {str(e)}")
             # 최소한의 유효한 구조 반환
             return {
                 "dialogue": [],
@@ -80,51 +169,146 @@ class EnglishMaterialGenerator:
                 "partial_content": content
             }
 
-    def extract_json(self, content):
-        """JSON 콘텐츠를 추출하고 정제하는 메서드"""
-        # JSON 시작과 끝 찾기
-        json_start = content.find('{')
-        json_end = content.rfind('}') + 1
-        if json_start != -1 and json_end != -1:
-            json_content = content[json_start:json_end]
-            # 불완전한 JSON 처리
-            if json_content.count('{') > json_content.count('}'):
-                json_content += '}'  # 닫는 중괄호 추가
-            elif json_content.count('{') < json_content.count('}'):
-                json_content = '{' + json_content  # 여는 중괄호 추가
-            return json_content
-        else:
-            raise ValueError("No valid JSON found in the response")
-
-    def partial_json_parse(self, json_str):
-        """부분적으로 JSON을 파싱하는 메서드"""
+    async def astream_material(self, sentences, words, timeout=None):
+        """
+        학습 자료를 스트리밍으로 생성하며 dialogue/vocabulary 항목이 완성될 때마다 내보내는 비동기 제너레이터
+        :param sentences: (문장, 빈도) 튜플 리스트
+        :param words: (단어, 빈도) 튜플 리스트
+        :param timeout: 이 호출의 타임아웃(초), 지정하지 않으면 클라이언트 기본값 사용
+        :return: ("dialogue" | "vocabulary", 항목) 다음 ("done", 요약) 또는 ("error", 오류 정보) 튜플을 차례로 내보냄
+        """
+        content = []
         try:
-            # dialogue와 vocabulary 부분을 분리
-            dialogue_match = re.search(r'"dialogue":\s*\[(.*?)\]', json_str, re.DOTALL)
-            vocabulary_match = re.search(r'"vocabulary":\s*\[(.*?)\]', json_str, re.DOTALL)
-            
-            dialogue = []
-            vocabulary = []
-            
-            if dialogue_match:
-                dialogue_str = dialogue_match.group(1)
-                dialogue_items = re.findall(r'\{(.*?)\}', dialogue_str, re.DOTALL)
-                for item in dialogue_items:
-                    try:
-                        dialogue.append(json.loads('{' + item + '}'))
-                    except:
-                        pass
-            
-            if vocabulary_match:
-                vocabulary_str = vocabulary_match.group(1)
-                vocabulary_items = re.findall(r'\{(.*?)\}', vocabulary_str, re.DOTALL)
-                for item in vocabulary_items:
-                    try:
-                        vocabulary.append(json.loads('{' + item + '}'))
-                    except:
-                        pass
-            
-            return {"dialogue": dialogue, "vocabulary": vocabulary}
+            logging.info("Starting to stream learning material")
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.refresh_prompt)
+            request, packing = self.prepare_request(sentences, words)
+            key = self.cache_key(request)
+            cached = await loop.run_in_executor(None, self.lookup_cache, key)
+            if cached is not None:
+                for section in ENTRY_SECTIONS:
+                    for entry in cached.get(section) or []:
+                        yield section, entry
+                yield "done", {"cached": True, "complete": True}
+                return
+
+            if timeout is not None:
+                request["timeout"] = timeout
+            parser = IncrementalMaterialParser()
+            started = time.perf_counter()
+            first_entry = None
+            usage = None
+            finish_reason = None
+
+            # GPT API 스트리밍 호출: 토큰 조각이 도착할 때마다 완성된 항목을 바로 전달
+            # (include_usage: 마지막 조각으로 토큰 사용량을 받음)
+            stream = await self.async_client.chat.completions.create(
+                **request, stream=True, stream_options={"include_usage": True})
+            # 클라이언트 연결이 끊겨 소비자가 중간에 멈추면(aclose) 응답을 닫아 연결을 풀에 돌려줌
+            async with stream:
+                async for chunk in stream:
+                    if chunk.usage is not None:
+                        usage = chunk.usage
+                    if not chunk.choices:
+                        continue
+                    finish_reason = chunk.choices[0].finish_reason or finish_reason
+                    if not chunk.choices[0].delta.content:
+                        continue
+                    content.append(chunk.choices[0].delta.content)
+                    for section, entry in parser.feed(content[-1]):
+                        if first_entry is None:
+                            first_entry = time.perf_counter() - started
+                            logging.info(f"First learning material entry streamed after {first_entry:.2f}s")
+                        yield section, entry
+
+            logging.info(f"Learning material stream finished in {time.perf_counter() - started:.2f}s")
+            self.record_call(packing, request, usage, finish_reason, time.perf_counter() - started)
+            material = parser.material()
+            if not parser.complete:
+                logging.warning("Streamed learning material ended before the JSON was complete")
+            await loop.run_in_executor(None, self.store_cache, key, material, parser.complete)
+            yield "done", {"cached": False, "complete": parser.complete}
+
         except Exception as e:
-            logging.error(f"Error in partial JSON parsing: {str(e)}")
-            return {"dialogue": [], "vocabulary": []}
\ No newline at end of file
+            logging.error(f"Error in astream_material: {str(e)}")
+            yield "error", {"error": str(e), "partial_content": "".join(content) or None}
+
+    async def aclose(self):
+        """비동기 클라이언트의 연결 풀을 닫는 메서드 (서버 종료 시 호출)"""
+        await self.async_client.close()
+        if self.cache is not None:
+            self.cache.close()
+
+    def record_call(self, packing, request, usage, finish_reason, latency):
+        """
+        생성 호출 하나의 토큰 수와 지연 시간을 통계에 기록하는 메서드
+        :param packing: prepare_request가 반환한 프롬프트 통계
+        :param request: 호출에 사용한 요청 인자
+        :param usage: API 응답의 토큰 사용량 (없으면 None)
+        :param finish_reason: 생성 종료 이유
+        :param latency: 호출에 걸린 시간(초)
+        """
+        self.call_stats.record(packing["prompt_tokens"], usage.prompt_tokens if usage else None,
+                               usage.completion_tokens if usage else None, request["max_tokens"], latency, finish_reason)
+
+    def build_request(self, sentences, words):
+        """
+        상위 문장과 단어로 채팅 완성 요청 인자를 만드는 메서드
+        :param sentences: (문장, 빈도) 튜플 리스트
+        :param words: (단어, 빈도) 튜플 리스트
+        :return: chat.completions.create에 전달할 키워드 인자 딕셔너리
+        """
+        return self.prepare_request(sentences, words)[0]
+
+    def prepare_request(self, sentences, words):
+        """
+        입력 토큰 예산 안에 들어가는 문장과 단어로 채팅 완성 요청 인자를 만드는 메서드
+        :param sentences: (문장, 빈도) 튜플 리스트
+        :param words: (단어, 빈도) 튜플 리스트
+        :return: (chat.completions.create에 전달할 키워드 인자 딕셔너리, 프롬프트 통계 딕셔너리)
+        """
+        # 프롬프트 준비
+        system_message, user_message = self.prompt_content.split("[사용자 메시지]")
+        system_message = system_message.replace("[시스템 메시지]\n", "").strip()
+        user_message = user_message.strip()
+
+        # 유니코드 정규화 형태나 공백만 다른 입력이 같은 프롬프트(같은 캐시 키)가 되도록 정규화
+        sentences = [(_normalize(sentence), count) for sentence, count in sentences]
+        words = [(_normalize(word), count) for word, count in words]
+        messages, packing = self.packer.pack(system_message, user_message, sentences, words)
+
+        logging.info(f"Prepared prompt for GPT model: {packing['prompt_tokens']} tokens, "
+                     f"{packing['sentences']} sentences ({packing['dropped_sentences']} dropped, "
+                     f"{packing['truncated_sentences']} truncated), {packing['words']} words ({packing['dropped_words']} dropped)")
+        logging.debug(f"Formatted user message: {messages[1]['content'][:500]}...")  # Log first 500 chars
+
+        return {
+            "model": self.model_name,
+            "messages": messages,
+            "temperature": Config.TEMPERATURE,
+            "max_tokens": self.packer.output_budget(),
+            "top_p": Config.TOP_P,
+            "frequency_penalty": Config.FREQUENCY_PENALTY,
+            "presence_penalty": Config.PRESENCE_PENALTY
+        }, packing
+
+    def parse_material(self, content):
+        """
+        모델 응답 텍스트에서 학습 자료 JSON을 추출하고 파싱하는 메서드
+        코드 펜스나 설명 문장을 건너뛰고, 잘리거나 일부가 깨진 응답에서도 완성된 항목을 복구합니다.
+        :param content: 모델 응답 텍스트
+        :return: (dialogue와 vocabulary를 포함한 딕셔너리, JSON 전체가 정상 파싱되었는지 여부)
+        """
+        logging.info(f"Raw content: {content[:1000]}...")  # Log the first 1000 characters of the raw content
+
+        # 한 번의 선형 탐색으로 항목 단위 복구
+        material, complete, found = recover_material(content)
+        if not found:
+            raise ValueError("No valid JSON found in the response")
+        if not complete:
+            logging.warning(f"Recovered partial material: {len(material['dialogue'])} dialogue entries, "
+                            f"{len(material['vocabulary'])} vocabulary entries")
+
+        logging.info("Successfully parsed GPT response into JSON")
+
+        return material, complete
\ No newline at end of file
@@ -0,0 +1,43 @@
+import os
+import threading
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows: 프로세스 안의 잠금만 사용
+
+class FileLock:
+    """
+    잠금 파일에 flock을 걸어 여러 프로세스(API 서버와 배치 작업)가 같은 파일을 고치지 않도록 하는 잠금.
+    같은 프로세스의 스레드끼리는 threading.Lock으로 막습니다.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: 잠금 파일 경로 (없으면 생성)
+        """
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._file = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        try:
+            self._file = open(self.path, 'a')
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        except BaseException:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._thread_lock.release()
+            raise
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            self._file.close()
+        finally:
+            self._file = None
+            self._thread_lock.release()
@@ -0,0 +1,149 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from config import Config
+from lru import LRUCache
+
+class GenerationCache:
+    """
+    학습 자료 생성 결과 캐시.
+    메모리 LRU 계층과 SQLite 계층으로 구성되며, 같은 입력(문장, 단어, 프롬프트, 모델 설정)으로
+    다시 요청하면 GPT 호출 없이 저장된 결과를 돌려줍니다.
+    SQLite 계층은 여러 워커 프로세스가 공유하며 TTL과 전체 크기 제한으로 항목을 제거합니다.
+    """
+
+    def __init__(self, db_path=None, memory_items=None, ttl=None, max_bytes=None):
+        """
+        :param db_path: SQLite 데이터베이스 파일 경로
+        :param memory_items: 메모리에 보관할 최대 항목 수
+        :param ttl: 항목 유효 시간(초)
+        :param max_bytes: SQLite 계층에 저장하는 결과의 최대 전체 크기(바이트)
+        """
+        self.db_path = db_path or Config.GENERATION_CACHE_DB
+        self.ttl = ttl or Config.GENERATION_CACHE_TTL_SECONDS
+        self.max_bytes = max_bytes or Config.GENERATION_CACHE_MAX_BYTES
+        self.memory = LRUCache(memory_items or Config.GENERATION_CACHE_MEMORY_ITEMS)
+        self.disk_hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.disk_evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+        with self._lock, self._db:
+            # WAL 모드: 한 프로세스가 쓰는 동안에도 다른 프로세스가 읽을 수 있음
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS generations (
+                    key TEXT PRIMARY KEY,
+                    prompt_hash TEXT NOT NULL,
+                    material TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    accessed REAL NOT NULL
+                )""")
+            self._db.execute("CREATE INDEX IF NOT EXISTS generations_accessed ON generations (accessed)")
+
+    def get(self, key, now=None):
+        """
+        캐시에서 생성 결과를 찾는 메서드 (메모리 -> SQLite 순서)
+        :param key: 캐시 키
+        :param now: 현재 시각 (기본값은 현재 시각)
+        :return: (학습 자료 딕셔너리, 계층 이름 "memory" 또는 "disk"), 없거나 만료되었으면 (None, None)
+        """
+        now = time.time() if now is None else now
+        entry = self.memory.get(key)
+        if entry is not None:
+            material, created = entry
+            if now - created < self.ttl:
+                return material, "memory"
+            self.memory.pop(key)
+
+        with self._lock:
+            row = self._db.execute("SELECT material, created FROM generations WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None, None
+            material, created = row
+            with self._db:
+                if now - created >= self.ttl:
+                    self._db.execute("DELETE FROM generations WHERE key = ?", (key,))
+                    self.expirations += 1
+                    self.misses += 1
+                    return None, None
+                self._db.execute("UPDATE generations SET accessed = ? WHERE key = ?", (now, key))
+            self.disk_hits += 1
+        material = json.loads(material)
+        self.memory.put(key, (material, created))
+        return material, "disk"
+
+    def put(self, key, material, prompt_hash, now=None):
+        """
+        생성 결과를 메모리와 SQLite에 저장하는 메서드
+        :param key: 캐시 키
+        :param material: 학습 자료 딕셔너리
+        :param prompt_hash: 결과를 만든 프롬프트 파일의 해시 (프롬프트 변경 시 무효화에 사용)
+        :param now: 저장 시각 (기본값은 현재 시각)
+        """
+        now = time.time() if now is None else now
+        self.memory.put(key, (material, now))
+        data = json.dumps(material, ensure_ascii=False)
+        size = len(data.encode('utf-8'))
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO generations (key, prompt_hash, material, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)", (key, prompt_hash, data, size, now, now))
+            self._evict(now)
+
+    def invalidate_prompt(self, prompt_hash):
+        """
+        현재 프롬프트가 아닌 프롬프트로 만든 결과를 모두 삭제하는 메서드
+        :param prompt_hash: 현재 프롬프트 파일의 해시
+        :return: 삭제한 항목 수
+        """
+        self.memory.clear()
+        with self._lock, self._db:
+            deleted = self._db.execute("DELETE FROM generations WHERE prompt_hash != ?", (prompt_hash,)).rowcount
+        if deleted:
+            logging.info(f"Invalidated {deleted} cached generations made with an older prompt")
+        return deleted
+
+    def stats(self):
+        """메모리/SQLite 계층의 적중, 실패, 제거 횟수를 반환"""
+        memory = self.memory.stats()
+        with self._lock:
+            items, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM generations").fetchone()
+            return {
+                "memory_hits": memory["hits"],
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "expirations": self.expirations,
+                "memory_evictions": memory["evictions"],
+                "disk_evictions": self.disk_evictions,
+                "memory_items": memory["size"],
+                "disk_items": items,
+                "disk_bytes": total,
+            }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _evict(self, now):
+        # 만료된 항목을 지우고, 전체 크기가 상한을 넘으면 오래 사용되지 않은 항목부터 제거 (잠금을 잡은 상태로 호출)
+        self.expirations += self._db.execute("DELETE FROM generations WHERE created <= ?", (now - self.ttl,)).rowcount
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM generations").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in self._db.execute("SELECT key, size FROM generations ORDER BY accessed"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._db.executemany("DELETE FROM generations WHERE key = ?", evicted)
+        self.disk_evictions += len(evicted)
+        logging.debug(f"Evicted {len(evicted)} cached generations")
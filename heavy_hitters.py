@@ -0,0 +1,275 @@
+import hashlib
+import heapq
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from config import Config
+from lru import LRUCache
+
+class SpaceSaving:
+    """
+    시간 감쇠를 적용한 Space-Saving 상위 K 빈도 요약.
+    최대 capacity개의 항목만 보관하므로 입력 길이와 관계없이 메모리가 고정되며,
+    추정 빈도는 실제 빈도보다 작지 않고 오차는 항목별 error 이하입니다.
+    감쇠는 기준 시각(landmark)에 대한 지수 가중치(forward decay)로 계산하여
+    갱신 시 모든 항목을 다시 계산하지 않습니다.
+    """
+
+    # 가중치 지수가 이 값을 넘으면 기준 시각을 옮겨 부동소수점 넘침을 방지
+    MAX_EXPONENT = 50.0
+
+    def __init__(self, capacity, half_life=None, landmark=None):
+        """
+        :param capacity: 보관할 최대 항목 수
+        :param half_life: 빈도가 절반으로 줄어드는 시간(초), None이면 감쇠 없음
+        :param landmark: 감쇠 기준 시각 (기본값은 현재 시각)
+        """
+        self.capacity = capacity
+        self.half_life = half_life
+        self.landmark = time.time() if landmark is None else landmark
+        self._decay = math.log(2) / half_life if half_life else 0.0
+        self._counts = {}  # 항목 -> [기준 시각 기준 빈도, 오차]
+        self._heap = []  # (빈도, 항목) 최소 힙, 빈도는 실제 값보다 작을 수 있음 (지연 갱신)
+
+    def __len__(self):
+        return len(self._counts)
+
+    def update(self, item, weight=1.0, now=None):
+        """
+        항목의 빈도를 증가시키는 메서드
+        :param item: 집계할 항목 (문자열)
+        :param weight: 증가량
+        :param now: 관측 시각 (기본값은 현재 시각)
+        """
+        weight *= self._weight(now)
+        entry = self._counts.get(item)
+        if entry is not None:
+            entry[0] += weight
+            return
+        if len(self._counts) < self.capacity:
+            self._counts[item] = [weight, 0.0]
+            heapq.heappush(self._heap, (weight, item))
+            return
+        # 가장 빈도가 낮은 항목을 새 항목으로 교체하고, 그 빈도를 오차로 물려받음
+        minimum, evicted = self._pop_min()
+        del self._counts[evicted]
+        self._counts[item] = [minimum + weight, minimum]
+        heapq.heappush(self._heap, (minimum + weight, item))
+
+    def update_many(self, items, now=None):
+        """여러 항목을 같은 시각의 관측으로 한 번에 집계하는 메서드"""
+        now = time.time() if now is None else now
+        for item in items:
+            self.update(item, now=now)
+
+    def estimate(self, item, now=None):
+        """
+        항목의 감쇠된 빈도 추정값을 반환하는 메서드
+        :return: (추정 빈도, 최대 오차), 추적하지 않는 항목은 (0, 0)
+        """
+        entry = self._counts.get(item)
+        if entry is None:
+            return 0.0, 0.0
+        scale = 1.0 / self._weight(now)
+        return entry[0] * scale, entry[1] * scale
+
+    def top(self, num_items, now=None):
+        """
+        감쇠된 빈도가 높은 순서로 상위 항목을 반환하는 메서드
+        :param num_items: 반환할 항목 수
+        :return: (항목, 추정 빈도) 튜플의 리스트
+        """
+        scale = 1.0 / self._weight(now)
+        ranked = heapq.nlargest(num_items, self._counts.items(), key=lambda entry: entry[1][0])
+        return [(item, count * scale) for item, (count, _) in ranked]
+
+    def merge(self, other):
+        """
+        다른 요약(다른 샤드/기기에서 집계한 결과)을 합치는 메서드
+        한쪽에만 있는 항목은 다른 쪽이 가득 찬 경우 그 최소 빈도만큼 놓쳤을 수 있으므로
+        빈도와 오차에 더해 과대 추정 보장을 유지합니다.
+        :param other: 합칠 SpaceSaving (용량과 반감기가 같아야 함)
+        :return: self
+        """
+        if other.half_life != self.half_life:
+            raise ValueError("Cannot merge summaries with different half-lives")
+        # 상대 요약의 빈도를 이쪽 기준 시각으로 환산 (더 늦은 기준 시각에 맞춰 넘침 방지)
+        if self._decay and other.landmark > self.landmark:
+            self._rescale(other.landmark)
+        scale = math.exp(self._decay * (other.landmark - self.landmark))
+        own_floor = self._floor()
+        other_floor = other._floor() * scale
+        merged = {}
+        for item in self._counts.keys() | other._counts.keys():
+            count, error = self._counts.get(item, (own_floor, own_floor))
+            other_count, other_error = other._counts.get(item, (other_floor, other_floor))
+            if item in other._counts:
+                other_count, other_error = other_count * scale, other_error * scale
+            merged[item] = [count + other_count, error + other_error]
+        kept = heapq.nlargest(self.capacity, merged.items(), key=lambda entry: entry[1][0])
+        self._counts = dict(kept)
+        self._rebuild_heap()
+        return self
+
+    def to_dict(self):
+        """JSON으로 저장할 수 있는 딕셔너리로 변환"""
+        return {
+            "capacity": self.capacity,
+            "half_life": self.half_life,
+            "landmark": self.landmark,
+            "items": [[item, count, error] for item, (count, error) in self._counts.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """to_dict로 저장한 딕셔너리에서 요약을 복원"""
+        summary = cls(data["capacity"], data["half_life"], data["landmark"])
+        summary._counts = {item: [count, error] for item, count, error in data["items"]}
+        summary._rebuild_heap()
+        return summary
+
+    def _weight(self, now):
+        # 관측 시각의 기준 시각 대비 가중치 (감쇠가 없으면 1)
+        if not self._decay:
+            return 1.0
+        now = time.time() if now is None else now
+        exponent = self._decay * (now - self.landmark)
+        if exponent > self.MAX_EXPONENT:
+            self._rescale(now)
+            exponent = 0.0
+        return math.exp(exponent)
+
+    def _rescale(self, now):
+        # 기준 시각을 now로 옮기고 저장된 빈도를 그만큼 줄임
+        factor = math.exp(-self._decay * (now - self.landmark))
+        for entry in self._counts.values():
+            entry[0] *= factor
+            entry[1] *= factor
+        self.landmark = now
+        self._rebuild_heap()
+
+    def _floor(self):
+        # 가득 찬 요약에서 추적하지 않는 항목이 가질 수 있는 최대 빈도
+        if len(self._counts) < self.capacity:
+            return 0.0
+        return self._peek_min()[0]
+
+    def _peek_min(self):
+        # 힙 맨 위 항목의 빈도가 실제 빈도와 같아질 때까지 지연 갱신
+        while True:
+            count, item = self._heap[0]
+            current = self._counts[item][0]
+            if current == count:
+                return count, item
+            heapq.heapreplace(self._heap, (current, item))
+
+    def _pop_min(self):
+        count, item = self._peek_min()
+        heapq.heappop(self._heap)
+        return count, item
+
+    def _rebuild_heap(self):
+        self._heap = [(count, item) for item, (count, _) in self._counts.items()]
+        heapq.heapify(self._heap)
+
+class UserVocabularyStore:
+    """
+    사용자별 장기 단어/문장 빈도를 SpaceSaving 요약으로 보관하는 저장소.
+    요약은 사용자마다 JSON 파일로 저장되며, 메모리에는 최근 사용한 사용자만 올려 둡니다.
+    """
+
+    KINDS = ("words", "sentences")
+
+    def __init__(self, storage_dir=None, capacity=None, half_life_days=None, memory_users=None):
+        """
+        :param storage_dir: 사용자별 요약 파일을 저장할 디렉터리
+        :param capacity: 사용자별로 추적하는 최대 단어/문장 수
+        :param half_life_days: 빈도가 절반으로 줄어드는 기간(일)
+        :param memory_users: 메모리에 보관할 최대 사용자 수
+        """
+        self.storage_dir = storage_dir or Config.USER_STATS_DIR
+        self.capacity = capacity or Config.HEAVY_HITTER_CAPACITY
+        half_life_days = half_life_days or Config.HEAVY_HITTER_HALF_LIFE_DAYS
+        self.half_life = half_life_days * 86400
+        self._users = LRUCache(memory_users or Config.USER_STATS_MEMORY_USERS)
+        self._lock = threading.Lock()
+        os.makedirs(self.storage_dir, exist_ok=True)
+
+    def record(self, user_id, words, sentences, now=None):
+        """
+        한 번의 전사 결과를 사용자의 누적 빈도에 반영하고 저장하는 메서드
+        :param user_id: 사용자 식별자
+        :param words: 필터링된 단어 리스트
+        :param sentences: 필터링된 문장 리스트
+        :param now: 관측 시각 (기본값은 현재 시각)
+        """
+        with self._lock:
+            summaries = self._load(user_id)
+            summaries["words"].update_many(words, now)
+            summaries["sentences"].update_many(sentences, now)
+            self._save(user_id, summaries)
+
+    def top(self, user_id, kind, num_items, now=None):
+        """
+        사용자의 누적 상위 항목을 반환하는 메서드
+        :param kind: "words" 또는 "sentences"
+        :return: (항목, 감쇠된 빈도) 튜플의 리스트
+        """
+        with self._lock:
+            return self._load(user_id)[kind].top(num_items, now)
+
+    def merge(self, user_id, data):
+        """다른 샤드에서 to_dict로 내보낸 요약({"words": ..., "sentences": ...})을 합치는 메서드"""
+        with self._lock:
+            summaries = self._load(user_id)
+            for kind in self.KINDS:
+                if kind in data:
+                    summaries[kind].merge(SpaceSaving.from_dict(data[kind]))
+            self._save(user_id, summaries)
+
+    def export(self, user_id):
+        """사용자의 요약을 JSON으로 저장할 수 있는 딕셔너리로 반환"""
+        with self._lock:
+            return {kind: summary.to_dict() for kind, summary in self._load(user_id).items()}
+
+    def delete_user(self, user_id):
+        """
+        사용자의 요약(정규화된 문장 원문 포함)을 메모리와 파일에서 삭제하는 메서드
+        :return: 삭제한 파일이 있었는지 여부
+        """
+        with self._lock:
+            self._users.pop(user_id)
+            try:
+                os.remove(self._path(user_id))
+                return True
+            except FileNotFoundError:
+                return False
+
+    def _path(self, user_id):
+        # 사용자 ID를 그대로 파일 이름으로 쓰지 않도록 해시 사용
+        return os.path.join(self.storage_dir, hashlib.sha256(user_id.encode()).hexdigest() + '.json')
+
+    def _load(self, user_id):
+        summaries = self._users.get(user_id)
+        if summaries is not None:
+            return summaries
+        try:
+            with open(self._path(user_id), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            summaries = {kind: SpaceSaving.from_dict(data[kind]) for kind in self.KINDS}
+        except FileNotFoundError:
+            summaries = {kind: SpaceSaving(self.capacity, self.half_life) for kind in self.KINDS}
+        self._users.put(user_id, summaries)
+        return summaries
+
+    def _save(self, user_id, summaries):
+        path = self._path(user_id)
+        data = {kind: summary.to_dict() for kind, summary in summaries.items()}
+        # 읽는 중인 파일이 깨지지 않도록 임시 파일에 쓴 뒤 교체
+        fd, temp_path = tempfile.mkstemp(dir=self.storage_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, path)
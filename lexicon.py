@@ -0,0 +1,173 @@
+"""
+단어 목록(비속어, 불용어, 이름)을 하나의 이진 사전 파일로 컴파일하고 mmap으로 읽는 모듈.
+정렬된 UTF-8 문자열 배열과 오프셋 배열로 저장하여 이진 탐색으로 조회하며,
+여러 워커 프로세스가 같은 파일을 읽기 전용으로 매핑하므로 메모리 페이지를 공유합니다.
+
+빌드 (프로젝트 루트에서, 서버 시작 시 원본 목록이 더 새로우면 자동으로 다시 빌드됨):
+    python -m lexicon
+"""
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+from config import Config
+
+MAGIC = b"LEX1"
+HEADER = struct.Struct("<4sI")  # 매직, JSON 헤더 길이
+
+# 사전 섹션 이름 -> 원본 목록 파일
+LEXICON_SOURCES = {
+    "profanities": Config.PROFANITIES_FILE,
+    "korean_stopwords": Config.KOREAN_STOPWORDS_FILE,
+    "common_names": Config.COMMON_NAMES_FILE,
+}
+
+def read_word_list(file_path):
+    """
+    단어 목록 파일을 읽어 단어 리스트로 반환하는 함수
+    빈 줄과 '#'으로 시작하는 주석 줄은 제외합니다.
+    :param file_path: 읽을 파일의 경로
+    :return: 단어 리스트
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        lines = (line.strip() for line in f.read().splitlines())
+        return [line for line in lines if line and not line.startswith('#')]
+
+class LexiconSection:
+    """mmap된 정렬 문자열 배열 하나 (집합처럼 in 연산과 순회를 지원)"""
+
+    def __init__(self, buffer, offsets_start, data_start, count, cache_size):
+        self._buffer = buffer
+        self._offsets = buffer[offsets_start:offsets_start + (count + 1) * 4].cast("I")
+        self._data_start = data_start
+        self._count = count
+        # 같은 단어가 반복 조회되므로 최근 조회 결과를 보관하여 이진 탐색을 생략
+        self._contains = lru_cache(maxsize=cache_size)(self._search)
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self[index]
+
+    def __getitem__(self, index):
+        return self._entry(index).decode('utf-8')
+
+    def __contains__(self, word):
+        return self._contains(word)
+
+    def _entry(self, index):
+        start = self._data_start + self._offsets[index]
+        return bytes(self._buffer[start:self._data_start + self._offsets[index + 1]])
+
+    def _search(self, word):
+        key = word.encode('utf-8')
+        index = bisect_left(range(self._count), key, key=self._entry)
+        return index < self._count and self._entry(index) == key
+
+class Lexicon:
+    """
+    컴파일된 사전 파일을 읽기 전용으로 매핑한 객체.
+    lexicon["korean_stopwords"]처럼 섹션 이름으로 LexiconSection을 얻습니다.
+    """
+
+    def __init__(self, path, cache_size=None):
+        """
+        :param path: 컴파일된 사전 파일 경로
+        :param cache_size: 섹션별 조회 결과 캐시 크기
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mmap)
+        magic, header_size = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError(f"Not a lexicon file: {path}")
+        header = json.loads(bytes(buffer[HEADER.size:HEADER.size + header_size]))
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError(f"Lexicon was built on a {header['byteorder']}-endian machine: {path}")
+        # 헤더 뒤 데이터 영역은 4바이트 정렬되어 있고, 섹션 위치는 데이터 영역 기준
+        base = _align(HEADER.size + header_size)
+        cache_size = cache_size or Config.LEXICON_LOOKUP_CACHE_ITEMS
+        self.sections = {
+            name: LexiconSection(buffer, base + section["offsets"], base + section["data"], section["count"], cache_size)
+            for name, section in header["sections"].items()
+        }
+
+    def __getitem__(self, name):
+        return self.sections[name]
+
+    @staticmethod
+    def build(path, sources=None):
+        """
+        단어 목록 파일들을 하나의 사전 파일로 컴파일하는 메서드
+        :param path: 출력 파일 경로
+        :param sources: 섹션 이름 -> 원본 목록 파일 경로 (기본값은 LEXICON_SOURCES)
+        """
+        sources = sources or LEXICON_SOURCES
+        blobs = []
+        sections = {}
+        position = 0
+        for name, source in sources.items():
+            # UTF-8 바이트 순서로 정렬해야 조회 시 바이트 비교로 이진 탐색 가능
+            entries = sorted({word.encode('utf-8') for word in read_word_list(source)})
+            offsets = array("I", [0])
+            for entry in entries:
+                offsets.append(offsets[-1] + len(entry))
+            data = b"".join(entries)
+            padding = b"\0" * (_align(len(data)) - len(data))  # 다음 섹션의 오프셋 배열을 4바이트 정렬
+            sections[name] = {"count": len(entries), "offsets": position, "data": position + len(offsets) * 4}
+            blobs += [offsets.tobytes(), data, padding]
+            position += len(offsets) * 4 + len(data) + len(padding)
+
+        header = json.dumps({"byteorder": sys.byteorder, "sections": sections}).encode()
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        # 다른 프로세스가 매핑 중인 파일을 덮어쓰지 않도록 임시 파일에 쓴 뒤 교체
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, len(header)))
+            f.write(header)
+            f.write(b"\0" * (_align(HEADER.size + len(header)) - HEADER.size - len(header)))
+            for blob in blobs:
+                f.write(blob)
+        os.replace(temp_path, path)
+        logging.info(f"Lexicon compiled to {path}: " + ", ".join(f"{name}={section['count']}" for name, section in sections.items()))
+
+def _align(size):
+    return size + (-size % 4)
+
+def load_lexicon(path=None, sources=None):
+    """
+    컴파일된 사전을 여는 함수 (파일이 없거나 원본 목록보다 오래되었으면 먼저 다시 빌드)
+    :param path: 컴파일된 사전 파일 경로
+    :param sources: 섹션 이름 -> 원본 목록 파일 경로
+    :return: Lexicon
+    """
+    path = path or Config.LEXICON_FILE
+    sources = sources or LEXICON_SOURCES
+    try:
+        built_at = os.path.getmtime(path)
+        stale = any(os.path.getmtime(source) > built_at for source in sources.values())
+    except FileNotFoundError:
+        stale = True
+    if not stale:
+        try:
+            lexicon = Lexicon(path)
+            if set(lexicon.sections) == set(sources):
+                return lexicon
+        except ValueError as e:
+            logging.warning(f"Rebuilding lexicon: {str(e)}")
+    Lexicon.build(path, sources)
+    return Lexicon(path)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    Lexicon.build(Config.LEXICON_FILE)
@@ -1,15 +1,15 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Optional
-import tempfile
+import asyncio
+import json
 import os
 import logging
 import traceback
-from audio_processor import AudioProcessor
-from text_processor import TextProcessor
-from english_material_generator import EnglishMaterialGenerator
+from service_loader import ServiceLoader
+from text_processor_pool import TextProcessorPoolFull
 from config import Config
 
 # 로깅 설정
@@ -27,10 +27,88 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 프로세서 및 생성기 초기화
-audio_processor = AudioProcessor()
-text_processor = TextProcessor()
-english_generator = EnglishMaterialGenerator()
+# 프로세서 및 생성기는 서버 시작 후 백그라운드에서 로드
+# (torch, Whisper, Kiwi 로드가 포트 바인딩을 지연시키지 않도록 하고,
+#  spawn된 STT 워커가 이 모듈을 다시 import할 때도 가볍게 유지)
+service_loader = ServiceLoader()
+audio_processor = None
+batch_scheduler = None
+stt_pool = None
+transcribe = None
+text_pool = None
+english_generator = None
+user_vocabulary = None
+transcript_store = None
+tfidf_rankings = None
+generation_queue = None
+batch_results = None
+
+def load_services(loader):
+    """무거운 모듈을 import하고 모델을 로드한 뒤 워밍업하는 함수"""
+    global audio_processor, batch_scheduler, stt_pool, transcribe, text_pool, english_generator, user_vocabulary
+    global transcript_store, tfidf_rankings, generation_queue, batch_results
+
+    if Config.STT_BACKEND == "pool":
+        from stt_worker_pool import STTWorkerPool
+        with loader.phase("start_stt_workers"):
+            stt_pool = STTWorkerPool()
+            stt_pool.start()
+        transcribe = stt_pool.transcribe
+    else:
+        with loader.phase("import_audio"):
+            from audio_processor import AudioProcessor
+            from batch_scheduler import WhisperBatchScheduler
+        with loader.phase("load_whisper"):
+            model_sizes = Config.WHISPER_ADAPTIVE_SIZES if Config.WHISPER_ADAPTIVE else None
+            audio_processor = AudioProcessor(Config.WHISPER_MODEL_SIZE, model_sizes=model_sizes)
+        with loader.phase("warmup_whisper"):
+            audio_processor.warm_up()
+        batch_scheduler = WhisperBatchScheduler(audio_processor)
+        transcribe = batch_scheduler.atranscribe
+
+    with loader.phase("import_text"):
+        from text_processor_pool import TextProcessorPool
+    with loader.phase("load_kiwi"):
+        text_pool = TextProcessorPool()
+    with loader.phase("warmup_kiwi"):
+        for processor in text_pool.processors:
+            processor.filter_text("오늘은 친구와 함께 공원에서 산책을 했어요.")
+    with loader.phase("load_user_stats"):
+        from heavy_hitters import UserVocabularyStore
+        user_vocabulary = UserVocabularyStore()
+    with loader.phase("load_tfidf"):
+        from tfidf_ranking import TfidfRankings, TranscriptStore
+        transcript_store = TranscriptStore() if Config.STORE_USER_TRANSCRIPTS else None
+        tfidf_rankings = TfidfRankings()
+    with loader.phase("load_batch_generation"):
+        from batch_generation import PendingGenerationQueue, BatchResultStore
+        generation_queue = PendingGenerationQueue()
+        batch_results = BatchResultStore()
+
+    with loader.phase("import_generator"):
+        from english_material_generator import EnglishMaterialGenerator
+    with loader.phase("init_generator"):
+        english_generator = EnglishMaterialGenerator()
+
+@app.on_event("startup")
+async def start_loading_services():
+    service_loader.start(load_services)
+
+@app.on_event("shutdown")
+async def stop_services():
+    if stt_pool is not None:
+        stt_pool.shutdown()
+    if batch_scheduler is not None:
+        batch_scheduler.shutdown()
+    if text_pool is not None:
+        text_pool.shutdown()
+    if english_generator is not None:
+        await english_generator.aclose()
+
+@app.exception_handler(TextProcessorPoolFull)
+async def text_pool_full_handler(request: Request, exc: TextProcessorPoolFull):
+    """형태소 분석 대기열이 가득 차면 503으로 응답 (클라이언트가 잠시 후 재시도)"""
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
 
 # 모델 정의
 class DialogueEntry(BaseModel):
@@ -47,67 +125,83 @@ class LearningMaterial(BaseModel):
     vocabulary: Optional[List[VocabularyEntry]]
     error: Optional[str] = None
     partial_content: Optional[str] = None
+    cached: bool = False  # 생성 결과 캐시에서 가져온 결과인지 여부
+
+def validate_upload(file):
+    """
+    업로드된 음성 파일의 형식과 크기를 검증하는 함수
+    :param file: 업로드된 음성 파일
+    :return: 파일 크기(바이트)
+    """
+    # 파일 형식 및 크기 검증
+    allowed_extensions = ['.wav', '.mp3', '.m4a']
+    file_extension = os.path.splitext(file.filename)[1].lower()
+    if file_extension not in allowed_extensions:
+        raise HTTPException(status_code=400, detail="Unsupported file format")
+    
+    MAX_FILE_SIZE = 25 * 1024 * 1024  # 25MB
+    file.file.seek(0, 2)
+    file_size = file.file.tell()
+    file.file.seek(0)
+    
+    if file_size > MAX_FILE_SIZE:
+        raise HTTPException(status_code=400, detail="File size exceeds the limit (25MB)")
+
+    logger.info(f"Received audio file: {file.filename}, size: {file_size} bytes")
+    return file_size
+
+async def prepare_material_inputs(file, x_user_id):
+    """
+    음성 파일을 텍스트로 변환하고 학습 자료 생성에 사용할 상위 문장과 단어를 고르는 함수
+    :param file: 검증된 음성 파일
+    :param x_user_id: 사용자 식별자 (있으면 사용자별 장기 빈도와 전사문 저장소에 누적)
+    :return: (상위 문장 리스트, 상위 단어 리스트)
+    """
+    # 업로드 버퍼에서 바로 디코딩하여 음성을 텍스트로 변환
+    text = await transcribe(file.file)
+    if text is None:
+        raise ValueError("Failed to transcribe audio")
+    
+    logger.info("Audio transcription completed")
+    logger.info(f"Transcribed text: {text[:100]}...")  # 처음 100자만 로깅
+
+    # 텍스트 전처리 및 학습 자료 생성 (형태소 분석 풀에서 실행하여 다른 요청을 막지 않음)
+    sentences, words = await text_pool.filter_text(text)
+    logger.info(f"Filtered sentences: {len(sentences)}, words: {len(words)}")
+    if x_user_id:
+        # 사용자별 누적 빈도 갱신 (파일 저장이 있으므로 이벤트 루프 밖에서 실행)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, user_vocabulary.record, x_user_id, words, sentences)
+        if transcript_store is not None:
+            # TF-IDF 배치 작업(python -m tfidf_ranking)의 입력으로 전사문 저장
+            await loop.run_in_executor(None, transcript_store.append, x_user_id, text)
+    
+    top_sentences, top_words = await text_pool.get_top(sentences, words, Config.NUM_SENTENCES, Config.NUM_WORDS)
+    if tfidf_rankings.idf:
+        # 배치 작업의 코퍼스 IDF가 있으면 모든 사용자에게 흔한 단어의 순위를 낮춤
+        top_words = tfidf_rankings.rank_words(words, Config.NUM_WORDS)
+    
+    logger.info("Text processing completed")
+    logger.info(f"Top sentences: {len(top_sentences)}, Top words: {len(top_words)}")
+    return top_sentences, top_words
 
 @app.post("/generate_material", response_model=LearningMaterial)
-async def create_learning_material(file: UploadFile = File(...)):
+async def create_learning_material(file: UploadFile = File(...), x_user_id: Optional[str] = Header(None)):
     """
     음성 파일을 받아 학습 자료를 생성하고 반환하는 엔드포인트
     
     :param file: 업로드된 음성 파일 (지원 형식: WAV, MP3, M4A, 최대 크기: 25MB)
+    :param x_user_id: 사용자 식별자 (X-User-Id 헤더, 있으면 사용자별 장기 빈도에 누적)
     :return: 생성된 학습 자료
     """
-    temp_file_path = None
-    try:
-        # 파일 형식 및 크기 검증
-        allowed_extensions = ['.wav', '.mp3', '.m4a']
-        file_extension = os.path.splitext(file.filename)[1].lower()
-        if file_extension not in allowed_extensions:
-            raise HTTPException(status_code=400, detail="Unsupported file format")
-        
-        MAX_FILE_SIZE = 25 * 1024 * 1024  # 25MB
-        file.file.seek(0, 2)
-        file_size = file.file.tell()
-        file.file.seek(0)
-        
-        if file_size > MAX_FILE_SIZE:
-            raise HTTPException(status_code=400, detail="File size exceeds the limit (25MB)")
-
-        logger.info(f"Received audio file: {file.filename}, size: {file_size} bytes")
+    if not service_loader.ready:
+        raise HTTPException(status_code=503, detail="Server is still loading models")
 
-        # 임시 파일로 저장
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = os.path.abspath(temp_file.name)
-
-        logger.info(f"Temporary file created: {temp_file_path}")
-
-        # 파일이 제대로 저장되었는지 확인
-        if not os.path.exists(temp_file_path):
-            raise FileNotFoundError(f"Temporary file not found: {temp_file_path}")
-
-        file_size = os.path.getsize(temp_file_path)
-        logger.info(f"Temporary file size: {file_size} bytes")
-
-        # 음성을 텍스트로 변환
-        text = audio_processor.transcribe_audio(temp_file_path)
-        if text is None:
-            raise ValueError("Failed to transcribe audio")
-        
-        logger.info("Audio transcription completed")
-        logger.info(f"Transcribed text: {text[:100]}...")  # 처음 100자만 로깅
-
-        # 텍스트 전처리 및 학습 자료 생성
-        sentences, words = text_processor.filter_text(text)
-        logger.info(f"Filtered sentences: {len(sentences)}, words: {len(words)}")
-        
-        top_sentences = text_processor.get_top_items(sentences, Config.NUM_SENTENCES)
-        top_words = text_processor.get_top_items(words, Config.NUM_WORDS)
-        
-        logger.info("Text processing completed")
-        logger.info(f"Top sentences: {len(top_sentences)}, Top words: {len(top_words)}")
+    try:
+        validate_upload(file)
+        top_sentences, top_words = await prepare_material_inputs(file, x_user_id)
 
-        material = english_generator.generate_material(top_sentences, top_words)
+        material = await english_generator.agenerate_material(top_sentences, top_words)
         
         if "error" in material:
             logger.error(f"Error in generate_material: {material['error']}")
@@ -123,6 +217,8 @@ async def create_learning_material(file: UploadFile = File(...)):
 
         return LearningMaterial(**material)
 
+    except TextProcessorPoolFull:
+        raise
     except Exception as e:
         logger.error(f"Error in create_learning_material: {str(e)}")
         logger.error(f"Full error: {traceback.format_exc()}")
@@ -133,19 +229,156 @@ async def create_learning_material(file: UploadFile = File(...)):
             partial_content=traceback.format_exc()
         )
 
-    finally:
-        # 임시 파일 삭제
-        if temp_file_path and os.path.exists(temp_file_path):
-            try:
-                os.unlink(temp_file_path)
-                logger.info(f"Temporary file deleted: {temp_file_path}")
-            except Exception as e:
-                logger.error(f"Error deleting temporary file: {str(e)}")
+def sse_event(event, data):
+    """서버 전송 이벤트(SSE) 메시지 하나를 만드는 함수"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.post("/generate_material/stream")
+async def stream_learning_material(file: UploadFile = File(...), x_user_id: Optional[str] = Header(None)):
+    """
+    음성 파일을 받아 학습 자료를 서버 전송 이벤트(text/event-stream)로 스트리밍하는 엔드포인트
+    대화 문장과 단어가 하나씩 완성될 때마다 전송하므로 전체 생성이 끝나기 전에 첫 항목을 표시할 수 있습니다.
+
+    이벤트 순서:
+        status (stage: transcribing -> generating)
+        dialogue / vocabulary (항목마다 하나, DialogueEntry / VocabularyEntry 형식)
+        done ({"cached": bool, "complete": bool}) 또는 error ({"error": str, "partial_content": str})
+
+    :param file: 업로드된 음성 파일 (지원 형식: WAV, MP3, M4A, 최대 크기: 25MB)
+    :param x_user_id: 사용자 식별자 (X-User-Id 헤더, 있으면 사용자별 장기 빈도에 누적)
+    """
+    if not service_loader.ready:
+        raise HTTPException(status_code=503, detail="Server is still loading models")
+    # 스트림을 시작하기 전에 검증하여 잘못된 요청은 일반 HTTP 오류로 응답
+    validate_upload(file)
+
+    async def events():
+        try:
+            yield sse_event("status", {"stage": "transcribing"})
+            top_sentences, top_words = await prepare_material_inputs(file, x_user_id)
+            yield sse_event("status", {"stage": "generating"})
+            async for event, data in english_generator.astream_material(top_sentences, top_words):
+                yield sse_event(event, data)
+        except Exception as e:
+            logger.error(f"Error in stream_learning_material: {str(e)}")
+            logger.error(f"Full error: {traceback.format_exc()}")
+            yield sse_event("error", {"error": str(e), "partial_content": None})
+
+    # 프록시가 이벤트를 모아서 보내지 않도록 버퍼링 비활성화
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
+
+@app.post("/generate_material/batch")
+async def queue_learning_material(file: UploadFile = File(...), x_user_id: Optional[str] = Header(None)):
+    """
+    음성 파일을 받아 학습 자료 생성을 야간 배치 작업(python -m batch_generation)에 맡기는 엔드포인트
+    음성 변환과 문장/단어 선택까지만 처리하고 생성 요청은 대기열에 추가하므로 GPT 호출을 기다리지 않습니다.
+    결과는 배치 작업이 끝난 뒤 /users/{user_id}/materials에서 조회합니다.
+
+    :param file: 업로드된 음성 파일 (지원 형식: WAV, MP3, M4A, 최대 크기: 25MB)
+    :param x_user_id: 사용자 식별자 (X-User-Id 헤더, 필수)
+    :return: 요청 식별자
+    """
+    if not service_loader.ready:
+        raise HTTPException(status_code=503, detail="Server is still loading models")
+    if not x_user_id:
+        raise HTTPException(status_code=400, detail="X-User-Id header is required for batch generation")
+    validate_upload(file)
+
+    top_sentences, top_words = await prepare_material_inputs(file, x_user_id)
+    loop = asyncio.get_running_loop()
+    request_id = await loop.run_in_executor(None, generation_queue.enqueue, x_user_id, top_sentences, top_words)
+    logger.info(f"Queued learning material request {request_id} for batch generation")
+    return {"request_id": request_id, "status": "queued"}
+
+@app.get("/users/{user_id}/materials")
+async def user_batch_materials(user_id: str):
+    """
+    배치 작업에서 생성한 사용자의 학습 자료를 반환하는 엔드포인트 (오래된 순)
+    :param user_id: 사용자 식별자
+    """
+    if not service_loader.ready:
+        raise HTTPException(status_code=503, detail="Server is still loading models")
+    materials = await asyncio.get_running_loop().run_in_executor(None, batch_results.user_materials, user_id)
+    return {"materials": materials}
+
+@app.get("/cache_stats")
+async def cache_stats():
+    """캐시 적중/실패/제거 통계를 반환하는 엔드포인트"""
+    # 워커 풀 모드에서는 캐시가 각 워커 프로세스에 있으므로 여기서 집계하지 않음
+    transcript_cache = None
+    if audio_processor is not None and audio_processor.cache is not None:
+        transcript_cache = audio_processor.cache.stats()
+    text_analysis = text_pool.cache_stats() if text_pool is not None else None
+    generation = None
+    if english_generator is not None and english_generator.cache is not None:
+        generation = await asyncio.get_running_loop().run_in_executor(None, english_generator.cache.stats)
+    return {"transcript_cache": transcript_cache, "text_analysis": text_analysis, "generation": generation}
+
+@app.get("/text_pool_stats")
+async def text_pool_stats():
+    """형태소 분석 풀의 대기 요청 수와 평균 대기/실행 시간을 반환하는 엔드포인트"""
+    if text_pool is None:
+        raise HTTPException(status_code=503, detail="Server is still loading models")
+    return text_pool.stats()
+
+@app.get("/generation_stats")
+async def generation_stats():
+    """학습 자료 생성 호출의 평균 입력/출력 토큰 수와 지연 시간을 반환하는 엔드포인트"""
+    if english_generator is None:
+        raise HTTPException(status_code=503, detail="Server is still loading models")
+    return english_generator.call_stats.stats()
+
+@app.get("/users/{user_id}/top_items")
+async def user_top_items(user_id: str, num_sentences: int = Config.NUM_SENTENCES, num_words: int = Config.NUM_WORDS):
+    """
+    사용자의 장기(시간 감쇠) 상위 문장과 단어, 배치 작업에서 계산한 TF-IDF 상위 단어를 반환하는 엔드포인트
+    :param user_id: 사용자 식별자
+    """
+    if not service_loader.ready:
+        raise HTTPException(status_code=503, detail="Server is still loading models")
+    distinctive_words = await asyncio.get_running_loop().run_in_executor(None, tfidf_rankings.user_words, user_id, num_words)
+    return {
+        "sentences": user_vocabulary.top(user_id, "sentences", num_sentences),
+        "words": user_vocabulary.top(user_id, "words", num_words),
+        "distinctive_words": distinctive_words,
+    }
+
+@app.delete("/users/{user_id}/transcripts")
+async def delete_user_transcripts(user_id: str):
+    """
+    사용자의 저장된 전사문과 전사문으로 계산한 TF-IDF 순위, 장기 단어/문장 요약을 삭제하는 엔드포인트
+    :param user_id: 사용자 식별자
+    :return: 무언가 삭제했는지 여부와 저장소별 삭제 여부
+    """
+    if not service_loader.ready:
+        raise HTTPException(status_code=503, detail="Server is still loading models")
+    loop = asyncio.get_running_loop()
+    # 저장이 꺼져 있어도 이전에 저장된 전사문이 남아 있을 수 있으므로 저장소를 열어 삭제
+    from tfidf_ranking import TranscriptStore
+    store = transcript_store or TranscriptStore()
+    deleted = await loop.run_in_executor(None, store.delete_user, user_id)
+    await loop.run_in_executor(None, tfidf_rankings.delete_user, user_id)
+    # X-User-Id가 있는 요청마다 쌓인 장기 요약에도 정규화된 문장 원문이 있으므로 함께 삭제
+    stats_deleted = await loop.run_in_executor(None, user_vocabulary.delete_user, user_id)
+    logger.info(f"Deleted stored data for a user (transcripts: {deleted}, user stats: {stats_deleted})")
+    return {"deleted": deleted or stats_deleted, "transcripts": deleted, "user_stats": stats_deleted}
 
 @app.get("/server_check")
 async def server_status_check():
-    """서버 상태를 확인하는 엔드포인트"""
-    return {"status": "good"}
+    """서버 상태를 확인하는 엔드포인트 (기존 클라이언트 호환용 liveness)"""
+    return {"status": "good", "ready": service_loader.ready}
+
+@app.get("/health/live")
+async def liveness_check():
+    """프로세스가 살아 있고 요청을 받을 수 있는지 확인하는 엔드포인트"""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness_check():
+    """모델 로드와 워밍업이 끝났는지 확인하는 엔드포인트 (준비 전에는 503)"""
+    status = service_loader.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,9 +1,11 @@
 from fastapi import FastAPI, File, UploadFile, Request
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 from audio_processor import AudioProcessor
-from text_processor import TextProcessor
+from batch_scheduler import WhisperBatchScheduler
+from text_processor_pool import TextProcessorPool, TextProcessorPoolFull
 from english_material_generator import EnglishMaterialGenerator
 from config import Config
 
@@ -15,13 +17,24 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 # HTML 템플릿
 templates = Jinja2Templates(directory="templates")
 
-audio_processor = AudioProcessor()
-text_processor = TextProcessor()
+audio_processor = AudioProcessor(model_sizes=Config.WHISPER_ADAPTIVE_SIZES if Config.WHISPER_ADAPTIVE else None)
+batch_scheduler = WhisperBatchScheduler(audio_processor)
+text_pool = TextProcessorPool()
 english_generator = EnglishMaterialGenerator()
 
 class LearningMaterial(BaseModel):
     dialogue: list
     vocabulary: list
+    cached: bool = False  # 생성 결과 캐시에서 가져온 결과인지 여부
+
+@app.exception_handler(TextProcessorPoolFull)
+async def text_pool_full_handler(request: Request, exc: TextProcessorPoolFull):
+    """형태소 분석 대기열이 가득 차면 503으로 응답 (클라이언트가 잠시 후 재시도)"""
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
+@app.on_event("shutdown")
+async def close_clients():
+    await english_generator.aclose()
 
 @app.get("/")
 async def home(request: Request):
@@ -29,19 +42,16 @@ async def home(request: Request):
 
 @app.post("/transcribe/", response_model=str)
 async def transcribe_audio(file: UploadFile = File(...)):
-    contents = await file.read()
-    text = audio_processor.transcribe_audio(contents)
+    text = await batch_scheduler.atranscribe(file.file)
     return text
 
 @app.post("/generate_material/", response_model=LearningMaterial)
 async def generate_material(file: UploadFile = File(...)):
-    contents = await file.read()
-    text = audio_processor.transcribe_audio(contents)
+    text = await batch_scheduler.atranscribe(file.file)
     if text:
-        sentences, words = text_processor.filter_text(text)
-        top_sentences = text_processor.get_top_items(sentences, Config.NUM_SENTENCES)
-        top_words = text_processor.get_top_items(words, Config.NUM_WORDS)
-        material = english_generator.generate_material(top_sentences, top_words)
+        sentences, words = await text_pool.filter_text(text)
+        top_sentences, top_words = await text_pool.get_top(sentences, words, Config.NUM_SENTENCES, Config.NUM_WORDS)
+        material = await english_generator.agenerate_material(top_sentences, top_words)
         return material
     return {"dialogue": [], "vocabulary": []}
 
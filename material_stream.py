@@ -0,0 +1,158 @@
+import json
+import re
+
+# 스트리밍으로 내보낼 배열 키
+ENTRY_SECTIONS = ("dialogue", "vocabulary")
+# 문자 하나씩 검사하지 않고 의미 있는 문자로 바로 건너뛰기 위한 패턴
+OBJECT_START = re.compile(r'\{')
+STRUCTURAL = re.compile(r'["{}\[\]]')
+STRING_SPECIAL = re.compile(r'["\\]')
+# 모델 출력에서 자주 보이는 닫는 괄호 앞의 쉼표 (항목 파싱 실패 시에만 제거)
+TRAILING_COMMA = re.compile(r',\s*([}\]])')
+# 문자열 안의 줄바꿈 같은 제어 문자를 허용하는 디코더
+DECODER = json.JSONDecoder(strict=False)
+
+class IncrementalMaterialParser:
+    """
+    토큰 단위로 도착하는 모델 응답에서 dialogue/vocabulary 항목을 완성되는 즉시 꺼내는 파서.
+    문자열 안팎과 괄호 깊이만 추적하며 괄호/따옴표 위치로 바로 건너뛰어 각 문자를 한 번만 검사하고,
+    이미 처리한 앞부분은 버퍼에서 버리므로 응답 길이와 관계없이 버퍼는 항목 하나 크기로 유지됩니다.
+    최상위 객체 앞의 설명 문장이나 ```json 코드 펜스는 무시하고, 응답이 중간에 잘려도
+    그때까지 완성된 항목은 유지합니다. 항목 안의 끝 쉼표, 문자열 안의 줄바꿈, 대문자 키도 허용합니다.
+    """
+
+    def __init__(self):
+        self.entries = {section: [] for section in ENTRY_SECTIONS}
+        self.complete = False  # 최상위 객체가 닫혔는지 여부
+        self.invalid_entries = 0  # 닫혔지만 복구하지 못해 버린 항목 수
+        self.found = False  # 현재 최상위 객체에서 dialogue/vocabulary 배열을 만났는지 여부
+        self._buffer = ""
+        self._position = 0  # 다음에 검사할 버퍼 위치
+        self._stack = []  # 열린 괄호 ('{' 또는 '[')
+        self._in_string = False
+        self._string_start = None  # 최상위 객체의 키 문자열 시작 위치
+        self._last_key = None
+        self._section = None  # 현재 열려 있는 최상위 배열의 키
+        self._entry_start = None  # 현재 수집 중인 항목 객체의 시작 위치
+
+    def feed(self, chunk):
+        """
+        응답 조각을 추가하고 새로 완성된 항목을 반환하는 메서드
+        :param chunk: 모델이 보낸 텍스트 조각
+        :return: (섹션 이름, 항목 딕셔너리) 튜플 리스트
+        """
+        if self.complete or not chunk:
+            return []
+        self._buffer += chunk
+        completed = []
+        buffer = self._buffer
+        stack = self._stack
+        index = self._position
+        while True:
+            if self._in_string:
+                match = STRING_SPECIAL.search(buffer, index)
+                if match is None:
+                    index = len(buffer)
+                    break
+                index = match.start()
+                if buffer[index] == '\\':
+                    if index + 1 == len(buffer):
+                        break  # 이스케이프 문자가 조각 경계에서 잘림: 다음 조각에서 이어서 검사
+                    index += 2
+                    continue
+                self._in_string = False
+                if self._string_start is not None:
+                    key = _loads(buffer[self._string_start:index + 1])
+                    self._last_key = key.lower() if isinstance(key, str) else None
+                    self._string_start = None
+                index += 1
+                continue
+
+            # 최상위 객체가 시작되기 전의 설명 문장이나 코드 펜스는 건너뜀
+            match = (STRUCTURAL if stack else OBJECT_START).search(buffer, index)
+            if match is None:
+                index = len(buffer)
+                break
+            index = match.start()
+            char = buffer[index]
+            if char == '"':
+                self._in_string = True
+                if len(stack) == 1:
+                    self._string_start = index
+            elif char in '{[':
+                if len(stack) == 1 and char == '[':
+                    self._section = self._last_key if self._last_key in ENTRY_SECTIONS else None
+                    self.found = self.found or self._section is not None
+                elif len(stack) == 2 and char == '{' and self._section is not None:
+                    self._entry_start = index
+                stack.append(char)
+            else:
+                # 짝이 맞지 않는 닫는 괄호도 한 단계 닫힌 것으로 처리
+                stack.pop()
+                if len(stack) == 2 and char == '}' and self._entry_start is not None:
+                    entry = _loads(buffer[self._entry_start:index + 1])
+                    if isinstance(entry, dict):
+                        entry = {key.lower() if isinstance(key, str) else key: value for key, value in entry.items()}
+                        self.entries[self._section].append(entry)
+                        completed.append((self._section, entry))
+                    else:
+                        self.invalid_entries += 1
+                    self._entry_start = None
+                elif len(stack) == 1 and char == ']':
+                    self._section = None
+                elif not stack:
+                    if self.found:
+                        self.complete = True
+                        index += 1
+                        break
+                    # 설명 문장 속 중괄호처럼 학습 자료가 아닌 객체였으면 다음 객체를 찾음
+                    self._last_key = None
+            index += 1
+
+        # 수집 중인 항목이나 키 문자열이 없으면 처리한 앞부분을 버림
+        keep = min(start for start in (self._entry_start, self._string_start, index) if start is not None)
+        self._buffer = buffer[keep:]
+        self._position = index - keep
+        if self._entry_start is not None:
+            self._entry_start -= keep
+        if self._string_start is not None:
+            self._string_start -= keep
+        return completed
+
+    def material(self):
+        """지금까지 완성된 항목으로 학습 자료 딕셔너리를 만드는 메서드"""
+        return {section: list(entries) for section, entries in self.entries.items()}
+
+def recover_material(content):
+    """
+    완성된(또는 잘린) 모델 응답 전체에서 학습 자료를 선형 시간에 복구하는 함수
+    :param content: 모델 응답 텍스트
+    :return: (dialogue와 vocabulary 항목 딕셔너리, 최상위 객체가 닫혔고 버린 항목이 없는지 여부, 학습 자료 배열을 찾았는지 여부)
+    """
+    # 정상 응답은 C 구현 디코더 한 번으로 처리하고, 실패하면 항목 단위 탐색으로 복구
+    start = content.find('{')
+    if start != -1:
+        try:
+            value, _ = DECODER.raw_decode(content, start)
+        except json.JSONDecodeError:
+            value = None
+        if isinstance(value, dict):
+            sections = {key.lower(): entries for key, entries in value.items() if isinstance(key, str)}
+            if all(isinstance(sections.get(section), list) and all(isinstance(entry, dict) for entry in sections[section])
+                   for section in ENTRY_SECTIONS):
+                material = {section: [{key.lower() if isinstance(key, str) else key: item for key, item in entry.items()}
+                                      for entry in sections[section]] for section in ENTRY_SECTIONS}
+                return material, True, True
+    parser = IncrementalMaterialParser()
+    parser.feed(content)
+    return parser.material(), parser.complete and not parser.invalid_entries, parser.found
+
+def _loads(text):
+    try:
+        return DECODER.decode(text)
+    except json.JSONDecodeError:
+        pass
+    try:
+        return DECODER.decode(TRAILING_COMMA.sub(r'\1', text))
+    except json.JSONDecodeError:
+        return None
@@ -0,0 +1,68 @@
+import logging
+import threading
+from config import Config
+
+class ModelSizeSelector:
+    """
+    대기 중인 작업 수와 지연 목표(SLO)를 기준으로 작업마다 Whisper 모델 크기를 고르는 선택기.
+    모델별 실시간 배율(RTF, 추론 시간 / 오디오 길이)을 실제 처리 결과로 갱신하면서,
+    목표 시간 안에 끝날 것으로 예상되는 가장 정확한 모델을 선택합니다.
+    """
+
+    # 측정값이 쌓이기 전에 사용하는 CPU 기준 대략적인 RTF
+    DEFAULT_RTF = {"tiny": 0.05, "base": 0.1, "small": 0.3, "medium": 0.9, "large": 2.0, "turbo": 0.6}
+
+    def __init__(self, sizes=None, latency_slo=None, parallelism=1, smoothing=None):
+        """
+        :param sizes: 선택 가능한 모델 크기 목록 (정확도가 낮은 순)
+        :param latency_slo: 요청 하나의 목표 응답 시간(초)
+        :param parallelism: 동시에 처리되는 작업 수 (워커 프로세스 수 등)
+        :param smoothing: RTF 지수 이동 평균 계수
+        """
+        self.sizes = list(sizes or Config.WHISPER_ADAPTIVE_SIZES)
+        self.latency_slo = latency_slo or Config.LATENCY_SLO_SECONDS
+        self.parallelism = max(1, parallelism)
+        self.smoothing = smoothing or Config.MODEL_RTF_SMOOTHING
+        # "base.en", "large-v3" 같은 이름은 기본 크기의 RTF로 시작
+        self._rtf = {size: self.DEFAULT_RTF.get(size.split('.')[0].split('-')[0], 1.0) for size in self.sizes}
+        self._lock = threading.Lock()
+
+    def estimate(self, size, audio_seconds, queue_depth=0):
+        """
+        작업이 끝날 때까지의 예상 시간(초)을 계산하는 메서드
+        앞선 작업들도 같은 길이라고 보고, 병렬 처리 수만큼 나누어 대기 시간을 더합니다.
+        """
+        return audio_seconds * self._rtf[size] * (1 + queue_depth / self.parallelism)
+
+    def choose(self, audio_seconds, queue_depth=0):
+        """
+        작업에 사용할 모델 크기를 고르는 메서드
+        :param audio_seconds: 변환할 오디오 길이(초)
+        :param queue_depth: 이 작업보다 먼저 처리 중이거나 대기 중인 작업 수
+        :return: 지연 목표를 만족하는 가장 큰 모델 (없으면 가장 작은 모델)
+        """
+        with self._lock:
+            estimates = {size: self.estimate(size, audio_seconds, queue_depth) for size in self.sizes}
+        chosen = next((size for size in reversed(self.sizes) if estimates[size] <= self.latency_slo), self.sizes[0])
+        logging.info(f"Selected Whisper model '{chosen}' for {audio_seconds:.1f}s audio "
+                     f"(queue_depth={queue_depth}, estimated={estimates[chosen]:.1f}s, slo={self.latency_slo}s)")
+        return chosen
+
+    def record(self, size, audio_seconds, elapsed):
+        """
+        실제 추론 시간으로 모델의 RTF를 갱신하는 메서드
+        :param size: 사용한 모델 크기
+        :param audio_seconds: 처리한 오디오 길이(초)
+        :param elapsed: 추론에 걸린 시간(초, 대기 시간 제외)
+        """
+        if audio_seconds <= 0 or size not in self._rtf:
+            return
+        with self._lock:
+            self._rtf[size] += self.smoothing * (elapsed / audio_seconds - self._rtf[size])
+            rtf = self._rtf[size]
+        logging.info(f"Whisper model '{size}' processed {audio_seconds:.1f}s audio in {elapsed:.2f}s (RTF EMA {rtf:.3f})")
+
+    def rtf(self):
+        """모델별 현재 RTF 추정값을 반환"""
+        with self._lock:
+            return dict(self._rtf)
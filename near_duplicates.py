@@ -0,0 +1,164 @@
+import zlib
+from collections import Counter
+import numpy as np
+from config import Config
+
+# 어절 끝에서 떼어 내는 조사와 종결 '요' (긴 것부터 비교)
+# 짧은 구어 문장은 "친구와/친구랑", "밥/밥은"처럼 조사 하나만 달라도 문자 n-gram이 크게 달라지므로 떼고 비교
+PARTICLES = tuple(sorted(
+    ["은", "는", "이", "가", "을", "를", "와", "과", "랑", "이랑", "하고", "도", "만", "의", "에", "엔", "에는", "에서",
+     "에선", "에게", "한테", "께", "로", "으로", "까지", "부터", "처럼", "보다", "이나", "나", "요"],
+    key=len, reverse=True))
+# 어절 끝의 문장 부호
+TRAILING_PUNCTUATION = ".,!?~…\"'"
+
+def strip_particle(token):
+    """어절 끝의 문장 부호와 조사(또는 종결 '요') 하나를 떼어 내는 함수 (어절이 조사만으로 이루어졌으면 그대로 둠)"""
+    token = token.rstrip(TRAILING_PUNCTUATION) or token
+    for particle in PARTICLES:
+        if len(token) > len(particle) and token.endswith(particle):
+            return token[:-len(particle)]
+    return token
+
+class MinHashLSH:
+    """
+    문자 n-gram MinHash 서명과 LSH 밴딩으로 비슷한 문장을 묶는 클러스터러.
+    모든 문장 쌍을 비교하지 않고 같은 버킷에 들어간 문장만 확인하므로
+    문장 수에 거의 선형으로 동작합니다.
+    """
+
+    def __init__(self, threshold=None, num_perm=None, shingle_size=None, strip_particles=None, seed=1):
+        """
+        :param threshold: 같은 묶음으로 볼 최소 자카드 유사도 (0~1)
+        :param num_perm: MinHash 해시 함수 수 (클수록 정확하지만 느림)
+        :param shingle_size: 문자 n-gram 길이
+        :param strip_particles: 어절 끝의 조사를 떼고 n-gram을 만들지 여부
+        :param seed: 해시 함수 생성 시드
+        """
+        self.threshold = Config.SENTENCE_SIMILARITY_THRESHOLD if threshold is None else threshold
+        self.num_perm = num_perm or Config.MINHASH_NUM_PERM
+        self.shingle_size = shingle_size or Config.SHINGLE_SIZE
+        self.strip_particles = Config.SHINGLE_STRIP_PARTICLES if strip_particles is None else strip_particles
+        self.bands, self.rows = self._optimal_bands(self.threshold, self.num_perm)
+        self._min_matches = int(np.ceil(self.threshold * self.num_perm))
+        rng = np.random.default_rng(seed)
+        # 곱셈-시프트 해시 (a * x + b mod 2^64의 상위 32비트), a는 홀수
+        self._a = rng.integers(1, 2**63, size=(self.num_perm, 1), dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 2**63, size=(self.num_perm, 1), dtype=np.uint64)
+
+    def grams(self, sentence):
+        """어절 끝의 조사를 떼고 공백을 제거한 문장의 문자 n-gram 집합"""
+        tokens = sentence.split()
+        if self.strip_particles:
+            tokens = [strip_particle(token) for token in tokens]
+        text = "".join(tokens)
+        size = self.shingle_size
+        return {text[i:i + size] for i in range(max(len(text) - size + 1, 1))}
+
+    def shingles(self, sentence):
+        """문장의 문자 n-gram을 32비트 해시 배열로 반환"""
+        grams = self.grams(sentence)
+        return np.fromiter((zlib.crc32(gram.encode()) for gram in grams), dtype=np.uint64, count=len(grams))
+
+    def signature(self, sentence):
+        """문장의 MinHash 서명 (num_perm개의 32비트 최솟값)"""
+        return self.signatures([sentence])[0]
+
+    def signatures(self, sentences, max_cells=None):
+        """
+        여러 문장의 MinHash 서명을 한 번에 계산하는 메서드
+        문장들의 n-gram을 이어 붙여 해시한 뒤 문장 경계별 최솟값을 구합니다.
+        (해시 함수 수 x n-gram 수) 중간 행렬이 max_cells를 넘지 않도록 n-gram 수 기준으로 문장을 나누고,
+        한 문장의 n-gram이 그보다 많으면 해시 함수를 나눠 계산하므로 문장 길이와 관계없이 메모리 사용량이 일정합니다.
+        :param max_cells: 중간 행렬의 최대 원소 수 (원소당 8바이트)
+        :return: (문장 수, num_perm) uint32 배열
+        """
+        max_cells = max_cells or Config.MINHASH_MAX_CELLS
+        results = np.zeros((len(sentences), self.num_perm), dtype=np.uint32)
+        batch, batch_start, batch_shingles = [], 0, 0
+        for index, sentence in enumerate(sentences):
+            shingles = self.shingles(sentence)
+            if batch and (batch_shingles + len(shingles)) * self.num_perm > max_cells:
+                self._fill_signatures(results, batch_start, batch, max_cells)
+                batch, batch_start, batch_shingles = [], index, 0
+            batch.append(shingles)
+            batch_shingles += len(shingles)
+        if batch:
+            self._fill_signatures(results, batch_start, batch, max_cells)
+        return results
+
+    def _fill_signatures(self, results, start, shingles, max_cells):
+        # 문장 묶음 하나의 서명을 해시 함수 묶음 단위로 계산하여 results[start:]에 기록
+        offsets = np.cumsum([0] + [len(values) for values in shingles[:-1]])
+        values = np.concatenate(shingles)[np.newaxis, :]
+        step = max(1, max_cells // values.shape[1])
+        for first in range(0, self.num_perm, step):
+            hashes = self._a[first:first + step] * values
+            hashes += self._b[first:first + step]
+            hashes >>= np.uint64(32)
+            results[start:start + len(shingles), first:first + step] = np.minimum.reduceat(hashes, offsets, axis=1).T
+
+    def cluster(self, sentences):
+        """
+        비슷한 문장끼리 묶고 묶음별 빈도를 세는 메서드
+        :param sentences: 문장 리스트 (중복 포함)
+        :return: (대표 문장, 묶음 빈도, 묶음에 속한 서로 다른 문장 리스트) 튜플을 빈도 내림차순으로 정렬한 리스트
+        """
+        counts = Counter(sentences)
+        unique = list(counts)  # 첫 등장 순서 유지
+        if not unique:
+            return []
+        signatures = self.signatures(unique)
+        parent = list(range(len(unique)))
+
+        def find(index):
+            while parent[index] != index:
+                parent[index] = parent[parent[index]]
+                index = parent[index]
+            return index
+
+        for band in range(self.bands):
+            band_keys = signatures[:, band * self.rows:(band + 1) * self.rows]
+            buckets = {}  # 밴드 키 -> 버킷 안 묶음별 대표 문장 인덱스
+            for index, key in enumerate(map(bytes, band_keys)):
+                leaders = buckets.setdefault(key, [])
+                # 버킷 안 각 묶음의 대표와 서명 일치율(추정 자카드 유사도)을 확인하여 거짓 후보 제거
+                for leader in leaders:
+                    if np.count_nonzero(signatures[leader] == signatures[index]) >= self._min_matches:
+                        root, other = find(leader), find(index)
+                        if root != other:
+                            parent[other] = root
+                        break
+                else:
+                    leaders.append(index)
+
+        clusters = {}
+        for index in range(len(unique)):
+            clusters.setdefault(find(index), []).append(index)
+
+        results = []
+        for members in clusters.values():
+            # 묶음 안에서 가장 자주 나온 문장을 대표로 사용 (같으면 먼저 나온 문장)
+            representative = max(members, key=lambda index: (counts[unique[index]], -index))
+            total = sum(counts[unique[index]] for index in members)
+            results.append((unique[representative], total, [unique[index] for index in members]))
+        results.sort(key=lambda result: result[1], reverse=True)
+        return results
+
+    # 거짓 양성은 서명 비교로 다시 걸러지므로 놓치는 쌍(거짓 음성)에 더 큰 비용을 둠
+    FALSE_NEGATIVE_WEIGHT = 8
+
+    @classmethod
+    def _optimal_bands(cls, threshold, num_perm):
+        # 임계값 기준 거짓 양성/거짓 음성 확률의 가중합이 가장 작은 (밴드 수, 밴드당 행 수)를 선택
+        similarity = np.linspace(0, 1, 201)
+        best, best_error = (num_perm, 1), float("inf")
+        for bands in range(1, num_perm + 1):
+            rows = num_perm // bands
+            candidate = 1 - (1 - similarity ** rows) ** bands
+            false_positive = np.sum(np.where(similarity < threshold, candidate, 0))
+            false_negative = np.sum(np.where(similarity >= threshold, 1 - candidate, 0))
+            error = false_positive + cls.FALSE_NEGATIVE_WEIGHT * false_negative
+            if error < best_error:
+                best, best_error = (bands, rows), error
+        return best
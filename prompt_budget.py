@@ -0,0 +1,221 @@
+import logging
+import math
+import threading
+from config import Config
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# 토크나이저 없이 추정한다는 경고를 한 번만 남기기 위한 표시
+_estimate_warned = False
+
+class TokenCounter:
+    """
+    모델 토크나이저로 토큰 수를 세는 클래스.
+    tiktoken이 설치되어 있지 않으면 ASCII 4글자당 1토큰, 한글 등 그 밖의 문자는 1글자당 1토큰으로
+    넉넉하게 추정합니다 (실제보다 적게 세어 예산을 넘지 않도록).
+    """
+
+    def __init__(self, model_name=None):
+        """
+        :param model_name: 토크나이저를 고를 모델 이름
+        """
+        global _estimate_warned
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.encoding_for_model(model_name or Config.MODEL_NAME)
+            except KeyError:
+                self.encoding = tiktoken.get_encoding("o200k_base")
+        elif not _estimate_warned:
+            _estimate_warned = True
+            logging.warning("tiktoken is not installed: prompt token budgets use a character-count estimate "
+                            "that can differ from the model's tokenizer (pip install tiktoken for exact counts)")
+
+    def count(self, text):
+        """텍스트의 토큰 수"""
+        if self.encoding is not None:
+            return len(self.encoding.encode(text))
+        ascii_chars = len(text.encode('ascii', 'ignore'))
+        return math.ceil(ascii_chars / 4) + len(text) - ascii_chars
+
+    def truncate(self, text, max_tokens):
+        """
+        텍스트를 앞에서부터 max_tokens 토큰까지만 남기는 메서드
+        :return: 잘라낸 텍스트 (max_tokens 이하이면 그대로)
+        """
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text)
+            if len(tokens) <= max_tokens:
+                return text
+            return self.encoding.decode(tokens[:max_tokens], errors='ignore')
+        cost = 0.0
+        for index, char in enumerate(text):
+            cost += 0.25 if char.isascii() else 1
+            if math.ceil(cost) > max_tokens:
+                return text[:index]
+        return text
+
+    def count_messages(self, messages):
+        """채팅 메시지 리스트의 입력 토큰 수 (메시지마다 역할/구분 토큰 포함)"""
+        return sum(4 + self.count(message["content"]) for message in messages) + 3
+
+class PromptPacker:
+    """
+    상위 문장과 단어를 입력 토큰 예산 안에 순위대로 채워 넣어 프롬프트를 만드는 클래스.
+    너무 긴 문장은 잘라서 사용하고, 예산을 넘는 낮은 순위의 문장과 단어는 제외합니다.
+    출력 토큰 상한은 프롬프트가 요청하는 항목 수로 계산하여 JSON이 중간에 잘리지 않게 합니다.
+    """
+
+    def __init__(self, counter=None, input_budget=None, max_sentence_tokens=None):
+        """
+        :param counter: TokenCounter
+        :param input_budget: 시스템/사용자 메시지 전체의 최대 입력 토큰 수
+        :param max_sentence_tokens: 문장 하나의 최대 토큰 수
+        """
+        self.counter = counter or TokenCounter()
+        self.input_budget = input_budget or Config.PROMPT_INPUT_TOKEN_BUDGET
+        self.max_sentence_tokens = max_sentence_tokens or Config.PROMPT_MAX_SENTENCE_TOKENS
+
+    def pack(self, system_message, user_template, sentences, words):
+        """
+        예산 안에 들어가는 문장과 단어로 채팅 메시지를 만드는 메서드
+        입력은 호출한 쪽에서 이미 순위를 매긴 것이므로 (단어는 TF-IDF 점수 순일 수 있음)
+        순서를 바꾸지 않고 예산에 들어가는 앞부분만 사용합니다.
+        :param system_message: 시스템 메시지
+        :param user_template: {sentences}와 {words} 자리가 있는 사용자 메시지 템플릿
+        :param sentences: 순위순 (문장, 빈도) 튜플 리스트
+        :param words: 순위순 (단어, 빈도 또는 점수) 튜플 리스트
+        :return: (메시지 리스트, 통계 딕셔너리 {"prompt_tokens", "sentences", "words", "dropped_sentences", "dropped_words", "truncated_sentences"})
+        """
+        def build(selected_sentences, selected_words):
+            user_message = user_template.format(
+                sentences="\n".join(f"- {sentence}" for sentence in selected_sentences),
+                words=", ".join(selected_words)
+            )
+            return [{"role": "system", "content": system_message}, {"role": "user", "content": user_message}]
+
+        ranked_sentences = [sentence for sentence, _ in sentences]
+        ranked_words = [word for word, _ in words]
+        truncated = 0
+        for index, sentence in enumerate(ranked_sentences):
+            shortened = self.counter.truncate(sentence, self.max_sentence_tokens)
+            if shortened != sentence:
+                ranked_sentences[index] = shortened
+                truncated += 1
+
+        remaining = self.input_budget - self.counter.count_messages(build([], []))
+        if remaining <= 0:
+            logging.warning(f"Prompt template alone exceeds the input token budget ({self.input_budget})")
+        # 문장이 예산을 모두 쓰지 않도록 단어 목록 몫을 먼저 떼어 둠
+        word_costs = [self.counter.count(word) + 1 for word in ranked_words]  # 쉼표 구분자 포함
+        reserved = min(sum(word_costs), int(max(remaining, 0) * Config.PROMPT_WORD_BUDGET_SHARE))
+        selected_sentences, selected_words = [], []
+        available = remaining - reserved
+        # 더 높은 순위의 항목이 빠지고 낮은 순위 항목이 들어가지 않도록 처음으로 넘치는 항목에서 멈춤
+        for sentence in ranked_sentences:
+            cost = self.counter.count(f"- {sentence}\n")
+            if cost > available:
+                break
+            selected_sentences.append(sentence)
+            available -= cost
+        available += reserved
+        for word, cost in zip(ranked_words, word_costs):
+            if cost > available:
+                break
+            selected_words.append(word)
+            available -= cost
+
+        # 조각별 토큰 수의 합은 전체 토큰 수와 조금 다를 수 있으므로 최종 메시지로 다시 확인
+        messages = build(selected_sentences, selected_words)
+        prompt_tokens = self.counter.count_messages(messages)
+        while prompt_tokens > self.input_budget and (selected_sentences or selected_words):
+            if selected_words:
+                selected_words.pop()
+            else:
+                selected_sentences.pop()
+            messages = build(selected_sentences, selected_words)
+            prompt_tokens = self.counter.count_messages(messages)
+
+        return messages, {
+            "prompt_tokens": prompt_tokens,
+            "sentences": len(selected_sentences),
+            "words": len(selected_words),
+            "dropped_sentences": len(ranked_sentences) - len(selected_sentences),
+            "dropped_words": len(ranked_words) - len(selected_words),
+            "truncated_sentences": truncated,
+        }
+
+    def output_budget(self, dialogue_entries=None, vocabulary_entries=None):
+        """
+        프롬프트가 요청하는 항목 수로 출력 토큰 상한을 계산하는 메서드 (Config.MAX_TOKENS를 넘지 않음)
+        :param dialogue_entries: 예상 대화 항목 수
+        :param vocabulary_entries: 예상 단어 항목 수
+        """
+        dialogue_entries = dialogue_entries or Config.EXPECTED_DIALOGUE_ENTRIES
+        vocabulary_entries = vocabulary_entries or Config.EXPECTED_VOCABULARY_ENTRIES
+        expected = (dialogue_entries * Config.DIALOGUE_ENTRY_TOKENS + vocabulary_entries * Config.VOCABULARY_ENTRY_TOKENS
+                    + Config.MATERIAL_OVERHEAD_TOKENS)
+        return min(Config.MAX_TOKENS, math.ceil(expected * Config.OUTPUT_TOKEN_MARGIN))
+
+class GenerationStats:
+    """생성 호출별 입력/출력 토큰 수와 지연 시간을 누적하는 클래스"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._estimated_prompt_tokens = 0
+        self._prompt_tokens = 0
+        self._completion_tokens = 0
+        self._latency_seconds = 0.0
+        self._max_latency_seconds = 0.0
+        self._truncated = 0
+        self._last = None
+
+    def record(self, estimated_prompt_tokens, prompt_tokens, completion_tokens, max_tokens, latency, finish_reason):
+        """
+        생성 호출 하나의 통계를 기록하는 메서드
+        :param estimated_prompt_tokens: 프롬프트를 만들 때 추정한 입력 토큰 수
+        :param prompt_tokens: API가 보고한 입력 토큰 수 (없으면 None)
+        :param completion_tokens: API가 보고한 출력 토큰 수 (없으면 None)
+        :param max_tokens: 요청한 출력 토큰 상한
+        :param latency: 호출 시작부터 응답 완료까지 걸린 시간(초)
+        :param finish_reason: 생성 종료 이유 ("length"이면 출력 상한에서 잘림)
+        """
+        call = {
+            "estimated_prompt_tokens": estimated_prompt_tokens,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "max_tokens": max_tokens,
+            "latency_ms": latency * 1000,
+            "finish_reason": finish_reason,
+        }
+        logging.info(f"Generation call: {prompt_tokens} prompt tokens (estimated {estimated_prompt_tokens}), "
+                     f"{completion_tokens}/{max_tokens} completion tokens, {latency:.2f}s, finish reason {finish_reason}")
+        if finish_reason == "length":
+            logging.warning("Generation stopped at the output token limit, the JSON is likely truncated")
+        with self._lock:
+            self._calls += 1
+            self._estimated_prompt_tokens += estimated_prompt_tokens
+            self._prompt_tokens += prompt_tokens or 0
+            self._completion_tokens += completion_tokens or 0
+            self._latency_seconds += latency
+            self._max_latency_seconds = max(self._max_latency_seconds, latency)
+            self._truncated += finish_reason == "length"
+            self._last = call
+
+    def stats(self):
+        """호출 수와 평균 토큰 수, 평균/최대 지연 시간, 출력 상한에서 잘린 호출 수, 마지막 호출 통계를 반환"""
+        with self._lock:
+            calls = self._calls
+            return {
+                "calls": calls,
+                "avg_estimated_prompt_tokens": self._estimated_prompt_tokens / calls if calls else 0.0,
+                "avg_prompt_tokens": self._prompt_tokens / calls if calls else 0.0,
+                "avg_completion_tokens": self._completion_tokens / calls if calls else 0.0,
+                "avg_latency_ms": self._latency_seconds / calls * 1000 if calls else 0.0,
+                "max_latency_ms": self._max_latency_seconds * 1000,
+                "truncated_calls": self._truncated,
+                "last_call": self._last,
+            }
@@ -0,0 +1,116 @@
+import functools
+import math
+import numpy as np
+from scipy.signal import upfirdn
+from config import Config
+
+def to_mono_float32(block):
+    """(프레임, 채널) 또는 (프레임,) 배열을 float32 모노로 변환 (채널 평균과 형변환을 한 번에 수행)"""
+    block = np.asarray(block)
+    if block.ndim == 1:
+        return block.astype(np.float32, copy=False)
+    # 채널 축 평균(np.mean(axis=1))보다 채널별 누적이 훨씬 빠름
+    mono = block[:, 0].astype(np.float32)
+    for channel in range(1, block.shape[1]):
+        mono += block[:, channel]
+    if block.shape[1] > 1:
+        mono *= np.float32(1.0 / block.shape[1])
+    return mono
+
+@functools.lru_cache(maxsize=None)
+def polyphase_kernel(orig_sr, target_sr, zero_crossings):
+    """
+    (orig_sr, target_sr) 쌍에 대한 저역통과 필터 커널을 설계하는 함수 (결과는 캐시됨)
+    :return: (업샘플 비율, 다운샘플 비율, 읽기 전용 float32 커널)
+    """
+    g = math.gcd(orig_sr, target_sr)
+    up, down = target_sr // g, orig_sr // g
+    factor = max(up, down)
+    half = zero_crossings * factor
+    n = np.arange(-half, half + 1)
+    # 나이퀴스트 직전에서 차단하는 Kaiser 윈도우 sinc 필터, 업샘플 이득 보정 포함
+    cutoff = Config.RESAMPLE_ROLLOFF / factor
+    kernel = (up * cutoff * np.sinc(cutoff * n) * np.kaiser(len(n), Config.RESAMPLE_KAISER_BETA)).astype(np.float32)
+    kernel.flags.writeable = False
+    return up, down, kernel
+
+class StreamingResampler:
+    """
+    블록 단위로 입력을 받아 샘플 레이트를 변환하는 폴리페이즈 리샘플러.
+    블록 경계에 필요한 과거 입력만 보관하므로 전체 신호를 한 번에 변환한 것과
+    같은 결과를 내면서 메모리 사용량은 블록 크기에만 비례합니다.
+    """
+
+    def __init__(self, orig_sr, target_sr, zero_crossings=None):
+        """
+        :param orig_sr: 입력 샘플 레이트
+        :param target_sr: 출력 샘플 레이트
+        :param zero_crossings: 필터 한쪽의 영점 교차 수 (클수록 정확하지만 느림)
+        """
+        self.up, self.down, self.kernel = polyphase_kernel(orig_sr, target_sr, zero_crossings or Config.RESAMPLE_ZERO_CROSSINGS)
+        self.delay = (len(self.kernel) - 1) // 2
+        self._shifted_kernels = {}
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._buffer_start = 0  # 버퍼 첫 샘플의 전체 입력 기준 인덱스
+        self._num_input = 0
+        self._num_output = 0
+
+    def process(self, block):
+        """
+        입력 블록을 받아 지금까지 확정된 출력 샘플을 반환하는 메서드
+        :param block: (프레임,) 또는 (프레임, 채널) 배열
+        :return: float32 모노 출력 샘플
+        """
+        samples = to_mono_float32(block)
+        self._num_input += len(samples)
+        self._buffer = np.concatenate((self._buffer, samples))
+        return self._emit(self._buffer_start + len(self._buffer))
+
+    def flush(self):
+        """입력이 끝난 뒤 남은 출력 샘플을 반환하는 메서드 (이후 입력은 0으로 간주)"""
+        total_output = -(-self._num_input * self.up // self.down)
+        taps = -(-len(self.kernel) // self.up)
+        self._buffer = np.concatenate((self._buffer, np.zeros(taps + 1, dtype=np.float32)))
+        return self._emit(self._buffer_start + len(self._buffer), total_output)
+
+    def _emit(self, available, limit=None):
+        # 필요한 입력이 모두 도착한 출력 샘플 범위 [start, end)
+        start = self._num_output
+        end = (available * self.up - 1 - self.delay) // self.down + 1
+        if limit is not None:
+            end = min(end, limit)
+        if end <= start:
+            return np.zeros(0, dtype=np.float32)
+
+        # 버퍼 시작 위치에 맞춰 커널 앞에 0을 붙여 전체 신호 기준 위상을 유지
+        offset = self.delay - self._buffer_start * self.up
+        shift = -(-offset // self.down)
+        kernel = self._shifted_kernel(shift * self.down - offset)
+        output = upfirdn(kernel, self._buffer, self.up, self.down)[start + shift:end + shift]
+        self._num_output = end
+
+        # 다음 출력 계산에 필요 없는 과거 입력은 버림
+        oldest_needed = (end * self.down + self.delay - len(self.kernel)) // self.up + 1
+        drop = max(0, oldest_needed - self._buffer_start)
+        if drop:
+            self._buffer = self._buffer[drop:]
+            self._buffer_start += drop
+        return output.astype(np.float32, copy=False)
+
+    def _shifted_kernel(self, padding):
+        kernel = self._shifted_kernels.get(padding)
+        if kernel is None:
+            kernel = np.concatenate((np.zeros(padding, dtype=np.float32), self.kernel))
+            self._shifted_kernels[padding] = kernel
+        return kernel
+
+def resample(audio, orig_sr, target_sr):
+    """
+    배열 전체의 샘플 레이트를 변환하는 함수 (모노 변환과 float32 변환 포함)
+    :param audio: (프레임,) 또는 (프레임, 채널) 배열
+    :return: target_sr의 float32 모노 배열
+    """
+    if orig_sr == target_sr:
+        return to_mono_float32(audio)
+    resampler = StreamingResampler(orig_sr, target_sr)
+    return np.concatenate((resampler.process(audio), resampler.flush()))
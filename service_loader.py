@@ -0,0 +1,65 @@
+import logging
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+
+class ServiceLoader:
+    """
+    무거운 모듈 import와 모델 로드를 백그라운드 스레드에서 수행하는 로더.
+    서버는 포트를 먼저 열고, 로드가 끝나기 전까지는 준비되지 않은 상태로 응답합니다.
+    각 단계의 소요 시간을 기록하여 시작 시간 회귀를 확인할 수 있습니다.
+    """
+
+    def __init__(self):
+        self.timings = {}
+        self.error = None
+        self._ready = threading.Event()
+        self._thread = None
+        self._started_at = None
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    @contextmanager
+    def phase(self, name):
+        """이름 붙은 시작 단계의 소요 시간을 기록하는 컨텍스트 매니저"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.timings[name] = round(elapsed, 3)
+            logging.info(f"Startup phase '{name}' took {elapsed:.2f}s")
+
+    def start(self, load):
+        """
+        백그라운드 스레드에서 로드 함수를 실행하는 메서드
+        :param load: 이 로더를 인자로 받아 서비스를 초기화하는 함수
+        """
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, args=(load,), name="service-loader", daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    def status(self):
+        """준비 상태와 단계별 소요 시간을 반환"""
+        return {
+            "ready": self.ready,
+            "error": self.error,
+            "timings": dict(self.timings),
+        }
+
+    def _run(self, load):
+        try:
+            load(self)
+            self.timings["total"] = round(time.perf_counter() - self._started_at, 3)
+            self._ready.set()
+            logging.info(f"Services ready in {self.timings['total']:.2f}s")
+        except Exception as e:
+            self.error = str(e)
+            logging.error(f"Error occurred while loading services: {str(e)}")
+            logging.error(f"Full error: {traceback.format_exc()}")
@@ -0,0 +1,170 @@
+import asyncio
+import io
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import soundfile as sf
+from config import Config
+from model_selector import ModelSizeSelector
+
+# 워커 프로세스마다 한 번만 생성되는 AudioProcessor
+_audio_processor = None
+
+def _init_worker(model_size, num_threads, model_sizes=None):
+    """워커 프로세스 시작 시 Whisper 모델을 한 번만 로드"""
+    global _audio_processor
+    import torch
+    from audio_processor import AudioProcessor
+    # 프로세스 하나가 코어 하나를 쓰도록 torch 내부 스레드 수 제한
+    torch.set_num_threads(num_threads)
+    _audio_processor = AudioProcessor(model_size, model_sizes=model_sizes)
+    _audio_processor.warm_up()
+
+def _ping():
+    return _audio_processor is not None
+
+def _transcribe(audio_file, model_size=None):
+    # 대기 시간을 제외한 추론 시간을 함께 돌려주어 모델별 RTF 측정에 사용
+    started = time.perf_counter()
+    text = _audio_processor.transcribe_audio(audio_file, model_size)
+    return text, time.perf_counter() - started
+
+def _read_upload(file):
+    file.seek(0)
+    return file.read()
+
+def _audio_duration(audio_file):
+    # 헤더만 읽어 길이를 구함 (부모 프로세스에서 모델 크기를 고르기 위해 사용)
+    if isinstance(audio_file, (bytes, bytearray, memoryview)):
+        audio_file = io.BytesIO(audio_file)
+    return sf.info(audio_file).duration
+
+class STTWorkerPool:
+    """
+    Whisper 모델을 미리 로드한 워커 프로세스 풀.
+    음성 변환을 별도 프로세스에서 실행하여 FastAPI 이벤트 루프가 멈추지 않도록 하고,
+    작업별 타임아웃과 워커 크래시 복구를 제공합니다.
+    """
+
+    def __init__(self, num_workers=None, model_size=None, job_timeout=None, max_retries=1, adaptive=None):
+        """
+        :param num_workers: 워커 프로세스 수
+        :param model_size: 각 워커가 로드할 Whisper 모델 크기
+        :param job_timeout: 작업 하나에 허용하는 최대 시간(초)
+        :param max_retries: 워커 크래시 시 재시도 횟수
+        :param adaptive: 작업마다 모델 크기를 선택할지 여부 (지정하지 않으면 Config 값 사용)
+        """
+        self.num_workers = num_workers or Config.STT_WORKERS
+        self.model_size = model_size or Config.WHISPER_MODEL_SIZE
+        self.job_timeout = job_timeout or Config.STT_JOB_TIMEOUT_SECONDS
+        self.max_retries = max_retries
+        adaptive = Config.WHISPER_ADAPTIVE if adaptive is None else adaptive
+        self.selector = ModelSizeSelector(parallelism=self.num_workers) if adaptive else None
+        self._active_jobs = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """워커 프로세스를 띄우고 모든 워커의 모델 로드가 끝날 때까지 대기"""
+        started = time.perf_counter()
+        self._executor = self._create_executor()
+        # 워커 수만큼 동시에 제출해야 워커가 모두 생성됨
+        pings = [self._executor.submit(_ping) for _ in range(self.num_workers)]
+        for ping in pings:
+            ping.result()
+        logging.info(f"STT worker pool ready: {self.num_workers} workers ({time.perf_counter() - started:.1f}s)")
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    async def transcribe(self, audio_file, timeout=None):
+        """
+        워커 프로세스에서 오디오 파일을 텍스트로 변환하는 메서드
+        :param audio_file: 오디오 파일 경로, 바이트 버퍼 또는 파일 객체
+        :param timeout: 작업 타임아웃(초), 지정하지 않으면 Config 값 사용
+        :return: 변환된 텍스트 (실패 또는 타임아웃 시 None)
+        """
+        timeout = timeout or self.job_timeout
+        loop = asyncio.get_running_loop()
+        if hasattr(audio_file, "read"):
+            # 파일 객체는 워커 프로세스로 넘길 수 없으므로 바이트로 한 번만 읽어 전달
+            audio_file = await loop.run_in_executor(None, _read_upload, audio_file)
+
+        model_size = None
+        if self.selector is not None:
+            try:
+                audio_seconds = await loop.run_in_executor(None, _audio_duration, audio_file)
+                model_size = self.selector.choose(audio_seconds, self._active_jobs)
+            except RuntimeError as e:
+                # 헤더를 읽지 못하면 기본 모델로 처리하고 디코딩 오류는 워커에서 기록
+                logging.warning(f"Could not read audio duration, using default model: {str(e)}")
+
+        self._active_jobs += 1
+        try:
+            for attempt in range(self.max_retries + 1):
+                executor = self._executor
+                try:
+                    job = loop.run_in_executor(executor, _transcribe, audio_file, model_size)
+                    text, elapsed = await asyncio.wait_for(job, timeout)
+                except asyncio.TimeoutError:
+                    # 실행 중인 작업은 개별 취소가 불가능하므로 풀을 재시작하여 워커를 회수
+                    # (워커 하나만 종료해도 ProcessPoolExecutor 전체가 깨지므로 풀 단위로 교체하고,
+                    #  함께 취소되거나 중단된 다른 요청의 작업은 새 풀에서 재시도됨)
+                    logging.error(f"Transcription timed out after {timeout}s, restarting STT worker pool")
+                    self._restart(executor)
+                    return None
+                except asyncio.CancelledError:
+                    # 다른 요청의 타임아웃으로 풀이 교체되면서 대기 중이던 작업이 취소된 경우에만 새 풀에서 재시도
+                    # (클라이언트 연결 종료 등으로 이 요청 자체가 취소된 경우는 그대로 전파)
+                    if self._executor is executor or asyncio.current_task().cancelling():
+                        raise
+                    logging.warning(f"STT worker pool was restarted while the job was queued "
+                                    f"(attempt {attempt + 1}/{self.max_retries + 1}), retrying")
+                    continue
+                except BrokenProcessPool:
+                    if self._executor is not executor:
+                        # 다른 요청의 타임아웃으로 워커가 종료된 경우: 이미 새 풀이 있으므로 재시도만 함
+                        logging.warning(f"STT worker pool was restarted while the job was running "
+                                        f"(attempt {attempt + 1}/{self.max_retries + 1}), retrying")
+                        continue
+                    logging.error(f"STT worker crashed (attempt {attempt + 1}/{self.max_retries + 1}), restarting pool")
+                    self._restart(executor)
+                    continue
+                if model_size is not None and text is not None:
+                    self.selector.record(model_size, audio_seconds, elapsed)
+                return text
+            logging.error("Transcription failed: STT workers kept crashing")
+            return None
+        finally:
+            self._active_jobs -= 1
+
+    def _create_executor(self):
+        # CUDA와 스레드가 있는 부모 프로세스를 fork하지 않도록 spawn 사용
+        return ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.model_size, Config.STT_WORKER_THREADS, self.selector.sizes if self.selector else None),
+        )
+
+    def _restart(self, broken_executor):
+        with self._lock:
+            # 다른 요청이 이미 재시작한 경우 중복 재시작 방지
+            if self._executor is not broken_executor:
+                return
+            self._executor = self._create_executor()
+            # 새 워커들이 다음 요청 전에 모델을 미리 로드하도록 깨움
+            for _ in range(self.num_workers):
+                self._executor.submit(_ping)
+
+        processes = list((getattr(broken_executor, "_processes", None) or {}).values())
+        broken_executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.kill()
@@ -0,0 +1,45 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+import stt_worker_pool
+from stt_worker_pool import STTWorkerPool
+
+class FakeAudioProcessor:
+    """입력 바이트를 초 단위 대기 시간으로 해석하는 가짜 AudioProcessor"""
+
+    def transcribe_audio(self, audio_file, model_size=None):
+        time.sleep(float(audio_file.decode()))
+        return f"slept {audio_file.decode()}"
+
+def _init_fake_worker():
+    stt_worker_pool._audio_processor = FakeAudioProcessor()
+
+class FakeSTTWorkerPool(STTWorkerPool):
+    def _create_executor(self):
+        return ProcessPoolExecutor(max_workers=self.num_workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_fake_worker)
+
+async def _transcribe_concurrently(pool, others):
+    slow = asyncio.create_task(pool.transcribe(b"30", timeout=1))
+    await asyncio.sleep(0.1)  # 느린 작업이 먼저 워커를 차지하도록
+    tasks = [asyncio.create_task(pool.transcribe(seconds, timeout=60)) for seconds in others]
+    return await slow, await asyncio.gather(*tasks)
+
+def _run(num_workers, others):
+    pool = FakeSTTWorkerPool(num_workers=num_workers, adaptive=False)
+    pool.start()
+    try:
+        return asyncio.run(_transcribe_concurrently(pool, others))
+    finally:
+        pool.shutdown()
+
+def test_queued_jobs_survive_pool_restart_after_other_timeout():
+    # 워커 1개: 느린 작업의 타임아웃으로 풀이 교체될 때 아직 워커에 전달되지 않은 작업은 취소되므로
+    # 새 풀에서 재시도되어 결과를 받아야 함
+    others = [b"0.3"] * 4
+    assert _run(num_workers=1, others=others) == (None, ["slept 0.3"] * 4)
+
+def test_running_job_survives_pool_restart_after_other_timeout():
+    # 워커 2개: 느린 작업의 타임아웃 시점에 실행 중이던 작업은 워커와 함께 중단되고 새 풀에서 재시도되어야 함
+    assert _run(num_workers=2, others=[b"2"]) == (None, ["slept 2"])
@@ -0,0 +1,24 @@
+import os
+from heavy_hitters import UserVocabularyStore
+from tfidf_ranking import TranscriptStore
+
+def test_delete_user_removes_vocabulary_summary(tmp_path):
+    store = UserVocabularyStore(storage_dir=str(tmp_path))
+    store.record("alice", ["회사", "회의"], ["오늘 회사에서 회의를 했어요."])
+    store.record("bob", ["주말"], ["주말에 여행을 갔어요."])
+
+    assert store.delete_user("alice") is True
+    assert not os.path.exists(store._path("alice"))
+    # 메모리에 남은 요약도 지워져 다시 읽으면 비어 있어야 함
+    assert store.top("alice", "sentences", 10) == []
+    assert store.top("bob", "sentences", 10)[0][0] == "주말에 여행을 갔어요."
+    # 새 인스턴스(다른 프로세스)에서도 남아 있지 않아야 함
+    assert UserVocabularyStore(storage_dir=str(tmp_path)).top("alice", "words", 10) == []
+    assert store.delete_user("alice") is False
+
+def test_delete_user_removes_transcripts(tmp_path):
+    store = TranscriptStore(storage_dir=str(tmp_path))
+    store.append("alice", "오늘 회사에서 회의를 했어요.")
+
+    assert store.delete_user("alice") is True
+    assert store.delete_user("alice") is False
@@ -1,9 +1,84 @@
+import logging
 import re
 import unicodedata
 import hanja
 from kiwipiepy import Kiwi
 from collections import Counter
 from config import Config
+from aho_corasick import AhoCorasick
+from lru import LRUCache
+from near_duplicates import MinHashLSH
+from lexicon import load_lexicon, read_word_list
+
+# 문장 종결 표현(. ! ? 와 ~요, ~야 어미) 뒤의 공백을 기준으로 1차 분리
+SENTENCE_ENDERS = re.compile(r'(?<=[.!?])\s+(?=[가-힣A-Za-z])|(?<=[.!?])$|(?<=요)\s+(?=[가-힣A-Za-z])|(?<=야)\s+(?=[가-힣A-Za-z])')
+# 접속사를 기준으로 2차 분리
+CONJUNCTION_SPLIT = re.compile(r'(?<=\s)(?:그래서|그런데|그리고|하지만|근데)\s+')
+# 이 길이 이하의 문장은 버림
+MIN_SENTENCE_LENGTH = 5
+# 한자(CJK 통합 한자, 확장 A~F, 호환 한자) - hanja 변환표의 모든 글자를 포함
+CJK_IDEOGRAPHS = re.compile('[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\U00020000-\U0002ebef]')
+
+def split_sentences(text):
+    """
+    텍스트를 문장 단위로 분리하는 함수
+    :param text: 분리할 텍스트
+    :return: 분리된 문장 리스트
+    """
+    refined_sentences = []
+    for sentence in SENTENCE_ENDERS.split(text):
+        refined_sentences.extend(CONJUNCTION_SPLIT.split(sentence))
+
+    # 빈 문장 제거 및 최소 길이 초과 문장만 선택
+    return [s.strip() for s in refined_sentences if s.strip() and len(s.strip()) > MIN_SENTENCE_LENGTH]
+
+class IncrementalSentenceSegmenter:
+    """
+    전사문 조각을 받는 대로 문장으로 분리하는 상태 유지형 분리기.
+    문장 경계가 확정된(경계 뒤의 공백이 끝나고 다음 글자가 도착한) 문장만 내보내고
+    끝나지 않은 마지막 부분은 다음 조각을 위해 보관합니다.
+    모든 조각을 넣은 뒤 flush까지 호출한 결과는 조각을 이어 붙인 전체 텍스트에
+    split_sentences를 적용한 결과와 같습니다.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._scan_from = 0
+
+    @property
+    def pending(self):
+        """아직 경계가 확정되지 않은 텍스트"""
+        return self._buffer
+
+    def feed(self, fragment):
+        """
+        전사문 조각을 추가하고 확정된 문장을 반환하는 메서드
+        조각은 그대로 이어 붙이므로, 앞뒤 공백이 제거된 조각은 호출 측에서 구분 공백을 붙여 전달합니다.
+        :param fragment: 새로 도착한 텍스트 조각
+        :return: 경계가 확정된 문장 리스트
+        """
+        self._buffer += fragment
+        # 다음 글자까지 도착한(폭이 있는) 경계만 확정된 경계로 사용
+        cut = None
+        for match in SENTENCE_ENDERS.finditer(self._buffer, self._scan_from):
+            if match.end() > match.start():
+                cut = match
+        if cut is None:
+            # 이전 조각에서 확정된 경계는 없으므로, 마지막 글자 직후부터 다시 검사하면 충분
+            self._scan_from = len(self._buffer.rstrip())
+            return []
+
+        head, self._buffer = self._buffer[:cut.start()], self._buffer[cut.end():]
+        # 마지막 경계 뒤에는 확정된 경계가 없으므로 남은 텍스트도 마지막 글자 직후부터 검사
+        self._scan_from = len(self._buffer.rstrip())
+        return split_sentences(head)
+
+    def flush(self):
+        """남아 있는 텍스트를 마지막 문장으로 분리하여 반환하고 상태를 초기화"""
+        sentences = split_sentences(self._buffer)
+        self._buffer = ""
+        self._scan_from = 0
+        return sentences
 
 class TextProcessor:
     """
@@ -11,25 +86,36 @@ class TextProcessor:
     이 클래스는 한국어 텍스트를 정제하고, 문장을 분리하며, 유효한 단어를 추출합니다.
     """
 
-    def __init__(self):
+    def __init__(self, analysis_cache=None, num_workers=None):
         """
         TextProcessor 초기화
         Kiwi 형태소 분석기를 초기화하고, 필요한 단어 목록들을 로드합니다.
+        :param analysis_cache: 문장 -> (정규화된 문장, 유효 단어) LRU 캐시 (여러 인스턴스가 공유할 때 전달)
+        :param num_workers: Kiwi 배치 분석 스레드 수 (지정하지 않으면 Config 값 사용)
         """
-        self.kiwi = Kiwi()  # 한국어 형태소 분석을 위한 Kiwi 초기화
-        # 비속어, 불용어, 일반적인 이름 목록을 파일에서 로드
-        self.profanities = self.load_file(Config.PROFANITIES_FILE)
-        self.korean_stopwords = self.load_file(Config.KOREAN_STOPWORDS_FILE)
-        self.common_names = self.load_file(Config.COMMON_NAMES_FILE)
+        num_workers = Config.KIWI_NUM_WORKERS if num_workers is None else num_workers
+        self.kiwi = Kiwi(num_workers=num_workers)  # 한국어 형태소 분석을 위한 Kiwi 초기화 (배치 분석용 멀티스레드)
+        # 비속어, 불용어, 일반적인 이름 목록을 컴파일된 사전에서 로드 (워커 프로세스들이 mmap 페이지를 공유)
+        self.lexicon = load_lexicon()
+        self.profanities = self.lexicon["profanities"]
+        self.korean_stopwords = self.lexicon["korean_stopwords"]
+        self.common_names = self.lexicon["common_names"]
+        # 비속어 목록을 한 번만 오토마톤으로 컴파일하여 문장마다 한 번의 선형 탐색으로 검사
+        self.profanity_matcher = AhoCorasick(self.profanities)
+        # 일상 대화에서 반복되는 문장의 정규화/형태소 분석 결과를 요청 간에 재사용
+        if analysis_cache is None:
+            analysis_cache = LRUCache(Config.TEXT_ANALYSIS_CACHE_ITEMS)
+        self.analysis_cache = analysis_cache
+        # 조사 하나 차이 같은 비슷한 문장을 묶어 빈도를 합산하기 위한 MinHash/LSH 클러스터러
+        self.sentence_clusterer = MinHashLSH() if Config.SENTENCE_CLUSTERING_ENABLED else None
 
     def load_file(self, file_path):
         """
-        파일을 읽어 각 줄을 집합(set)으로 반환하는 메서드
+        파일을 읽어 각 줄을 집합(set)으로 반환하는 메서드 (빈 줄과 주석 줄 제외)
         :param file_path: 읽을 파일의 경로
         :return: 파일 내용을 줄 단위로 저장한 집합
         """
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return set(f.read().splitlines())
+        return set(read_word_list(file_path))
 
     def normalize_korean(self, text):
         """
@@ -38,7 +124,8 @@ class TextProcessor:
         :return: 정규화된 텍스트
         """
         text = unicodedata.normalize('NFC', text)  # 유니코드 정규화
-        text = hanja.translate(text, 'substitution')  # 한자를 한글로 변환
+        if CJK_IDEOGRAPHS.search(text):
+            text = hanja.translate(text, 'substitution')  # 한자를 한글로 변환 (한자가 있을 때만)
         text = text.lower()  # 소문자화
         return ' '.join(text.split())  # 연속된 공백 제거
 
@@ -52,24 +139,33 @@ class TextProcessor:
         valid_pos = ['NNG', 'NNP', 'VV', 'VA']  # 유효한 품사 목록 (명사, 동사, 형용사)
         return pos.startswith(tuple(valid_pos)) and len(word) >= 2 and not word.isdigit()
 
+    def contains_profanity(self, text):
+        """
+        텍스트에 비속어가 포함되어 있는지 확인하는 메서드
+        :param text: 확인할 텍스트
+        :return: 포함 여부 (불리언)
+        """
+        return self.profanity_matcher.contains(text)
+
+    def find_profanities(self, text):
+        """
+        텍스트에 포함된 비속어의 위치를 찾는 메서드
+        :param text: 검사할 텍스트
+        :return: (시작 위치, 끝 위치, 비속어) 튜플의 리스트
+        """
+        return self.profanity_matcher.findall(text)
+
     def split_sentences(self, text):
         """
         텍스트를 문장 단위로 분리하는 메서드
         :param text: 분리할 텍스트
         :return: 분리된 문장 리스트
         """
-        # 문장 종결 표현을 기준으로 1차 분리
-        sentence_enders = r'(?<=[.!?])\s+(?=[가-힣A-Za-z])|(?<=[.!?])$|(?<=요)\s+(?=[가-힣A-Za-z])|(?<=야)\s+(?=[가-힣A-Za-z])'
-        sentences = re.split(sentence_enders, text)
-        
-        refined_sentences = []
-        for sentence in sentences:
-            # 접속사를 기준으로 2차 분리
-            sub_sentences = re.split(r'(?<=\s)(?:그래서|그런데|그리고|하지만|근데)\s+', sentence)
-            refined_sentences.extend(sub_sentences)
-        
-        # 빈 문장 제거 및 최소 길이(5자) 이상인 문장만 선택
-        return [s.strip() for s in refined_sentences if s.strip() and len(s.strip()) > 5]
+        return split_sentences(text)
+
+    def create_segmenter(self):
+        """전사문 조각을 받는 대로 같은 규칙으로 문장을 분리하는 분리기를 생성"""
+        return IncrementalSentenceSegmenter()
 
     def filter_text(self, text):
         """
@@ -77,28 +173,57 @@ class TextProcessor:
         :param text: 필터링할 텍스트
         :return: 필터링된 문장 리스트와 단어 리스트의 튜플
         """
-        sentences = self.split_sentences(text)
-        filtered_sentences = []
-        filtered_words = []
-        
+        return self.filter_sentences(self.split_sentences(text))
+
+    def filter_sentences(self, sentences):
+        """
+        분리된 문장을 필터링하여 유효한 문장과 단어를 추출하는 메서드
+        (IncrementalSentenceSegmenter가 내보낸 문장을 전사 도중에 바로 처리할 때 사용)
+        :param sentences: 문장 리스트
+        :return: 필터링된 문장 리스트와 단어 리스트의 튜플
+        """
+        # 비속어가 없는 문장마다 캐시를 조회하고, 처음 보는 문장만 정규화하여 분석 대기열에 추가
+        analyses = []
+        pending = {}  # 문장 -> 정규화된 문장 (같은 요청 안의 중복 문장은 한 번만 분석)
         for sentence in sentences:
-            # 비속어 필터링
-            if not any(profanity in sentence for profanity in self.profanities):
-                normalized_sentence = self.normalize_korean(sentence)
-                morphs = self.kiwi.analyze(normalized_sentence)
+            if self.contains_profanity(sentence):
+                continue
+            analysis = None
+            if sentence not in pending:
+                analysis = self.analysis_cache.get(sentence)
+                if analysis is None:
+                    pending[sentence] = self.normalize_korean(sentence)
+            analyses.append((sentence, analysis))
+
+        if pending:
+            # 모든 문장을 한 번에 넘겨 Kiwi의 멀티스레드 배치 분석 사용 (결과는 입력 순서대로 반환됨)
+            normalized_sentences = list(pending.values())
+            for sentence, normalized_sentence, morphs in zip(pending, normalized_sentences, self.kiwi.analyze(normalized_sentences)):
                 # 유효한 단어 추출
-                valid_words = [token.lemma for token in morphs[0][0] 
-                               if self.is_valid_word(token.form, token.tag) 
-                               and token.lemma not in self.korean_stopwords 
-                               and token.lemma not in self.common_names
-                               and len(token.lemma) > 1]
-                # 유효한 단어가 3개 이상인 문장만 선택
-                if len(valid_words) >= 3:
-                    filtered_sentences.append(normalized_sentence)
-                    filtered_words.extend(valid_words)
+                valid_words = tuple(token.lemma for token in morphs[0][0]
+                                    if self.is_valid_word(token.form, token.tag)
+                                    and token.lemma not in self.korean_stopwords
+                                    and token.lemma not in self.common_names
+                                    and len(token.lemma) > 1)
+                pending[sentence] = (normalized_sentence, valid_words)
+                self.analysis_cache.put(sentence, pending[sentence])
+        logging.debug(f"Sentence analysis cache: {len(analyses) - len(pending)}/{len(analyses)} sentences reused")
+
+        filtered_sentences = []
+        filtered_words = []
+        for sentence, analysis in analyses:
+            normalized_sentence, valid_words = analysis or pending[sentence]
+            # 유효한 단어가 3개 이상인 문장만 선택
+            if len(valid_words) >= 3:
+                filtered_sentences.append(normalized_sentence)
+                filtered_words.extend(valid_words)
 
         return filtered_sentences, filtered_words
 
+    def cache_stats(self):
+        """문장 분석 캐시의 적중률 등 통계를 반환"""
+        return self.analysis_cache.stats()
+
     def get_top_items(self, items, num_items):
         """
         주어진 아이템 리스트에서 가장 빈도가 높은 아이템을 반환하는 메서드
@@ -107,4 +232,16 @@ class TextProcessor:
         :return: (아이템, 빈도) 튜플의 리스트
         """
         counter = Counter(items)
-        return counter.most_common(num_items)
\ No newline at end of file
+        return counter.most_common(num_items)
+
+    def get_top_sentences(self, sentences, num_items):
+        """
+        비슷한 문장을 하나로 묶어 빈도가 높은 문장을 반환하는 메서드
+        :param sentences: 문장 리스트
+        :param num_items: 반환할 상위 문장 수
+        :return: (대표 문장, 묶음 빈도) 튜플의 리스트
+        """
+        if self.sentence_clusterer is None:
+            return self.get_top_items(sentences, num_items)
+        clusters = self.sentence_clusterer.cluster(sentences)
+        return [(representative, count) for representative, count, _ in clusters[:num_items]]
\ No newline at end of file
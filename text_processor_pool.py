@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+from lru import LRUCache
+
+class TextProcessorPoolFull(RuntimeError):
+    """대기 중인 요청 수가 상한에 도달하여 새 요청을 받을 수 없을 때 발생"""
+
+class TextProcessorPool:
+    """
+    TextProcessor(Kiwi) 인스턴스 풀.
+    Kiwi의 형태소 분석은 C++ 코드에서 GIL을 놓고 실행되므로 프로세스 대신 스레드로 실행하며,
+    인스턴스마다 전용 스레드를 두어 동시 요청이 여러 코어에서 분석되고 이벤트 루프는 멈추지 않습니다.
+    문장 분석 캐시와 사전(mmap)은 모든 인스턴스가 공유합니다.
+    """
+
+    def __init__(self, size=None, max_waiting=None, kiwi_workers=None):
+        """
+        :param size: TextProcessor 인스턴스 수 (인스턴스마다 Kiwi 모델을 따로 로드)
+        :param max_waiting: 인스턴스를 기다릴 수 있는 최대 요청 수 (초과 시 TextProcessorPoolFull)
+        :param kiwi_workers: 인스턴스별 Kiwi 배치 분석 스레드 수
+        """
+        self.size = size or Config.TEXT_PROCESSOR_POOL_SIZE
+        self.max_waiting = Config.TEXT_PROCESSOR_MAX_WAITING if max_waiting is None else max_waiting
+        # Kiwi를 import하지 않고도 TextProcessorPoolFull을 가져다 쓸 수 있도록 인스턴스를 만들 때 import
+        from text_processor import TextProcessor
+        kiwi_workers = kiwi_workers or Config.TEXT_PROCESSOR_KIWI_WORKERS
+        self.analysis_cache = LRUCache(Config.TEXT_ANALYSIS_CACHE_ITEMS)
+        started = time.perf_counter()
+        self.processors = [TextProcessor(analysis_cache=self.analysis_cache, num_workers=kiwi_workers)
+                           for _ in range(self.size)]
+        logging.info(f"Text processor pool ready: {self.size} instances ({time.perf_counter() - started:.1f}s)")
+        self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="kiwi")
+        self._idle = asyncio.Queue()
+        for processor in self.processors:
+            self._idle.put_nowait(processor)
+        self._waiting = 0
+        self._calls = 0
+        self._wait_seconds = 0.0
+        self._run_seconds = 0.0
+        self._rejected = 0
+
+    async def run(self, func, *args):
+        """
+        풀에서 TextProcessor를 하나 빌려 func(processor, *args)를 전용 스레드에서 실행하는 메서드
+        :param func: 첫 번째 인자로 TextProcessor를 받는 함수
+        :return: func의 반환값
+        """
+        if self._waiting >= self.max_waiting:
+            self._rejected += 1
+            raise TextProcessorPoolFull(f"Text processing queue is full ({self._waiting} waiting)")
+        queued = time.perf_counter()
+        self._waiting += 1
+        try:
+            processor = await self._idle.get()
+        finally:
+            self._waiting -= 1
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        future = self._executor.submit(func, processor, *args)
+        # 인스턴스는 스레드의 작업이 실제로 끝난 뒤에 반환 (요청이 취소되어도 실행 중인 분석은 계속되므로
+        # 대기하던 코루틴 쪽에서 반환하면 두 요청이 한 인스턴스를 동시에 사용하게 됨)
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._idle.put_nowait, processor))
+        try:
+            return await asyncio.wrap_future(future)
+        finally:
+            finished = time.perf_counter()
+            self._calls += 1
+            self._wait_seconds += started - queued
+            self._run_seconds += finished - started
+            logging.info(f"{getattr(func, '__name__', 'text task')} finished: "
+                         f"waited {(started - queued) * 1000:.1f} ms, ran {(finished - started) * 1000:.1f} ms")
+
+    async def filter_text(self, text):
+        """텍스트에서 유효한 문장과 단어를 추출 (TextProcessor.filter_text)"""
+        return await self.run(_filter_text, text)
+
+    async def get_top(self, sentences, words, num_sentences, num_words):
+        """
+        상위 문장과 단어를 한 번의 작업으로 선택하는 메서드
+        :return: (상위 문장 리스트, 상위 단어 리스트)
+        """
+        return await self.run(_get_top, sentences, words, num_sentences, num_words)
+
+    def cache_stats(self):
+        """공유 문장 분석 캐시 통계 (TextProcessor.cache_stats와 같은 형식)"""
+        return self.analysis_cache.stats()
+
+    def stats(self):
+        """풀 사용 통계를 딕셔너리로 반환"""
+        return {
+            "size": self.size,
+            "idle": self._idle.qsize(),
+            "waiting": self._waiting,
+            "max_waiting": self.max_waiting,
+            "calls": self._calls,
+            "rejected": self._rejected,
+            "avg_wait_ms": self._wait_seconds / self._calls * 1000 if self._calls else 0.0,
+            "avg_run_ms": self._run_seconds / self._calls * 1000 if self._calls else 0.0,
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+def _filter_text(processor, text):
+    return processor.filter_text(text)
+
+def _get_top(processor, sentences, words, num_sentences, num_words):
+    return processor.get_top_sentences(sentences, num_sentences), processor.get_top_items(words, num_words)
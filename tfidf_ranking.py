@@ -0,0 +1,311 @@
+"""
+모든 사용자의 저장된 전사문으로 TF-IDF 단어 순위를 만드는 오프라인 배치 작업.
+전사문을 묶음 단위로 읽어 형태소 분석(TextProcessor)한 뒤 희소 문서-단어 행렬을 만들고,
+문서 빈도와 사용자별 단어 빈도만 누적하므로 전사문 수가 늘어도 메모리는 어휘 크기와
+(사용자, 단어) 쌍 수에만 비례합니다. 결과는 API가 요청 시 읽는 파일로 저장됩니다.
+
+전사문 저장은 Config.STORE_USER_TRANSCRIPTS로 켠 경우에만 하며, 이 작업이 실행될 때마다
+USER_TRANSCRIPTS_RETENTION_DAYS보다 오래된 전사문을 지웁니다. 사용자별 삭제는
+TranscriptStore.delete_user와 TfidfRankings.delete_user (API: DELETE /users/{user_id}/transcripts)로 합니다.
+
+실행 (프로젝트 루트에서, 주기적으로 실행):
+    python -m tfidf_ranking
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import Counter
+import numpy as np
+from scipy import sparse
+from config import Config
+from file_lock import FileLock
+
+def _user_file(directory, user_id, suffix):
+    # 사용자 ID를 그대로 파일 이름으로 쓰지 않도록 해시 사용
+    return os.path.join(directory, hashlib.sha256(user_id.encode()).hexdigest() + suffix)
+
+def _write_json(path, data):
+    # 읽는 중인 파일이 깨지지 않도록 임시 파일에 쓴 뒤 교체
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+class TranscriptStore:
+    """사용자별 전사문을 JSON Lines 파일에 추가하고, 배치 작업에서 순서대로 읽는 저장소"""
+
+    def __init__(self, storage_dir=None, retention_days=None):
+        """
+        :param storage_dir: 사용자별 전사문 파일을 저장할 디렉터리
+        :param retention_days: 전사문 보관 기간(일), prune에서 이보다 오래된 전사문을 삭제
+        """
+        self.storage_dir = storage_dir or Config.USER_TRANSCRIPTS_DIR
+        self.retention_days = retention_days or Config.USER_TRANSCRIPTS_RETENTION_DAYS
+        os.makedirs(self.storage_dir, exist_ok=True)
+        # API 서버(추가)와 배치 작업(보관 기간 정리)이 서로 다른 프로세스에서 같은 파일을 다루므로 파일 잠금 사용
+        self._lock = FileLock(os.path.join(self.storage_dir, '.lock'))
+
+    def append(self, user_id, text, now=None):
+        """
+        사용자의 전사문 하나를 저장하는 메서드
+        :param user_id: 사용자 식별자
+        :param text: 전사된 텍스트
+        :param now: 저장 시각 (기본값은 현재 시각)
+        """
+        record = {"user_id": user_id, "time": time.time() if now is None else now, "text": text}
+        with self._lock:
+            with open(_user_file(self.storage_dir, user_id, '.jsonl'), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def delete_user(self, user_id):
+        """
+        사용자의 저장된 전사문을 모두 삭제하는 메서드
+        :return: 삭제한 파일이 있었는지 여부
+        """
+        with self._lock:
+            try:
+                os.remove(_user_file(self.storage_dir, user_id, '.jsonl'))
+                return True
+            except FileNotFoundError:
+                return False
+
+    def prune(self, now=None):
+        """
+        보관 기간이 지난 전사문을 삭제하는 메서드 (남은 전사문이 없는 사용자 파일은 파일째 삭제)
+        :param now: 기준 시각 (기본값은 현재 시각)
+        :return: 삭제한 전사문 수
+        """
+        cutoff = (time.time() if now is None else now) - self.retention_days * 86400
+        removed = 0
+        for name in os.listdir(self.storage_dir):
+            if not name.endswith('.jsonl'):
+                continue
+            path = os.path.join(self.storage_dir, name)
+            # API 프로세스가 추가한 줄을 잃지 않도록 저장소 잠금을 잡고 다시 씀
+            with self._lock:
+                with open(path, 'r', encoding='utf-8') as f:
+                    lines = f.readlines()
+                kept = []
+                for line in lines:
+                    try:
+                        if json.loads(line)["time"] >= cutoff:
+                            kept.append(line)
+                    except (json.JSONDecodeError, KeyError):
+                        continue
+                removed += len(lines) - len(kept)
+                if not kept:
+                    os.remove(path)
+                elif len(kept) < len(lines):
+                    fd, temp_path = tempfile.mkstemp(dir=self.storage_dir, suffix='.tmp')
+                    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                        f.writelines(kept)
+                    os.replace(temp_path, path)
+        if removed:
+            logging.info(f"Removed {removed} transcripts older than {self.retention_days} days")
+        return removed
+
+    def iter_transcripts(self):
+        """
+        저장된 모든 전사문을 파일 단위로 한 줄씩 읽어 (사용자 식별자, 텍스트)를 내보내는 제너레이터
+        (전체를 메모리에 올리지 않음)
+        """
+        for name in sorted(os.listdir(self.storage_dir)):
+            if not name.endswith('.jsonl'):
+                continue
+            with open(os.path.join(self.storage_dir, name), 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 쓰는 도중 중단되어 잘린 마지막 줄은 건너뜀
+                        continue
+                    yield record["user_id"], record["text"]
+
+class TfidfRankingJob:
+    """
+    전사문 전체에 대해 문서 빈도(IDF)와 사용자별 TF-IDF 상위 단어를 계산하는 배치 작업.
+    문서(전사문) 하나가 TF-IDF의 문서 하나이며, 사용자 점수는 사용자의 전사문을 합친 단어 빈도로 계산합니다.
+    """
+
+    def __init__(self, text_processor, chunk_size=None, top_k=None, min_count=None):
+        """
+        :param text_processor: 단어(원형) 추출에 사용할 TextProcessor
+        :param chunk_size: 한 번에 분석하여 행렬로 만드는 전사문 수
+        :param top_k: 사용자별로 저장할 상위 단어 수
+        :param min_count: 사용자 순위에 넣을 최소 단어 빈도 (한 번만 나온 오탈자 제외)
+        """
+        self.text_processor = text_processor
+        self.chunk_size = chunk_size or Config.TFIDF_CHUNK_TRANSCRIPTS
+        self.top_k = top_k or Config.TFIDF_TOP_WORDS
+        self.min_count = min_count or Config.TFIDF_MIN_USER_COUNT
+        self.vocabulary = {}  # 단어 -> 열 번호
+        self.users = {}  # 사용자 식별자 -> 행 번호
+        self.num_documents = 0
+        self._document_frequency = np.zeros(0, dtype=np.int64)
+        self._user_counts = sparse.csr_matrix((0, 0), dtype=np.float64)
+
+    def add_transcripts(self, transcripts):
+        """
+        (사용자 식별자, 텍스트)를 묶음 단위로 분석하여 문서 빈도와 사용자별 단어 빈도에 누적하는 메서드
+        :param transcripts: (사용자 식별자, 텍스트) 이터러블
+        """
+        chunk = []
+        for transcript in transcripts:
+            chunk.append(transcript)
+            if len(chunk) >= self.chunk_size:
+                self._add_chunk(chunk)
+                chunk = []
+        if chunk:
+            self._add_chunk(chunk)
+
+    def _add_chunk(self, chunk):
+        started = time.perf_counter()
+        rows = []
+        indptr = [0]
+        indices = []
+        for user_id, text in chunk:
+            _, words = self.text_processor.filter_text(text)
+            indices.extend(self.vocabulary.setdefault(word, len(self.vocabulary)) for word in words)
+            indptr.append(len(indices))
+            rows.append(self.users.setdefault(user_id, len(self.users)))
+
+        # 전사문 x 단어 빈도 행렬 (같은 단어의 중복 항목은 합산)
+        shape = (len(chunk), len(self.vocabulary))
+        counts = sparse.csr_matrix((np.ones(len(indices)), indices, indptr), shape=shape)
+        counts.sum_duplicates()
+        # 문서 빈도: 합산 후 열 번호가 한 번 나오면 그 전사문에 단어가 있다는 뜻
+        chunk_df = np.bincount(counts.indices, minlength=shape[1])
+        self._document_frequency = np.pad(self._document_frequency, (0, shape[1] - len(self._document_frequency)))
+        self._document_frequency += chunk_df
+        # 사용자 x 전사문 지시 행렬을 곱해 사용자별 단어 빈도로 합산
+        assignment = sparse.csr_matrix((np.ones(len(rows)), (rows, np.arange(len(rows)))),
+                                       shape=(len(self.users), len(rows)))
+        self._user_counts.resize((len(self.users), shape[1]))
+        self._user_counts = self._user_counts + assignment @ counts
+        self.num_documents += len(chunk)
+        logging.info(f"TF-IDF chunk of {len(chunk)} transcripts processed in {time.perf_counter() - started:.2f}s "
+                     f"(total {self.num_documents}, vocabulary {len(self.vocabulary)}, users {len(self.users)})")
+
+    def idf(self):
+        """평활화한 IDF 벡터: log((1 + 문서 수) / (1 + 문서 빈도)) + 1"""
+        return np.log((1 + self.num_documents) / (1 + self._document_frequency)) + 1
+
+    def user_scores(self):
+        """
+        사용자 x 단어 TF-IDF 점수 희소 행렬 (TF는 1 + log(빈도)로 완화)
+        min_count보다 적게 나온 단어는 점수에서 제외합니다.
+        """
+        scores = self._user_counts.tocsr(copy=True)
+        scores.data[scores.data < self.min_count] = 0
+        scores.eliminate_zeros()
+        scores.data = (1 + np.log(scores.data)) * self.idf()[scores.indices]
+        return scores
+
+    def rankings(self):
+        """
+        사용자별 TF-IDF 상위 단어를 계산하는 메서드
+        :return: 사용자 식별자 -> (단어, 점수) 리스트 딕셔너리
+        """
+        words = np.array(list(self.vocabulary), dtype=object)
+        scores = self.user_scores()
+        results = {}
+        for user_id, row in self.users.items():
+            start, end = scores.indptr[row], scores.indptr[row + 1]
+            data, columns = scores.data[start:end], scores.indices[start:end]
+            if len(data) > self.top_k:
+                # 전체 정렬 대신 상위 k개만 골라 정렬
+                selected = np.argpartition(-data, self.top_k)[:self.top_k]
+                data, columns = data[selected], columns[selected]
+            order = np.argsort(-data, kind='stable')
+            results[user_id] = [(word, float(score)) for word, score in zip(words[columns[order]], data[order])]
+        return results
+
+    def save(self, output_dir=None):
+        """
+        코퍼스 IDF와 사용자별 순위를 파일로 저장하는 메서드
+        :param output_dir: 결과 디렉터리 (idf.json과 users/<사용자 해시>.json)
+        """
+        output_dir = output_dir or Config.TFIDF_DIR
+        users_dir = os.path.join(output_dir, 'users')
+        os.makedirs(users_dir, exist_ok=True)
+        generated_at = time.time()
+        for user_id, ranking in self.rankings().items():
+            _write_json(_user_file(users_dir, user_id, '.json'),
+                        {"generated_at": generated_at, "words": ranking})
+        _write_json(os.path.join(output_dir, 'idf.json'), {
+            "generated_at": generated_at,
+            "documents": self.num_documents,
+            "idf": dict(zip(self.vocabulary, self.idf().tolist())),
+        })
+        logging.info(f"TF-IDF rankings saved to {output_dir}: {len(self.users)} users, {len(self.vocabulary)} words")
+
+class TfidfRankings:
+    """배치 작업 결과를 API에서 읽는 클래스 (IDF는 시작 시 한 번, 사용자 순위는 요청 시 로드)"""
+
+    def __init__(self, output_dir=None):
+        """
+        :param output_dir: 배치 작업 결과 디렉터리
+        """
+        self.output_dir = output_dir or Config.TFIDF_DIR
+        self.idf = {}
+        self.default_idf = 1.0
+        try:
+            with open(os.path.join(self.output_dir, 'idf.json'), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.idf = data["idf"]
+            # 코퍼스에 없던 단어는 문서 빈도 0으로 보고 가장 높은 IDF를 부여
+            self.default_idf = float(np.log(1 + data["documents"]) + 1)
+            logging.info(f"Loaded corpus IDF for {len(self.idf)} words ({data['documents']} transcripts)")
+        except FileNotFoundError:
+            logging.info("No TF-IDF rankings found, using raw frequencies")
+
+    def user_words(self, user_id, num_words):
+        """
+        배치 작업에서 계산한 사용자의 TF-IDF 상위 단어를 반환하는 메서드
+        :return: (단어, 점수) 리스트 (아직 계산되지 않은 사용자는 빈 리스트)
+        """
+        try:
+            with open(_user_file(os.path.join(self.output_dir, 'users'), user_id, '.json'), 'r', encoding='utf-8') as f:
+                return [tuple(entry) for entry in json.load(f)["words"][:num_words]]
+        except FileNotFoundError:
+            return []
+
+    def delete_user(self, user_id):
+        """사용자의 TF-IDF 순위 파일을 삭제하는 메서드"""
+        try:
+            os.remove(_user_file(os.path.join(self.output_dir, 'users'), user_id, '.json'))
+        except FileNotFoundError:
+            pass
+
+    def rank_words(self, words, num_words, min_count=None):
+        """
+        업로드 하나의 단어를 빈도 대신 코퍼스 IDF를 곱한 TF-IDF로 정렬하는 메서드
+        (IDF가 없으면 빈도순, 같은 점수는 먼저 나온 단어 우선)
+        배치 작업과 같이 min_count보다 적게 나온 단어는 점수와 관계없이 자주 나온 단어 뒤에 둡니다.
+        코퍼스에 없는 단어는 가장 높은 IDF를 받으므로, 한 번 잘못 인식된 단어가 자주 쓴 단어보다 앞서지 않게 하기 위함입니다.
+        :param words: 단어 리스트 (중복 포함)
+        :param num_words: 반환할 단어 수
+        :param min_count: 우선 순위에 넣을 최소 빈도 (기본값은 Config.TFIDF_MIN_USER_COUNT)
+        :return: (단어, 점수) 튜플의 리스트 (TextProcessor.get_top_items와 같은 형식)
+        """
+        counts = Counter(words)
+        if not self.idf:
+            return counts.most_common(num_words)
+        min_count = min_count or Config.TFIDF_MIN_USER_COUNT
+        scores = {word: float((1 + np.log(count)) * self.idf.get(word, self.default_idf)) for word, count in counts.items()}
+        ranked = sorted(scores.items(), key=lambda entry: (counts[entry[0]] >= min_count, entry[1]), reverse=True)
+        return ranked[:num_words]
+
+if __name__ == "__main__":
+    from text_processor import TextProcessor
+    logging.basicConfig(level=logging.INFO)
+    started = time.perf_counter()
+    store = TranscriptStore()
+    store.prune()
+    job = TfidfRankingJob(TextProcessor())
+    job.add_transcripts(store.iter_transcripts())
+    job.save()
+    logging.info(f"TF-IDF ranking job finished in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,128 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+import numpy as np
+from config import Config
+from lru import LRUCache
+
+class TranscriptCache:
+    """
+    정규화된 16kHz PCM 해시를 키로 하는 음성 변환 결과 캐시.
+    메모리 LRU 계층과 용량 제한이 있는 디스크 계층으로 구성되며,
+    같은 녹음을 다시 업로드하면 Whisper 추론 없이 결과를 돌려줍니다.
+    """
+
+    def __init__(self, cache_dir=None, memory_items=None, disk_bytes=None):
+        """
+        :param cache_dir: 디스크 캐시 디렉터리
+        :param memory_items: 메모리에 보관할 최대 항목 수
+        :param disk_bytes: 디스크 캐시의 최대 크기(바이트)
+        """
+        self.cache_dir = cache_dir or Config.TRANSCRIPT_CACHE_DIR
+        self.disk_bytes = disk_bytes or Config.TRANSCRIPT_CACHE_DISK_BYTES
+        self.memory = LRUCache(memory_items or Config.TRANSCRIPT_CACHE_MEMORY_ITEMS)
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_evictions = 0
+        self._lock = threading.Lock()
+        self._disk_index = OrderedDict()  # 키 -> 파일 크기 (오래 사용되지 않은 순)
+        self._disk_total = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_disk_index()
+
+    @staticmethod
+    def make_key(audio, model_size):
+        """
+        캐시 키를 만드는 메서드
+        :param audio: 16kHz 모노 float32 오디오
+        :param model_size: Whisper 모델 크기
+        :return: 16진수 SHA-256 문자열
+        """
+        digest = hashlib.sha256(f"{model_size}\0".encode())
+        digest.update(memoryview(np.ascontiguousarray(audio, dtype=np.float32)).cast("B"))
+        return digest.hexdigest()
+
+    def get(self, key):
+        """캐시된 텍스트를 반환 (없으면 None)"""
+        text = self.memory.get(key)
+        if text is not None:
+            return text
+
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        os.utime(path)  # 최근 사용 시각 갱신
+        with self._lock:
+            self.disk_hits += 1
+            if key in self._disk_index:
+                self._disk_index.move_to_end(key)
+        self.memory.put(key, text)
+        return text
+
+    def put(self, key, text):
+        """텍스트를 메모리와 디스크 캐시에 저장"""
+        self.memory.put(key, text)
+        data = text.encode('utf-8')
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 다른 프로세스가 읽는 중인 파일이 깨지지 않도록 임시 파일에 쓴 뒤 교체
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+        with self._lock:
+            self._disk_total += len(data) - self._disk_index.pop(key, 0)
+            self._disk_index[key] = len(data)
+            self._evict()
+
+    def stats(self):
+        """메모리/디스크 계층의 적중, 실패, 제거 횟수를 반환"""
+        memory = self.memory.stats()
+        with self._lock:
+            return {
+                "memory_hits": memory["hits"],
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_evictions": memory["evictions"],
+                "disk_evictions": self.disk_evictions,
+                "memory_items": memory["size"],
+                "disk_items": len(self._disk_index),
+                "disk_bytes": self._disk_total,
+            }
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.txt")
+
+    def _load_disk_index(self):
+        # 기존 캐시 파일을 최근 사용 시각 순으로 인덱싱
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith('.txt'):
+                    stat = os.stat(os.path.join(root, name))
+                    entries.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk_index[key] = size
+            self._disk_total += size
+        self._evict()
+
+    def _evict(self):
+        while self._disk_total > self.disk_bytes and self._disk_index:
+            key, size = self._disk_index.popitem(last=False)
+            self._disk_total -= size
+            self.disk_evictions += 1
+            try:
+                os.unlink(self._path(key))
+            except FileNotFoundError:
+                pass
+            logging.debug(f"Evicted transcript cache entry {key}")
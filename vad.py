@@ -0,0 +1,146 @@
+import numpy as np
+from config import Config
+
+class SpeechOffsetMap:
+    """
+    무음 제거 후의 오디오 위치를 원본 오디오 위치로 되돌리는 오프셋 맵.
+    잘라 붙인 음성 구간마다 (압축 오디오 시작 샘플, 원본 시작 샘플)을 저장합니다.
+    """
+
+    def __init__(self, condensed_starts, original_starts, sample_rate):
+        self.condensed_starts = np.asarray(condensed_starts, dtype=np.int64)
+        self.original_starts = np.asarray(original_starts, dtype=np.int64)
+        self.sample_rate = sample_rate
+
+    def to_original(self, seconds):
+        """
+        압축 오디오 기준 시간(초)을 원본 오디오 기준 시간(초)으로 변환하는 메서드
+        :param seconds: 압축 오디오 기준 시간 (스칼라 또는 배열)
+        :return: 원본 오디오 기준 시간
+        """
+        samples = np.asarray(seconds, dtype=np.float64) * self.sample_rate
+        index = np.searchsorted(self.condensed_starts, samples, side='right') - 1
+        index = np.clip(index, 0, len(self.condensed_starts) - 1)
+        original = self.original_starts[index] + (samples - self.condensed_starts[index])
+        return original / self.sample_rate
+
+    def remap_segments(self, segments):
+        """Whisper 결과 세그먼트의 start/end를 원본 오디오 기준으로 변환"""
+        for segment in segments:
+            segment["start"] = float(self.to_original(segment["start"]))
+            segment["end"] = float(self.to_original(segment["end"]))
+        return segments
+
+class VoiceActivityDetector:
+    """
+    에너지와 스펙트럼 평탄도를 이용한 벡터화된 음성 구간 검출기.
+    프레임 단위로 에너지가 잡음 기준보다 충분히 크고 스펙트럼이 평탄하지 않은
+    (잡음보다 음성에 가까운) 구간만 음성으로 판단합니다.
+    """
+
+    def __init__(self, sample_rate=16000, frame_ms=None, energy_margin_db=None, min_energy_db=None,
+                 flatness_threshold=None, min_speech_ms=None, min_silence_ms=None, padding_ms=None):
+        self.sample_rate = sample_rate
+        self.frame_length = int(sample_rate * (frame_ms or Config.VAD_FRAME_MS) / 1000)
+        self.energy_margin_db = energy_margin_db if energy_margin_db is not None else Config.VAD_ENERGY_MARGIN_DB
+        self.min_energy_db = min_energy_db if min_energy_db is not None else Config.VAD_MIN_ENERGY_DB
+        self.flatness_threshold = flatness_threshold if flatness_threshold is not None else Config.VAD_FLATNESS_THRESHOLD
+        self.min_speech_frames = self._ms_to_frames(min_speech_ms if min_speech_ms is not None else Config.VAD_MIN_SPEECH_MS)
+        self.min_silence_frames = self._ms_to_frames(min_silence_ms if min_silence_ms is not None else Config.VAD_MIN_SILENCE_MS)
+        self.padding_frames = self._ms_to_frames(padding_ms if padding_ms is not None else Config.VAD_PADDING_MS)
+        self.window = np.hanning(self.frame_length).astype(np.float32)
+
+    def _ms_to_frames(self, ms):
+        return int(round(ms * self.sample_rate / 1000 / self.frame_length))
+
+    def detect(self, audio):
+        """
+        음성 구간을 검출하는 메서드
+        :param audio: 16kHz 모노 float32 오디오
+        :return: 음성 구간 (시작 샘플, 끝 샘플) 리스트
+        """
+        num_frames = len(audio) // self.frame_length
+        if num_frames == 0:
+            return []
+        frames = audio[:num_frames * self.frame_length].reshape(num_frames, self.frame_length)
+
+        # 프레임 에너지 (dBFS)
+        energy_db = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+        # 하위 10% 에너지를 배경 잡음 수준으로 추정
+        # (쉬는 구간 없이 말만 있는 녹음에서 음성이 잡음으로 처리되지 않도록 상위 에너지 기준으로도 제한)
+        noise_floor, peak = np.percentile(energy_db, [10, 99])
+        energy_threshold = max(self.min_energy_db, min(noise_floor, peak - 2 * self.energy_margin_db) + self.energy_margin_db)
+
+        # 스펙트럼 평탄도 (기하평균 / 산술평균, 잡음일수록 1에 가까움)
+        power = np.abs(np.fft.rfft(frames * self.window, axis=1)) ** 2 + 1e-10
+        flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+
+        speech = (energy_db > energy_threshold) & (flatness < self.flatness_threshold)
+
+        # 짧은 무음은 메우고, 짧은 음성은 버린 뒤, 앞뒤로 여유 구간 추가
+        speech = self._fill_runs(speech, False, self.min_silence_frames)
+        speech = self._fill_runs(speech, True, self.min_speech_frames)
+        starts, ends = self._runs(speech)
+        # 여유 구간 추가로 겹치게 된 구간은 다시 구간을 계산하면서 병합됨
+        speech = self._cover(num_frames, np.maximum(starts - self.padding_frames, 0),
+                             np.minimum(ends + self.padding_frames, num_frames))
+        starts, ends = self._runs(speech)
+
+        last_sample = len(audio)
+        return [(int(s) * self.frame_length, min(int(e) * self.frame_length, last_sample)) for s, e in zip(starts, ends)]
+
+    def apply(self, audio):
+        """
+        오디오에서 무음을 제거하는 메서드
+        :param audio: 16kHz 모노 float32 오디오
+        :return: (음성만 이어 붙인 오디오, SpeechOffsetMap, 제거 통계 딕셔너리)
+        """
+        segments = self.detect(audio)
+        condensed_starts, original_starts = [], []
+        position = 0
+        for start, end in segments:
+            condensed_starts.append(position)
+            original_starts.append(start)
+            position += end - start
+
+        speech_audio = np.concatenate([audio[s:e] for s, e in segments]) if segments else audio[:0]
+        offset_map = SpeechOffsetMap(condensed_starts or [0], original_starts or [0], self.sample_rate)
+
+        total_seconds = len(audio) / self.sample_rate
+        speech_seconds = len(speech_audio) / self.sample_rate
+        stats = {
+            "total_seconds": total_seconds,
+            "speech_seconds": speech_seconds,
+            "removed_seconds": total_seconds - speech_seconds,
+            "removed_ratio": (1 - speech_seconds / total_seconds) if total_seconds else 0.0,
+            "segments": len(segments),
+        }
+        return speech_audio, offset_map, stats
+
+    @staticmethod
+    def _runs(mask):
+        # True 구간의 (시작, 끝) 프레임 인덱스
+        padded = np.concatenate(([False], mask, [False])).astype(np.int8)
+        changes = np.diff(padded)
+        return np.flatnonzero(changes == 1), np.flatnonzero(changes == -1)
+
+    @staticmethod
+    def _cover(length, starts, ends):
+        # [start, end) 구간들을 덮는 불리언 마스크
+        delta = np.zeros(length + 1, dtype=np.int32)
+        np.add.at(delta, starts, 1)
+        np.add.at(delta, ends, -1)
+        return np.cumsum(delta[:-1]) > 0
+
+    @classmethod
+    def _fill_runs(cls, mask, value, min_length):
+        # value와 같은 값이 min_length 프레임보다 짧게 이어진 구간을 반대 값으로 바꿈
+        if min_length <= 1:
+            return mask
+        starts, ends = cls._runs(mask == value)
+        short = (ends - starts) < min_length
+        if not value:
+            # 양 끝의 무음은 메우지 않음
+            short &= (starts > 0) & (ends < len(mask))
+        flip = cls._cover(len(mask), starts[short], ends[short])
+        return mask ^ flip